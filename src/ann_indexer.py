@@ -0,0 +1,242 @@
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from event_log import log
+
+
+class ANNIndexer:
+    """Approximate nearest-neighbour candidate generation on one text field.
+
+    Records are turned into character n-gram sets. With ``algorithm='tfidf'``
+    the n-gram TF-IDF vectors are L2-normalized and compared with a chunked
+    sparse matrix product (cosine similarity); with ``algorithm='minhash'``
+    MinHash signatures are bucketed with LSH banding and the Jaccard
+    similarity is estimated from the signatures. In both cases only the
+    ``top_k`` neighbours per record with a similarity of at least
+    ``threshold`` become candidate pairs.
+    """
+
+    def __init__(self, key: str, algorithm: str = 'tfidf', ngram: int = 3, top_k: int = 10, threshold: float = 0.5, num_perm: int = 64, bands: int = 16, chunk_size: int = 2048, seed: int = 42):
+        if algorithm not in ('tfidf', 'minhash'):
+            raise ValueError(f"Unknown ANN algorithm: {algorithm}")
+
+        if algorithm == 'minhash' and num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.key = key
+        self.algorithm = algorithm
+        self.ngram = ngram
+        self.top_k = top_k
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.chunk_size = chunk_size
+        self.seed = seed
+
+        # Son index() çağrısının istatistikleri
+        self.stats = {}
+
+    def _ngrams(self, value: str):
+        text = f" {value.lower()} "
+        if len(text) <= self.ngram:
+            return [text]
+        return [text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1)]
+
+    def _build_ngram_matrix(self, values_list):
+        # Tüm taraflar için ortak n-gram sözlüğü -> CSR yapısı (indptr, n-gram id listesi)
+        vocabulary = {}
+        matrices = []
+
+        for values in values_list:
+            indptr = [0]
+            indices = []
+            for value in values:
+                grams = {}
+                for gram in self._ngrams(value):
+                    gram_id = vocabulary.setdefault(gram, len(vocabulary))
+                    grams[gram_id] = grams.get(gram_id, 0) + 1
+                indices.extend(grams.keys())
+                indptr.append(len(indices))
+            matrices.append((np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64)))
+
+        return matrices, len(vocabulary)
+
+    def _extract_values(self, df: pd.DataFrame):
+        values = df[self.key]
+        positions = np.flatnonzero(values.notna().to_numpy())
+        return positions, values.iloc[positions].astype(str).tolist()
+
+    def _top_k(self, rows: np.ndarray, cols: np.ndarray, scores: np.ndarray):
+        keep = scores >= self.threshold
+        rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+        if self.top_k and len(rows):
+            order = np.lexsort((-scores, rows))
+            rows, cols, scores = rows[order], cols[order], scores[order]
+            row_start = np.r_[0, np.flatnonzero(np.diff(rows)) + 1]
+            group_sizes = np.diff(np.r_[row_start, len(rows)])
+            rank = np.arange(len(rows)) - np.repeat(row_start, group_sizes)
+            keep = rank < self.top_k
+            rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+        return rows, cols, scores
+
+    def _tfidf_neighbours(self, values_a, values_b, dedup: bool):
+        try:
+            from scipy import sparse
+        except ImportError:
+            raise ImportError("ANN indexing with algorithm 'tfidf' requires scipy")
+
+        if dedup:
+            (csr_a,), n_features = self._build_ngram_matrix([values_a])
+            csr_b = csr_a
+        else:
+            (csr_a, csr_b), n_features = self._build_ngram_matrix([values_a, values_b])
+
+        def to_tfidf(csr, n_rows):
+            indptr, indices = csr
+            return sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(n_rows, n_features))
+
+        matrix_a = to_tfidf(csr_a, len(values_a))
+        matrix_b = matrix_a if dedup else to_tfidf(csr_b, len(values_b))
+
+        # IDF iki tarafın birleşiminden (dedup'ta tek taraf)
+        document_frequency = np.bincount(matrix_a.indices, minlength=n_features)
+        if not dedup:
+            document_frequency = document_frequency + np.bincount(matrix_b.indices, minlength=n_features)
+        n_documents = matrix_a.shape[0] + (0 if dedup else matrix_b.shape[0])
+        idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+
+        def normalize(matrix):
+            matrix = matrix.multiply(idf).tocsr()
+            norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+            norms[norms == 0] = 1
+            return sparse.diags(1 / norms) @ matrix
+
+        matrix_a = normalize(matrix_a)
+        matrix_b = matrix_a if dedup else normalize(matrix_b)
+        matrix_b_t = matrix_b.T.tocsc()
+
+        all_rows, all_cols, all_scores = [], [], []
+        for start in range(0, matrix_a.shape[0], self.chunk_size):
+            product = (matrix_a[start:start + self.chunk_size] @ matrix_b_t).tocoo()
+            rows, cols, scores = product.row.astype(np.int64) + start, product.col.astype(np.int64), product.data
+
+            if dedup:
+                # Kendisiyle eşleşmeyi at
+                keep = rows != cols
+                rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+            rows, cols, scores = self._top_k(rows, cols, scores)
+            all_rows.append(rows)
+            all_cols.append(cols)
+            all_scores.append(scores)
+
+        return np.concatenate(all_rows), np.concatenate(all_cols), np.concatenate(all_scores)
+
+    def _minhash_signatures(self, csr, n_rows: int, hash_a: np.ndarray, hash_b: np.ndarray) -> np.ndarray:
+        prime = np.uint64((1 << 31) - 1)
+        indptr, indices = csr
+        signatures = np.full((n_rows, self.num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+
+        # Boş olmayan satırlar için segment bazlı minimum
+        lengths = np.diff(indptr)
+        non_empty = np.flatnonzero(lengths > 0)
+        if len(non_empty) == 0:
+            return signatures
+
+        shingles = indices.astype(np.uint64)
+        for start in range(0, len(non_empty), self.chunk_size):
+            rows = non_empty[start:start + self.chunk_size]
+            segment_start, segment_end = indptr[rows[0]], indptr[rows[-1] + 1]
+            hashed = (shingles[segment_start:segment_end, None] * hash_a + hash_b) % prime
+            offsets = indptr[rows] - segment_start
+            signatures[rows] = np.minimum.reduceat(hashed, offsets, axis=0)
+
+        return signatures
+
+    def _minhash_neighbours(self, values_a, values_b, dedup: bool):
+        if dedup:
+            (csr_a,), _ = self._build_ngram_matrix([values_a])
+            csr_b = csr_a
+        else:
+            (csr_a, csr_b), _ = self._build_ngram_matrix([values_a, values_b])
+
+        rng = np.random.default_rng(self.seed)
+        hash_a = rng.integers(1, (1 << 31) - 1, size=self.num_perm, dtype=np.uint64)
+        hash_b = rng.integers(0, (1 << 31) - 1, size=self.num_perm, dtype=np.uint64)
+
+        signatures_a = self._minhash_signatures(csr_a, len(values_a), hash_a, hash_b)
+        signatures_b = signatures_a if dedup else self._minhash_signatures(csr_b, len(values_b), hash_a, hash_b)
+
+        # LSH: her band bir bucket anahtarına indirgenir, aynı bucket'taki kayıtlar aday olur
+        rows_per_band = self.num_perm // self.bands
+        multipliers = rng.integers(1, (1 << 61) - 1, size=rows_per_band, dtype=np.uint64)
+        pair_frames = []
+
+        for band in range(self.bands):
+            columns = slice(band * rows_per_band, (band + 1) * rows_per_band)
+            keys_a = (signatures_a[:, columns] * multipliers).sum(axis=1)
+            keys_b = keys_a if dedup else (signatures_b[:, columns] * multipliers).sum(axis=1)
+
+            left = pd.DataFrame({'bucket': keys_a, 'row': np.arange(len(keys_a))})
+            right = pd.DataFrame({'bucket': keys_b, 'col': np.arange(len(keys_b))})
+            joined = left.merge(right, on='bucket')[['row', 'col']]
+
+            if dedup:
+                joined = joined[joined['row'] != joined['col']]
+            pair_frames.append(joined)
+
+        pairs = pd.concat(pair_frames, ignore_index=True).drop_duplicates()
+        rows = pairs['row'].to_numpy(np.int64)
+        cols = pairs['col'].to_numpy(np.int64)
+
+        # İmzalardan Jaccard tahmini
+        scores = np.zeros(len(rows))
+        for start in range(0, len(rows), self.chunk_size * 16):
+            stop = start + self.chunk_size * 16
+            scores[start:stop] = (signatures_a[rows[start:stop]] == signatures_b[cols[start:stop]]).mean(axis=1)
+
+        return self._top_k(rows, cols, scores)
+
+    def index(self, df_a: pd.DataFrame, df_b: Optional[pd.DataFrame] = None) -> pd.MultiIndex:
+        start_time = time.time()
+
+        dedup = df_b is None or df_b is df_a
+        positions_a, values_a = self._extract_values(df_a)
+        positions_b, values_b = (positions_a, values_a) if dedup else self._extract_values(df_b)
+
+        if self.algorithm == 'tfidf':
+            rows, cols, scores = self._tfidf_neighbours(values_a, values_b, dedup)
+        else:
+            rows, cols, scores = self._minhash_neighbours(values_a, values_b, dedup)
+
+        left_positions = positions_a[rows]
+        right_positions = positions_b[cols]
+
+        if dedup:
+            # Her çift bir kez, recordlinkage sırasıyla (sonraki kayıt, önceki kayıt)
+            first = np.maximum(left_positions, right_positions)
+            second = np.minimum(left_positions, right_positions)
+            unique_pairs = np.unique(np.stack([first, second], axis=1), axis=0) if len(first) else np.empty((0, 2), dtype=np.int64)
+            left_positions, right_positions = unique_pairs[:, 0], unique_pairs[:, 1]
+            df_b = df_a
+
+        candidate_links = pd.MultiIndex.from_arrays(
+            [df_a.index[left_positions], df_b.index[right_positions]],
+            names=[df_a.index.name, df_b.index.name])
+
+        self.stats = {
+            'algorithm': self.algorithm,
+            'candidates': len(candidate_links),
+            'mean_similarity': float(scores.mean()) if len(scores) else 0.0,
+            'elapsed': time.time() - start_time,
+        }
+
+        log.info(f"ANN ({self.algorithm}) on '{self.key}': {len(candidate_links):,} candidates, "
+                 f"avg similarity {self.stats['mean_similarity']:.3f} ({self.stats['elapsed']:.2f}s)")
+
+        return candidate_links
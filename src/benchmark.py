@@ -0,0 +1,471 @@
+import os
+import sys
+import json
+import time
+import subprocess
+from typing import Optional, Dict, List
+
+from event_log import log
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class BenchmarkSuite:
+    def __init__(self, config_path: str, limit: Optional[int] = None, repeat: int = 1, dedup_rows: Optional[int] = None):
+        self.config_path = os.path.abspath(config_path)
+        self.limit = limit
+        self.repeat = max(1, repeat)
+        self.dedup_rows = dedup_rows
+
+        # Benchmark adı -> sonuç sözlüğü
+        self.results = {}
+
+        # Çalıştırılacak benchmark'lar (sırası korunur)
+        self.benchmarks = {
+            'import_time': self.benchmark_import_time,
+            'cli_startup': self.benchmark_cli_startup,
+            'pipeline_stages': self.benchmark_pipeline_stages,
+            'dedup_febrl': self.benchmark_dedup_febrl,
+            'typed_compare': self.benchmark_typed_compare,
+            'string_encoding': self.benchmark_string_encoding,
+            'string_backends': self.benchmark_string_backends,
+            'sqlite_load': self.benchmark_sqlite_load,
+        }
+
+        log.info(f"Benchmark suite ready: {len(self.benchmarks)} benchmarks (repeat: {self.repeat})")
+
+    def run_all(self, names: Optional[List[str]] = None) -> Dict[str, dict]:
+        for name in names or list(self.benchmarks.keys()):
+            if name not in self.benchmarks:
+                raise ValueError(f"Unknown benchmark: {name}")
+
+            log.info(f"\nBenchmark: {name}")
+            start_time = time.perf_counter()
+
+            try:
+                self.results[name] = self.benchmarks[name]()
+            except Exception as e:
+                log.error(f"Benchmark ERROR ({name}): {e}")
+                self.results[name] = {'error': str(e)}
+
+            log.info(f"Benchmark {name} finished ({time.perf_counter() - start_time:.2f}s)")
+
+        return self.results
+
+    def _best_of(self, func):
+        best = None
+        for _ in range(self.repeat):
+            elapsed = func()
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _time_subprocess(self, args: List[str]) -> float:
+        def run_once():
+            start_time = time.perf_counter()
+            completed = subprocess.run(args, cwd=os.getcwd(), capture_output=True, text=True)
+            elapsed = time.perf_counter() - start_time
+            if completed.returncode != 0:
+                raise RuntimeError(f"{' '.join(args)} failed: {completed.stdout[-500:]}{completed.stderr[-500:]}")
+            return elapsed
+
+        return self._best_of(run_once)
+
+    def benchmark_import_time(self) -> dict:
+        # Her modül temiz bir yorumlayıcıda import edilir (önbellek etkisi yok)
+        modules = ['config_reader', 'database_manager', 'main', 'record_linker']
+        results = {}
+
+        for module in modules:
+            code = f"import sys, time; sys.path.insert(0, {SRC_DIR!r}); t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+            def run_once():
+                completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+                if completed.returncode != 0:
+                    raise RuntimeError(f"import {module} failed: {completed.stderr[-500:]}")
+                return float(completed.stdout.strip().splitlines()[-1])
+
+            results[module] = self._best_of(run_once)
+            log.info(f"  import {module}: {results[module] * 1000:.1f} ms")
+
+        return {'seconds': results}
+
+    def benchmark_cli_startup(self) -> dict:
+        main_path = os.path.join(SRC_DIR, 'main.py')
+        results = {}
+
+        for command in ('summary', 'validate'):
+            results[command] = self._time_subprocess([sys.executable, main_path, command, self.config_path])
+            log.info(f"  main.py {command}: {results[command]:.3f} s")
+
+        return {'seconds': results}
+
+    def benchmark_pipeline_stages(self) -> dict:
+        from main import LinkageCoordinator
+
+        stages = {}
+        coordinator = LinkageCoordinator(self.config_path)
+
+        try:
+            start_time = time.perf_counter()
+            coordinator.validate_setup()
+            stages['validate'] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            data = coordinator.load_data(self.limit)
+            stages['load'] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            if coordinator.is_multi_database:
+                results = coordinator.run_multi_database_linkage(data)
+            else:
+                results = coordinator.run_record_linkage(*data)
+            stages['linkage'] = time.perf_counter() - start_time
+
+            # Config'te ground truth varsa hız sonuçlarının yanında kalite de raporlanır
+            quality = {}
+            if coordinator.plan.evaluation.enabled:
+                start_time = time.perf_counter()
+                quality = coordinator.evaluate_results(results, data)
+                stages['evaluate'] = time.perf_counter() - start_time
+
+        finally:
+            coordinator.db_manager.disconnect_all()
+
+        for stage, elapsed in stages.items():
+            log.info(f"  {stage}: {elapsed:.3f} s")
+
+        return dict({'seconds': stages}, **{f'quality_{name}': metrics for name, metrics in quality.items()})
+
+    def _load_febrl(self, name: str):
+        import sqlite3
+        import pandas as pd
+
+        db_path = os.path.join(SRC_DIR, '..', 'data', 'febrl', f'{name}.db')
+        connection = sqlite3.connect(db_path)
+        try:
+            return pd.read_sql_query("SELECT rowid AS id, given_name AS name, surname, date_of_birth AS dob, soc_sec_id AS ssn, address_1 AS address FROM patients", connection)
+        finally:
+            connection.close()
+
+    def benchmark_dedup_febrl(self) -> dict:
+        import numpy as np
+        from dedup_engine import DeduplicationEngine
+        from evaluation import group_pairs, linkage_metrics, load_febrl_links
+
+        config = {
+            'indexing': {'method': 'block', 'key': 'dob'},
+            'comparison': [
+                {'field': 'name', 'method': 'string', 'algorithm': 'jarowinkler', 'threshold': 0.85},
+                {'field': 'surname', 'method': 'string', 'algorithm': 'jarowinkler', 'threshold': 0.85},
+                {'field': 'ssn', 'method': 'exact'},
+                {'field': 'address', 'method': 'string', 'algorithm': 'levenshtein', 'threshold': 0.7},
+            ],
+            'classification': {'method': 'threshold', 'threshold': 0.5},
+        }
+        results = {}
+
+        datasets = {name: self._load_febrl(name) for name in ('febrl1', 'febrl3')}
+
+        if self.dedup_rows:
+            # Ölçek testi: febrl3 kopyaları, blok anahtarı kopya numarasıyla ayrılır (blok boyutları korunur)
+            base = datasets['febrl3']
+            copies = int(np.ceil(self.dedup_rows / len(base)))
+            scaled = base.loc[np.tile(np.arange(len(base)), copies)].reset_index(drop=True).iloc[:self.dedup_rows]
+            scaled['id'] = np.arange(1, len(scaled) + 1)
+            scaled['dob'] = scaled['dob'].astype(str) + '_' + (np.arange(len(scaled)) // len(base)).astype(str)
+            datasets[f'febrl3_x{copies}'] = scaled
+
+        for name, df in datasets.items():
+            engine = DeduplicationEngine(config)
+            groups = {}
+
+            def run_once():
+                start_time = time.perf_counter()
+                groups['results'] = engine.run(df, name)
+                return time.perf_counter() - start_time
+
+            elapsed = self._best_of(run_once)
+            results[name] = dict(engine.stats, elapsed=elapsed, pairs_per_second=engine.stats['candidate_pairs'] / elapsed if elapsed else 0.0)
+            log.info(f"  {name}: {len(df):,} records, {engine.stats['duplicate_groups']} groups, {elapsed:.2f} s")
+
+            if name in ('febrl1', 'febrl3'):
+                # Hız değişikliklerinin kalite kaybı: FEBRL gerçek bağlantılarına göre
+                found = groups['results']
+                predicted = group_pairs(found['group_id'].to_numpy(), found[f'{name}_id'].to_numpy()) if not found.empty else (np.empty(0),) * 2
+                left, right = engine.generate_pairs(df)
+                metrics = linkage_metrics(predicted, load_febrl_links(name), candidates=(df['id'].to_numpy()[left], df['id'].to_numpy()[right]),
+                                          total_possible_pairs=engine.stats['total_possible_pairs'], dedup=True)
+                results[name].update({key: metrics[key] for key in ('pair_completeness', 'reduction_ratio', 'precision', 'recall', 'f1')})
+                log.info(f"  {name}: PC {metrics['pair_completeness']:.3f}, RR {metrics['reduction_ratio']:.4f}, "
+                         f"precision {metrics['precision']:.3f}, recall {metrics['recall']:.3f}, F1 {metrics['f1']:.3f}")
+
+        return results
+
+    def benchmark_typed_compare(self) -> dict:
+        # Sayısal/tarih karşılaştırmaları: her çağrıda dönüştürme vs yüklemede tiplenmiş kolonlar
+        import sqlite3
+        import numpy as np
+        import pandas as pd
+        import recordlinkage as rl
+        from recordlinkage.compare import Numeric
+        from comparison_features import TypedNumeric
+        from typed_columns import apply_column_types
+
+        db_path = os.path.join(SRC_DIR, '..', 'data', 'febrl', 'febrl4.db')
+        query = "SELECT given_name AS name, date_of_birth AS dob, postcode FROM {}"
+        connection = sqlite3.connect(db_path)
+        try:
+            df_left = pd.read_sql_query(query.format('patients_original'), connection)
+            df_right = pd.read_sql_query(query.format('patients_duplicates'), connection)
+        finally:
+            connection.close()
+
+        indexer = rl.Index()
+        indexer.block('name')
+        candidate_links = indexer.index(df_left, df_right)
+        left_positions = df_left.index.get_indexer(candidate_links.get_level_values(0))
+        right_positions = df_right.index.get_indexer(candidate_links.get_level_values(1))
+
+        typed_left = apply_column_types(df_left.copy(), {'dob': 'date', 'postcode': 'numeric'})
+        typed_right = apply_column_types(df_right.copy(), {'dob': 'date', 'postcode': 'numeric'})
+
+        rules = {'postcode': ('numeric', 5, 'linear'), 'dob': ('date', 365, 'gauss')}
+        results = {'candidate_pairs': len(candidate_links)}
+
+        for field, (value_type, offset, scoring) in rules.items():
+            feature = TypedNumeric(field, field, value_type, method=scoring, offset=offset, scale=30.0)
+            raw = (df_left[field].iloc[left_positions].reset_index(drop=True), df_right[field].iloc[right_positions].reset_index(drop=True))
+            typed = (typed_left[field].iloc[left_positions].reset_index(drop=True), typed_right[field].iloc[right_positions].reset_index(drop=True))
+
+            timings, scores = {}, {}
+            paths = {
+                'convert_per_call': lambda: feature._compute_vectorized(*raw),
+                'typed': lambda: feature._compute_vectorized(*typed),
+                # recordlinkage'in pandas.eval yolu (tiplenmiş kolonlar üzerinde)
+                'recordlinkage': lambda: np.asarray(Numeric(field, field, method=scoring, offset=offset, scale=30.0)._compute_vectorized(*typed), dtype=np.float64),
+            }
+
+            for path, compute in paths.items():
+                def run_once():
+                    start_time = time.perf_counter()
+                    scores[path] = compute()
+                    return time.perf_counter() - start_time
+
+                timings[path] = self._best_of(run_once)
+
+            identical = all(np.allclose(scores['typed'], other) for other in scores.values())
+            results[field] = {f'{path}_pairs_per_second': len(candidate_links) / elapsed if elapsed else 0.0 for path, elapsed in timings.items()}
+            results[field]['speedup_vs_convert'] = timings['convert_per_call'] / timings['typed'] if timings['typed'] else 0.0
+            results[field]['identical_scores'] = identical
+
+            log.info(f"  {field} ({value_type}, {scoring}): " + ', '.join(f"{path} {elapsed * 1000:.1f} ms" for path, elapsed in timings.items())
+                     + f", identical: {identical}")
+
+        return results
+
+    def benchmark_string_encoding(self) -> dict:
+        # Exact/string karşılaştırmaları: object metin kolonları vs sözlük kodlu kolonlar
+        import sqlite3
+        import numpy as np
+        import pandas as pd
+        import recordlinkage as rl
+        from recordlinkage.compare import Exact, String
+        from comparison_features import EncodedExact, EncodedString
+        from string_encoding import encode_string_columns
+
+        db_path = os.path.join(SRC_DIR, '..', 'data', 'febrl', 'febrl4.db')
+        query = "SELECT given_name AS name, surname, suburb, state, postcode FROM {}"
+        connection = sqlite3.connect(db_path)
+        try:
+            df_left = pd.read_sql_query(query.format('patients_original'), connection)
+            df_right = pd.read_sql_query(query.format('patients_duplicates'), connection)
+        finally:
+            connection.close()
+
+        indexer = rl.Index()
+        indexer.block('postcode')
+        candidate_links = indexer.index(df_left, df_right)
+        left_positions = df_left.index.get_indexer(candidate_links.get_level_values(0))
+        right_positions = df_right.index.get_indexer(candidate_links.get_level_values(1))
+
+        encoded_left, encoded_right = df_left.copy(), df_right.copy()
+        report = encode_string_columns(encoded_left, exclude=['postcode'])
+        report.update({f"{column} (right)": stats for column, stats in encode_string_columns(encoded_right, exclude=['postcode']).items()})
+        bytes_before = sum(stats['bytes_before'] for stats in report.values())
+        bytes_after = sum(stats['bytes_after'] for stats in report.values())
+        results = {'candidate_pairs': len(candidate_links), 'bytes_before': bytes_before, 'bytes_after': bytes_after,
+                   'memory_saved_ratio': 1 - bytes_after / bytes_before if bytes_before else 0.0}
+        log.info(f"  Encoded columns: {bytes_before / 1024:,.0f} KB -> {bytes_after / 1024:,.0f} KB")
+
+        rules = {
+            'state_exact': (Exact('state', 'state'), EncodedExact('state', 'state')),
+            'surname_exact': (Exact('surname', 'surname'), EncodedExact('surname', 'surname')),
+            'suburb_jarowinkler': (String('suburb', 'suburb', method='jarowinkler', threshold=0.85),
+                                   EncodedString('suburb', 'suburb', method='jarowinkler', threshold=0.85, backend='recordlinkage')),
+            'name_levenshtein': (String('name', 'name', method='levenshtein', threshold=0.7),
+                                 EncodedString('name', 'name', method='levenshtein', threshold=0.7, backend='recordlinkage')),
+        }
+
+        for rule, (plain_feature, encoded_feature) in rules.items():
+            field = plain_feature.labels_left
+            plain = (df_left[field].iloc[left_positions].reset_index(drop=True), df_right[field].iloc[right_positions].reset_index(drop=True))
+            encoded = (encoded_left[field].iloc[left_positions].reset_index(drop=True), encoded_right[field].iloc[right_positions].reset_index(drop=True))
+
+            timings, scores = {}, {}
+            paths = {
+                'object': lambda: np.asarray(plain_feature._compute_vectorized(*plain), dtype=np.float64),
+                'encoded': lambda: np.asarray(encoded_feature._compute_vectorized(*encoded), dtype=np.float64),
+            }
+
+            for path, compute in paths.items():
+                def run_once():
+                    start_time = time.perf_counter()
+                    scores[path] = compute()
+                    return time.perf_counter() - start_time
+
+                timings[path] = self._best_of(run_once)
+
+            identical = bool(np.array_equal(scores['object'], scores['encoded']))
+            results[rule] = {f'{path}_pairs_per_second': len(candidate_links) / elapsed if elapsed else 0.0 for path, elapsed in timings.items()}
+            results[rule]['speedup'] = timings['object'] / timings['encoded'] if timings['encoded'] else 0.0
+            results[rule]['identical_scores'] = identical
+
+            log.info(f"  {rule}: " + ', '.join(f"{path} {elapsed * 1000:.1f} ms" for path, elapsed in timings.items())
+                     + f", speedup {results[rule]['speedup']:.1f}x, identical: {identical}")
+
+        return results
+
+    def benchmark_string_backends(self) -> dict:
+        # String algoritmaları: recordlinkage (pandas apply) vs saf Python döngüsü vs rapidfuzz toplu skor
+        import sqlite3
+        import numpy as np
+        import pandas as pd
+        import recordlinkage as rl
+        from recordlinkage.compare import String
+        from comparison_features import EncodedString
+        from string_similarity import rapidfuzz_available
+
+        backends = ['recordlinkage', 'python'] + (['rapidfuzz'] if rapidfuzz_available() else [])
+        algorithms = ['jaro', 'jarowinkler', 'levenshtein', 'damerau_levenshtein']
+        results = {'backends': ', '.join(backends)}
+
+        # Deduplikasyon (febrl1, febrl3: dob blokları) ve linkage (febrl4: postcode blokları)
+        db_path = os.path.join(SRC_DIR, '..', 'data', 'febrl', 'febrl4.db')
+        query = "SELECT given_name AS name, address_1 AS address, postcode FROM {}"
+        connection = sqlite3.connect(db_path)
+        try:
+            febrl4 = (pd.read_sql_query(query.format('patients_original'), connection), pd.read_sql_query(query.format('patients_duplicates'), connection))
+        finally:
+            connection.close()
+
+        datasets = {name: (self._load_febrl(name),) * 2 + ('dob',) for name in ('febrl1', 'febrl3')}
+        datasets['febrl4'] = febrl4 + ('postcode',)
+
+        for name, (df_left, df_right, key) in datasets.items():
+            indexer = rl.Index()
+            indexer.block(key)
+            candidate_links = indexer.index(df_left) if df_left is df_right else indexer.index(df_left, df_right)
+            left_positions = df_left.index.get_indexer(candidate_links.get_level_values(0))
+            right_positions = df_right.index.get_indexer(candidate_links.get_level_values(1))
+
+            for field in ('name', 'address'):
+                pairs = (df_left[field].iloc[left_positions].reset_index(drop=True), df_right[field].iloc[right_positions].reset_index(drop=True))
+
+                for algorithm in algorithms:
+                    timings, scores = {}, {}
+                    for backend in backends:
+                        feature = EncodedString(field, field, method=algorithm, backend=backend)
+                        if backend == 'recordlinkage':
+                            feature = String(field, field, method=algorithm)
+
+                        def run_once():
+                            start_time = time.perf_counter()
+                            scores[backend] = np.asarray(feature._compute_vectorized(*pairs), dtype=np.float64)
+                            return time.perf_counter() - start_time
+
+                        timings[backend] = self._best_of(run_once)
+
+                    identical = all(np.array_equal(scores['recordlinkage'], other) for other in scores.values())
+                    key = f"{name}.{field}.{algorithm}"
+                    results[key] = {f'{backend}_pairs_per_second': len(candidate_links) / elapsed if elapsed else 0.0
+                                    for backend, elapsed in timings.items()}
+                    results[key]['identical_scores'] = identical
+
+                    log.info(f"  {key} ({len(candidate_links):,} pairs): "
+                             + ', '.join(f"{backend} {len(candidate_links) / elapsed:,.0f} pairs/s" for backend, elapsed in timings.items())
+                             + f", identical: {identical}")
+
+        return results
+
+    def benchmark_sqlite_load(self) -> dict:
+        # Tablo yükleme: düz bağlantı + sqlite3.Row vs salt okunur URI + PRAGMA'lar + tuple satırlar (havuzdan)
+        import sqlite3
+        import pandas as pd
+        from connection_pool import ConnectionFactory
+
+        febrl_dir = os.path.join(SRC_DIR, '..', 'data', 'febrl')
+        tables = [(f'febrl{n}', os.path.join(febrl_dir, f'febrl{n}.db'), 'patients') for n in (1, 2, 3)]
+        tables += [(f'febrl4.{t}', os.path.join(febrl_dir, 'febrl4.db'), t) for t in ('patients_original', 'patients_duplicates')]
+        query = "SELECT rowid, given_name, surname, date_of_birth, address_1, suburb, postcode FROM {}"
+
+        factory = ConnectionFactory()
+        results = {}
+
+        for name, path, table in tables:
+            def plain():
+                connection = sqlite3.connect(path)
+                connection.row_factory = sqlite3.Row
+                try:
+                    return pd.read_sql_query(query.format(table), connection)
+                finally:
+                    connection.close()
+
+            def pooled():
+                with factory.connection({'path': path}) as connection:
+                    return pd.read_sql_query(query.format(table), connection)
+
+            timings, rows = {}, {}
+            for path_name, load in (('plain', plain), ('pooled', pooled)):
+                def run_once():
+                    start_time = time.perf_counter()
+                    rows[path_name] = len(load())
+                    return time.perf_counter() - start_time
+
+                timings[path_name] = self._best_of(run_once)
+
+            results[name] = {f'{path_name}_records_per_second': rows[path_name] / elapsed if elapsed else 0.0
+                             for path_name, elapsed in timings.items()}
+            results[name]['speedup'] = timings['plain'] / timings['pooled'] if timings['pooled'] else 0.0
+            log.info(f"  {name} ({rows['plain']:,} rows): " + ', '.join(f"{path_name} {rows[path_name] / elapsed:,.0f} records/s"
+                                                                       for path_name, elapsed in timings.items())
+                     + f", speedup {results[name]['speedup']:.2f}x")
+
+        results['connections'] = {path: stats for path, stats in factory.stats().items()}
+        factory.close_all()
+        return results
+
+    def print_results(self):
+        log.info("\nBENCHMARK RESULTS:")
+        log.info("=" * 50)
+
+        for name, result in self.results.items():
+            if 'error' in result:
+                log.error(f"{name}: ERROR {result['error']}")
+                continue
+
+            log.info(f"{name}:")
+            for key, value in result.items():
+                if isinstance(value, dict):
+                    for sub_key, sub_value in value.items():
+                        log.info(f"  {key}.{sub_key}: {sub_value:.4f}" if isinstance(sub_value, float) else f"  {key}.{sub_key}: {sub_value}")
+                else:
+                    log.info(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+
+    def save_results(self, output_path: str):
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({'config': self.config_path, 'limit': self.limit, 'repeat': self.repeat, 'results': self.results}, f, indent=2, default=str)
+
+        log.info(f"Benchmark results saved: {output_path}")
@@ -0,0 +1,74 @@
+from typing import Dict, List, Union
+
+import pandas as pd
+
+KEY_TRANSFORMS = ['raw', 'prefix', 'soundex', 'nysiis', 'metaphone']
+
+
+def key_parts(spec: Union[dict, List[dict]]) -> List[dict]:
+    # Tek parça mapping veya parça listesi: [{column: surname, transform: soundex}, {column: postcode}]
+    return [spec] if isinstance(spec, dict) else list(spec)
+
+
+def normalize_key(series: pd.Series) -> pd.Series:
+    # Küçük harf, kenar boşlukları atılmış metin; boş metin eksik sayılır
+    values = series.astype('string').str.strip().str.lower()
+    return values.mask(values == '')
+
+
+def transform_key(series: pd.Series, transform: str = 'raw', length: int = 3) -> pd.Series:
+    """One blocking key part from a column.
+
+    ``raw`` is the normalized text, ``prefix`` its first ``length``
+    characters, ``soundex``/``nysiis``/``metaphone`` phonetic codes
+    (jellyfish, computed once per distinct value). Missing stays missing.
+    """
+    values = normalize_key(series)
+    if transform == 'raw':
+        return values
+    if transform == 'prefix':
+        return values.str[:length]
+
+    import jellyfish
+
+    encode = {'soundex': jellyfish.soundex, 'nysiis': jellyfish.nysiis, 'metaphone': jellyfish.metaphone}[transform]
+    codes, uniques = pd.factorize(values)
+    encoded = pd.array([encode(value) or None for value in uniques], dtype='string')
+    result = pd.Series(encoded.take(codes, allow_fill=True), index=series.index)
+    return result
+
+
+def derive_key(df: pd.DataFrame, spec: Union[dict, List[dict]]) -> pd.Series:
+    # Parçalar '|' ile birleşir; herhangi bir parça eksikse anahtar eksiktir
+    key = None
+    for part in key_parts(spec):
+        values = transform_key(df[part['column']], part.get('transform', 'raw'), part.get('length', 3))
+        key = values if key is None else key + '|' + values
+    return key.astype(object).where(key.notna(), None)
+
+
+def apply_derived_keys(df: pd.DataFrame, derived_keys: Dict[str, Union[dict, List[dict]]]) -> List[str]:
+    """Add ``indexing.derived_keys`` columns to a loaded table.
+
+    Keys whose source columns are not mapped in this table are skipped.
+    Returns the names of the added columns.
+    """
+    added = []
+    for name, spec in derived_keys.items():
+        if all(part['column'] in df.columns for part in key_parts(spec)):
+            df[name] = derive_key(df, spec)
+            added.append(name)
+    return added
+
+
+def describe_key(spec: Union[dict, List[dict]]) -> str:
+    parts = []
+    for part in key_parts(spec):
+        transform = part.get('transform', 'raw')
+        if transform == 'raw':
+            parts.append(part['column'])
+        elif transform == 'prefix':
+            parts.append(f"{transform}{part.get('length', 3)}({part['column']})")
+        else:
+            parts.append(f"{transform}({part['column']})")
+    return ' + '.join(parts)
@@ -0,0 +1,257 @@
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from blocking_keys import derive_key, describe_key, normalize_key
+from event_log import log
+
+# Fonetik kodlar sadece çoğunlukla harflerden oluşan kolonlarda denenir
+ALPHA_PATTERN = r"^[a-z][a-z '\-]*$"
+
+
+class BlockingProfiler:
+    """Scores blocking key candidates on random samples of the configured tables.
+
+    Candidates are every mapped column plus derived keys (prefixes, phonetic
+    codes and pairs of the best single keys). For each candidate the null
+    rate, distinct values, block size distribution and candidate pair count
+    are estimated from the samples and scaled to the full tables.
+
+    Recall is estimated with anchor pairs: sample record pairs that agree
+    exactly on two other columns. A key is judged only on anchors found
+    through columns it does not use. With too few anchors the key's
+    coverage (share of pairs where both sides have a value) is used.
+    The recommendation is the key with the fewest estimated pairs among
+    those reaching ``recall_target``; if none does, the key with the best
+    harmonic mean of recall and reduction ratio.
+    """
+
+    def __init__(self, db_manager, databases: List[Tuple[str, dict]], sample_size: int = 20000, recall_target: float = 0.9,
+                 seed: int = 0, combine_top: int = 5, min_anchors: int = 20, current_key: Optional[str] = None):
+        self.db_manager = db_manager
+        self.databases = databases
+        self.sample_size = sample_size
+        self.recall_target = recall_target
+        self.seed = seed
+        self.combine_top = combine_top
+        self.min_anchors = min_anchors
+        self.current_key = current_key
+
+        self.samples: Dict[str, Tuple[pd.DataFrame, int]] = {}
+        self.anchors: Dict[tuple, pd.DataFrame] = {}
+        self.results: List[dict] = []
+        self.recommendation: Optional[dict] = None
+
+    def run(self) -> List[dict]:
+        start_time = time.perf_counter()
+
+        for db_name, db_config in self.databases:
+            df, estimated_rows = self.db_manager.load_sample(db_config, self.sample_size, self.seed)
+            exclude = set(db_config.get('exclude_fields', []))
+            self.samples[db_name] = (df.drop(columns=[c for c in df.columns if c in exclude]), estimated_rows)
+            log.info(f"{db_name}: {len(df):,} sampled rows of ~{estimated_rows:,}", event='profile.sample',
+                     database=db_name, sampled=len(df), estimated_rows=estimated_rows)
+
+        names = [db_name for db_name, _ in self.databases]
+        # Tek database: kendi içinde (dedup) çiftler
+        self.pairs = list(itertools.combinations(names, 2)) or [(names[0], names[0])]
+
+        columns = [c for c in self.samples[names[0]][0].columns
+                   if c != 'id' and all(c in self.samples[name][0].columns for name in names)]
+        for pair in self.pairs:
+            self.anchors[pair] = self._anchor_pairs(pair, columns)
+
+        singles = [self._evaluate(name, spec) for name, spec in self._single_candidates(columns)]
+        results = list(singles)
+
+        # En iyi tekli anahtarların ikili birleşimleri (daha küçük bloklar, biraz daha düşük recall)
+        ranked = sorted((r for r in singles if r['recall'] > 0), key=lambda r: (-r['recall'], r['estimated_pairs']))
+        for first, second in itertools.combinations(ranked[:self.combine_top], 2):
+            if set(first['columns']) & set(second['columns']):
+                continue
+            spec = self._parts(first) + self._parts(second)
+            results.append(self._evaluate(f"{first['key']}__{second['key']}", spec))
+
+        self.results = sorted(results, key=lambda r: (r['estimated_pairs'], -r['recall']))
+        self.recommendation = self._recommend()
+        log.info(f"Profiled {len(self.results)} keys in {time.perf_counter() - start_time:.2f}s", event='profile.done',
+                 keys=len(self.results), seconds=round(time.perf_counter() - start_time, 3))
+        return self.results
+
+    def _single_candidates(self, columns: List[str]) -> List[Tuple[str, Optional[list]]]:
+        reference = self.samples[self.databases[0][0]][0]
+        candidates = []
+
+        for column in columns:
+            candidates.append((column, None))
+            if reference[column].dtype != object:
+                continue
+
+            values = normalize_key(reference[column]).dropna()
+            if values.empty:
+                continue
+
+            if values.str.len().mean() > 4:
+                candidates.append((f"{column}_prefix3", [{'column': column, 'transform': 'prefix', 'length': 3}]))
+            if values.str.match(ALPHA_PATTERN).mean() > 0.8:
+                candidates.append((f"{column}_soundex", [{'column': column, 'transform': 'soundex'}]))
+                candidates.append((f"{column}_nysiis", [{'column': column, 'transform': 'nysiis'}]))
+
+        return candidates
+
+    @staticmethod
+    def _parts(result: dict) -> list:
+        # Ham kolon anahtarı birleşimde normalize edilmiş parça olur
+        return result['spec'] or [{'column': result['key'], 'transform': 'raw'}]
+
+    def _key_values(self, db_name: str, key: str, spec: Optional[list]) -> pd.Series:
+        df = self.samples[db_name][0]
+        return df[key] if spec is None else derive_key(df, spec)
+
+    def _anchor_pairs(self, pair: tuple, columns: List[str]) -> pd.DataFrame:
+        """Sample pairs that agree exactly on two (normalized) columns."""
+        left_df, right_df = self.samples[pair[0]][0], self.samples[pair[1]][0]
+        dedup = pair[0] == pair[1]
+
+        usable = []
+        for column in columns:
+            left = normalize_key(left_df[column])
+            # Düşük kardinaliteli kolonlar (eyalet, cinsiyet) tesadüfi eşleşme üretir
+            if left.nunique() >= 0.05 * max(left.notna().sum(), 1):
+                usable.append(column)
+
+        normalized = {side: pd.DataFrame({c: normalize_key(df[c]).astype(object) for c in usable}).assign(_row=np.arange(len(df)))
+                      for side, df in (('left', left_df), ('right', right_df))}
+
+        found = []
+        for first, second in itertools.combinations(usable, 2):
+            left = normalized['left'][[first, second, '_row']].dropna()
+            right = normalized['right'][[first, second, '_row']].dropna()
+            merged = left.merge(right, on=[first, second], suffixes=('_left', '_right'))
+            if dedup:
+                merged = merged[merged['_row_left'] < merged['_row_right']]
+            if len(merged) > 10 * max(len(left_df), len(right_df)):
+                continue  # anahtar gibi davranmayan kolon çifti
+            found.append(pd.DataFrame({'left': merged['_row_left'].to_numpy(), 'right': merged['_row_right'].to_numpy(),
+                                       'first': first, 'second': second}))
+
+        if not found:
+            return pd.DataFrame(columns=['left', 'right', 'first', 'second'])
+        return pd.concat(found, ignore_index=True)
+
+    def _evaluate(self, key: str, spec: Optional[list]) -> dict:
+        key_columns = [key] if spec is None else [part['column'] for part in spec]
+        result = {'key': key, 'spec': spec, 'columns': key_columns, 'description': describe_key(spec) if spec else key,
+                  'estimated_pairs': 0.0, 'total_pairs': 0.0, 'null_rate': 0.0, 'distinct': 0,
+                  'block_p50': 0.0, 'block_p90': 0.0, 'block_max': 0.0}
+        agree, anchors, coverage = 0, 0, []
+
+        values = {}
+        for db_name, _ in self.databases:
+            values[db_name] = self._key_values(db_name, key, spec)
+            result['null_rate'] = max(result['null_rate'], float(values[db_name].isna().mean()))
+            result['distinct'] = max(result['distinct'], int(values[db_name].nunique()))
+
+        block_sizes = []
+        for left_name, right_name in self.pairs:
+            left, right = values[left_name], values[right_name]
+            left_scale = self.samples[left_name][1] / max(len(left), 1)
+            right_scale = self.samples[right_name][1] / max(len(right), 1)
+            left_counts = left.value_counts()
+
+            if left_name == right_name:
+                n_rows = self.samples[left_name][1]
+                result['estimated_pairs'] += float((left_counts * (left_counts - 1) / 2).sum()) * left_scale ** 2
+                result['total_pairs'] += n_rows * (n_rows - 1) / 2
+                block_sizes.append(left_counts.to_numpy() * left_scale)
+            else:
+                right_counts = right.value_counts()
+                shared = left_counts.index.intersection(right_counts.index)
+                result['estimated_pairs'] += float((left_counts[shared] * right_counts[shared]).sum()) * left_scale * right_scale
+                result['total_pairs'] += float(self.samples[left_name][1]) * self.samples[right_name][1]
+                combined = left_counts.mul(left_scale).add(right_counts.mul(right_scale), fill_value=0)
+                block_sizes.append(combined.to_numpy())
+
+            coverage.append(float(left.notna().mean() * right.notna().mean()))
+
+            # Anahtarın kendi kolonları üzerinden bulunan çapalar kullanılmaz
+            pair_anchors = self.anchors[(left_name, right_name)]
+            pair_anchors = pair_anchors[~pair_anchors['first'].isin(key_columns) & ~pair_anchors['second'].isin(key_columns)]
+            pair_anchors = pair_anchors.drop_duplicates(['left', 'right'])
+            if len(pair_anchors):
+                left_keys = left.to_numpy(dtype=object)[pair_anchors['left'].to_numpy(dtype=np.int64)]
+                right_keys = right.to_numpy(dtype=object)[pair_anchors['right'].to_numpy(dtype=np.int64)]
+                agree += int((pd.notna(left_keys) & (left_keys == right_keys)).sum())
+                anchors += len(pair_anchors)
+
+        sizes = np.concatenate(block_sizes) if block_sizes else np.zeros(0)
+        if len(sizes):
+            result.update(block_p50=float(np.percentile(sizes, 50)), block_p90=float(np.percentile(sizes, 90)), block_max=float(sizes.max()))
+
+        if anchors >= self.min_anchors:
+            result.update(recall=agree / anchors, recall_basis=f"{anchors} anchors")
+        else:
+            result.update(recall=float(np.mean(coverage)), recall_basis='coverage')
+
+        result['reduction_ratio'] = 1 - result['estimated_pairs'] / result['total_pairs'] if result['total_pairs'] else 0.0
+        log.debug(f"Key {key}: recall {result['recall']:.3f}, ~{result['estimated_pairs']:,.0f} pairs", event='profile.key',
+                  key=key, recall=result['recall'], estimated_pairs=result['estimated_pairs'])
+        return result
+
+    def _recommend(self) -> Optional[dict]:
+        usable = [r for r in self.results if r['estimated_pairs'] > 0]
+        if not usable:
+            return None
+
+        eligible = [r for r in usable if r['recall'] >= self.recall_target]
+        if eligible:
+            return min(eligible, key=lambda r: (r['estimated_pairs'], -r['recall']))
+
+        # Hedefe ulaşan yoksa recall ile reduction ratio'nun harmonik ortalaması
+        def balance(r):
+            total = r['recall'] + r['reduction_ratio']
+            return 2 * r['recall'] * r['reduction_ratio'] / total if total else 0.0
+        return max(usable, key=balance)
+
+    def recommended_config(self) -> Optional[dict]:
+        if self.recommendation is None:
+            return None
+
+        indexing = {'method': 'block', 'key': self.recommendation['key']}
+        if self.recommendation['spec']:
+            indexing['derived_keys'] = {self.recommendation['key']: self.recommendation['spec']}
+        return {'recordlinkage_config': {'indexing': indexing}}
+
+    def print_report(self):
+        log.result("\nBLOCKING KEY PROFILE:")
+        log.result("=" * 100)
+        log.result(f"{'Key':<32} {'Recall':>7} {'Basis':>12} {'Est. pairs':>14} {'Reduction':>10} {'Null':>6} {'Distinct':>9} {'Block p50/p90/max':>22}")
+
+        for r in self.results:
+            marker = ' *' if r is self.recommendation else ('  (current)' if r['key'] == self.current_key else '')
+            log.result(f"{r['description'][:32]:<32} {r['recall']:>7.3f} {r['recall_basis']:>12} {r['estimated_pairs']:>14,.0f} "
+                       f"{r['reduction_ratio']:>10.4f} {r['null_rate']:>6.2f} {r['distinct']:>9,} "
+                       f"{r['block_p50']:>7,.0f}/{r['block_p90']:,.0f}/{r['block_max']:,.0f}{marker}")
+
+        if self.recommendation is None:
+            log.warning("No blocking key produced candidate pairs")
+            return
+
+        import yaml
+
+        r = self.recommendation
+        log.result(f"\nRecommended: {r['description']} (recall {r['recall']:.3f}, ~{r['estimated_pairs']:,.0f} pairs, "
+                   f"target recall {self.recall_target})", event='profile.recommendation', key=r['key'], recall=r['recall'],
+                   estimated_pairs=r['estimated_pairs'], spec=r['spec'])
+        log.result(yaml.safe_dump(self.recommended_config(), sort_keys=False, default_flow_style=None).rstrip())
+
+    def save_results(self, output_path: str):
+        columns = ['key', 'description', 'recall', 'recall_basis', 'estimated_pairs', 'total_pairs', 'reduction_ratio',
+                   'null_rate', 'distinct', 'block_p50', 'block_p90', 'block_max']
+        table = pd.DataFrame([{c: r[c] for c in columns} for r in self.results])
+        table['recommended'] = [r is self.recommendation for r in self.results]
+        table.to_csv(output_path, index=False)
+        log.info(f"Blocking profile saved: {output_path}")
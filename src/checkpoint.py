@@ -0,0 +1,190 @@
+import os
+import json
+import hashlib
+import sqlite3
+from datetime import datetime
+from typing import Optional, List, Set, TYPE_CHECKING
+
+from event_log import log
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def compute_config_hash(config) -> str:
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def fingerprint_inputs(databases_config: List[dict], limit: Optional[int] = None) -> str:
+    # Dosya yolu, tablo, kolonlar, boyut ve mtime: girdi değişirse yeni run
+    entries = []
+    for db_config in databases_config:
+        path = db_config['path']
+        stat = os.stat(path) if os.path.exists(path) else None
+        entries.append({
+            'name': db_config.get('name'),
+            'path': os.path.abspath(path),
+            'table': db_config['table'],
+            'columns': db_config['columns'],
+            'size': stat.st_size if stat else None,
+            'mtime': stat.st_mtime if stat else None,
+        })
+        if db_config.get('column_types'):
+            entries[-1]['column_types'] = db_config['column_types']
+
+    return compute_config_hash({'inputs': entries, 'limit': limit})
+
+
+class CheckpointManager:
+    """Persists per-pair progress of a run in the results database.
+
+    A run is identified by the config hash and the input fingerprint, so a
+    resumed run only picks up work that was produced from the same config
+    and the same source files. Completed pairs are stored as result tables;
+    the pair that is in progress stores its feature chunks so a resume can
+    skip the chunks that were already compared.
+    """
+
+    MANIFEST_TABLE = '_run_manifest'
+    STAGES_TABLE = '_run_stages'
+
+    def __init__(self, connection: sqlite3.Connection, config_hash: str, input_fingerprint: str, chunk_size: int = 100000):
+        self.connection = connection
+        self.config_hash = config_hash
+        self.input_fingerprint = input_fingerprint
+        self.chunk_size = chunk_size
+        self.run_id = f"{config_hash[:12]}_{input_fingerprint[:12]}"
+
+        self._create_tables()
+
+    def bind(self, connection: sqlite3.Connection) -> 'CheckpointManager':
+        # Aynı run için başka bir bağlantı (ör. ayrı thread'deki kaydedici)
+        return CheckpointManager(connection, self.config_hash, self.input_fingerprint, self.chunk_size)
+
+    def _create_tables(self):
+        self.connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.MANIFEST_TABLE} (
+                run_id TEXT PRIMARY KEY,
+                config_hash TEXT NOT NULL,
+                input_fingerprint TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )""")
+        self.connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.STAGES_TABLE} (
+                run_id TEXT NOT NULL,
+                pair TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                detail TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (run_id, pair, stage)
+            )""")
+        self.connection.commit()
+
+    def _now(self) -> str:
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def _table_name(self, pair: str, suffix: str = 'results') -> str:
+        safe_pair = pair.replace('-', '_').replace(' ', '_')
+        return f"_ckpt_{self.run_id}_{safe_pair}_{suffix}"
+
+    def _table_exists(self, table_name: str) -> bool:
+        cursor = self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,))
+        return cursor.fetchone() is not None
+
+    def start(self, resume: bool = False):
+        row = self.connection.execute(f"SELECT status FROM {self.MANIFEST_TABLE} WHERE run_id = ?", (self.run_id,)).fetchone()
+
+        if resume and row is not None:
+            log.info(f"Resuming run {self.run_id} (previous status: {row[0]})")
+            self.connection.execute(f"UPDATE {self.MANIFEST_TABLE} SET status = 'running', updated_at = ? WHERE run_id = ?", (self._now(), self.run_id))
+            self.connection.commit()
+            return
+
+        if resume:
+            log.info(f"No checkpoint found for run {self.run_id}, starting from scratch")
+
+        # Aynı run_id için eski checkpoint verisini temizle
+        self.clear()
+        now = self._now()
+        self.connection.execute(f"INSERT INTO {self.MANIFEST_TABLE} VALUES (?, ?, ?, 'running', ?, ?)", (self.run_id, self.config_hash, self.input_fingerprint, now, now))
+        self.connection.commit()
+        log.info(f"Checkpointing run {self.run_id}")
+
+    def set_stage(self, pair: str, stage: str, status: str, detail: Optional[dict] = None):
+        self.connection.execute(f"INSERT OR REPLACE INTO {self.STAGES_TABLE} VALUES (?, ?, ?, ?, ?, ?)",
+                                (self.run_id, pair, stage, status, json.dumps(detail or {}, default=str), self._now()))
+        self.connection.commit()
+
+    def get_stage_status(self, pair: str, stage: str) -> Optional[str]:
+        row = self.connection.execute(f"SELECT status FROM {self.STAGES_TABLE} WHERE run_id = ? AND pair = ? AND stage = ?", (self.run_id, pair, stage)).fetchone()
+        return row[0] if row else None
+
+    def is_pair_complete(self, pair: str) -> bool:
+        return self.get_stage_status(pair, 'linkage') == 'complete' and self._table_exists(self._table_name(pair))
+
+    def save_pair_results(self, pair: str, results_df: 'pd.DataFrame'):
+        import pandas as pd
+
+        # Kolonsuz boş sonuç SQLite'a yazılamaz, işaret kolonu ile saklanır
+        frame = results_df if len(results_df.columns) else pd.DataFrame({'_empty': []})
+        frame.to_sql(self._table_name(pair), self.connection, if_exists='replace', index=False)
+
+        # Çift tamamlandı: parça özellikleri artık gerekmiyor
+        self.connection.execute(f"DROP TABLE IF EXISTS {self._table_name(pair, 'features')}")
+        self.set_stage(pair, 'linkage', 'complete', {'matches': len(results_df)})
+
+    def load_pair_results(self, pair: str) -> 'pd.DataFrame':
+        import pandas as pd
+
+        results_df = pd.read_sql_query(f"SELECT * FROM {self._table_name(pair)}", self.connection)
+        return pd.DataFrame() if list(results_df.columns) == ['_empty'] else results_df
+
+    def completed_chunks(self, pair: str) -> Set[int]:
+        table_name = self._table_name(pair, 'features')
+        if not self._table_exists(table_name):
+            return set()
+
+        return {row[0] for row in self.connection.execute(f"SELECT DISTINCT _chunk FROM {table_name}")}
+
+    def save_feature_chunk(self, pair: str, chunk_no: int, features: 'pd.DataFrame'):
+        frame = features.copy()
+        frame.index = frame.index.set_names(['_left', '_right'])
+        frame = frame.reset_index()
+        frame['_chunk'] = chunk_no
+
+        frame.to_sql(self._table_name(pair, 'features'), self.connection, if_exists='append', index=False)
+        self.connection.commit()
+
+    def load_feature_chunks(self, pair: str, chunks: Set[int]) -> 'pd.DataFrame':
+        import pandas as pd
+
+        if not chunks:
+            return pd.DataFrame()
+
+        placeholders = ', '.join('?' for _ in chunks)
+        frame = pd.read_sql_query(f"SELECT * FROM {self._table_name(pair, 'features')} WHERE _chunk IN ({placeholders}) ORDER BY _chunk",
+                                  self.connection, params=sorted(chunks))
+        return frame.drop(columns=['_chunk']).set_index(['_left', '_right'])
+
+    def finish(self, status: str = 'complete'):
+        self.connection.execute(f"UPDATE {self.MANIFEST_TABLE} SET status = ?, updated_at = ? WHERE run_id = ?", (status, self._now(), self.run_id))
+        self.connection.commit()
+
+    def clear(self):
+        # Bu run'a ait tüm checkpoint verisi (tablolar, manifest ve aşama kayıtları)
+        self.cleanup()
+        self.connection.execute(f"DELETE FROM {self.STAGES_TABLE} WHERE run_id = ?", (self.run_id,))
+        self.connection.execute(f"DELETE FROM {self.MANIFEST_TABLE} WHERE run_id = ?", (self.run_id,))
+        self.connection.commit()
+
+    def cleanup(self):
+        # Başarılı run sonrası ara sonuç tablolarını sil, manifest'i koru
+        prefix = f"_ckpt_{self.run_id}_"
+        tables = [row[0] for row in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'") if row[0].startswith(prefix)]
+        for table_name in tables:
+            self.connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+        self.connection.commit()
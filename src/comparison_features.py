@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from recordlinkage.compare import Exact, String, Numeric
+
+from linkage_plan import ComparisonSpec
+from string_encoding import apply_on_unique_pairs, is_encoded, shared_codes
+from string_similarity import batch_algorithm, batch_similarity
+from typed_columns import numeric_similarity, typed_values
+
+
+class TypedNumeric(Numeric):
+    """Numeric/date similarity computed with NumPy on ``float64`` arrays.
+
+    Columns typed at load time (``column_types``) are used as they are;
+    untyped columns are converted on every call (numbers, or dates as days
+    since epoch) so rules still work without type hints.
+    """
+
+    def __init__(self, left_on, right_on, value_type: str = 'numeric', method: str = 'linear', offset: float = 0.0,
+                 scale: float = 1.0, missing_value: float = 0.0, label=None):
+        super().__init__(left_on, right_on, method=method, offset=offset, scale=scale, missing_value=missing_value, label=label)
+        self.value_type = value_type
+
+    def _compute_vectorized(self, s_left, s_right):
+        left = typed_values(s_left, self.value_type)
+        right = typed_values(s_right, self.value_type)
+        return numeric_similarity(left, right, self.method, self.offset, self.scale, self.origin, self.missing_value)
+
+
+class EncodedExact(Exact):
+    """Exact comparison that runs as integer equality on encoded columns.
+
+    Dictionary-encoded (``category``) columns are compared by their codes,
+    mapped into one code space when the two sides have different value
+    tables; plain object columns use the recordlinkage implementation.
+    """
+
+    def _compute_vectorized(self, s_left, s_right):
+        if self.agree_value == 'value' or not (is_encoded(s_left) or is_encoded(s_right)):
+            return super()._compute_vectorized(s_left.astype(object), s_right.astype(object))
+
+        left_codes, right_codes = shared_codes(s_left, s_right)
+        compare = np.where(left_codes == right_codes, self.agree_value, self.disagree_value).astype(np.float64)
+        compare[(left_codes < 0) | (right_codes < 0)] = self.missing_value
+        return compare
+
+
+class EncodedString(String):
+    """String similarity on batches of pairs with a selectable backend.
+
+    Jaro, Jaro-Winkler and (Damerau-)Levenshtein are scored by
+    ``batch_similarity`` (``rapidfuzz`` or a jellyfish loop, same scores as
+    recordlinkage); other algorithms and ``backend: recordlinkage`` use the
+    library. Encoded columns are scored once per distinct value pair.
+    """
+
+    def __init__(self, left_on, right_on, method: str = 'levenshtein', threshold=None, missing_value: float = 0.0,
+                 label=None, backend: str = 'auto'):
+        super().__init__(left_on, right_on, method=method, threshold=threshold, missing_value=missing_value, label=label)
+        self.backend = backend
+
+    def _similarity(self, s_left, s_right):
+        algorithm = batch_algorithm(self.method)
+        if algorithm is None or self.backend == 'recordlinkage':
+            return super()._compute_vectorized(s_left, s_right)
+
+        scores = batch_similarity(algorithm, s_left, s_right, self.backend)
+        missing = np.isnan(scores)
+        if self.threshold is not None:
+            scores = (scores >= self.threshold).astype(np.float64)
+        scores[missing] = self.missing_value
+        return scores
+
+    def _compute_vectorized(self, s_left, s_right):
+        if not (is_encoded(s_left) or is_encoded(s_right)):
+            return self._similarity(s_left, s_right)
+        return apply_on_unique_pairs(s_left, s_right, self._similarity)
+
+
+def build_compare_feature(comp: ComparisonSpec):
+    """Build the recordlinkage feature object for one comparison rule.
+
+    Returns ``None`` for unknown comparison methods so callers can skip them.
+    """
+    field = comp.field
+
+    if comp.method == 'exact':
+        return EncodedExact(field, field, label=comp.label)
+
+    if comp.method == 'string':
+        return EncodedString(field, field, method=comp.algorithm, threshold=comp.threshold, label=comp.label, backend=comp.backend)
+
+    if comp.method in ('numeric', 'date'):
+        # Tarih eşiği gün cinsinden
+        return TypedNumeric(field, field, comp.method, method=comp.scoring, offset=comp.threshold, scale=comp.scale, label=comp.label)
+
+    return None
+
+
+def compute_feature(feature, s_left: pd.Series, s_right: pd.Series) -> np.ndarray:
+    # Hizalanmış (pozisyonel) değer dizileri üzerinde tek özellik
+    s_left = s_left.reset_index(drop=True)
+    s_right = s_right.reset_index(drop=True)
+    result = feature._compute((s_left,), (s_right,))
+    return np.asarray(result, dtype=np.float64)
+
+
+def compute_features_on_positions(features, df_left: pd.DataFrame, df_right: pd.DataFrame, left_positions: np.ndarray, right_positions: np.ndarray) -> dict:
+    # Çiftler pozisyonel int dizileri olarak verilir (MultiIndex / .loc yok)
+    results = {}
+
+    for feature in features:
+        s_left = df_left[feature.labels_left].iloc[left_positions]
+        s_right = df_right[feature.labels_right].iloc[right_positions]
+        results[feature.label] = compute_feature(feature, s_left, s_right)
+
+    return results
@@ -0,0 +1,182 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from comparison_features import build_compare_feature, compute_feature
+from event_log import log
+from linkage_plan import ComparisonSpec, IndexingSpec, LinkagePlan
+from string_encoding import is_encoded
+
+PREPROCESSORS = {
+    'lower': lambda s: s.str.lower(),
+    'strip': lambda s: s.str.strip(),
+    'collapse_spaces': lambda s: s.str.replace(r'\s+', ' ', regex=True),
+    'digits_only': lambda s: s.str.replace(r'\D+', '', regex=True),
+}
+
+
+class PreparedColumnCache:
+    """Per-database prepared comparison columns shared by all pairs.
+
+    A column is keyed by ``(database, field, preprocess steps)`` and stored as
+    a positional NumPy array (a ``Categorical`` for encoded columns), so a
+    database that takes part in several pairs is preprocessed once and every
+    pair only gathers values by position.
+    """
+
+    def __init__(self):
+        self._columns = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db_name: str, df: pd.DataFrame, field_name: str, preprocess: Tuple[str, ...] = ()):
+        key = (db_name, id(df), field_name, preprocess)
+        if key in self._columns:
+            self.hits += 1
+            return self._columns[key]
+
+        self.misses += 1
+        series = df[field_name]
+        if is_encoded(series):
+            values = self._prepare_encoded(series, preprocess)
+            self._columns[key] = values
+            return values
+
+        if preprocess:
+            # Eksik değerler korunur, geri kalanlar metne çevrilip sırayla işlenir
+            missing = series.isna()
+            series = series.astype(str)
+            for step in preprocess:
+                series = PREPROCESSORS[step](series)
+            series = series.mask(missing)
+
+        values = series.to_numpy()
+        self._columns[key] = values
+        return values
+
+    @staticmethod
+    def _prepare_encoded(series: pd.Series, preprocess: Tuple[str, ...]) -> pd.Categorical:
+        # Kodlanmış kolonda ön işleme sadece benzersiz değerlere uygulanır; aynı sonuca
+        # düşen değerler tek koda birleştirilir
+        values = series.array
+        if not preprocess:
+            return values
+
+        categories = pd.Series(values.categories.astype(str))
+        for step in preprocess:
+            categories = PREPROCESSORS[step](categories)
+
+        merged, uniques = pd.factorize(categories.to_numpy(dtype=object))
+        codes = values.codes
+        return pd.Categorical.from_codes(np.where(codes >= 0, merged[codes], -1), categories=uniques)
+
+    def release(self, db_name: str):
+        # Tüm çiftleri biten database'in hazırlanmış kolonları bırakılır
+        for key in [key for key in list(self._columns) if key[0] == db_name]:
+            self._columns.pop(key, None)
+
+    def clear(self):
+        self._columns.clear()
+
+
+@dataclass
+class ComparisonPlan:
+    """Comparison rules of one database pair with its cost estimate."""
+
+    name: str
+    left: str
+    right: str
+    comparisons: List[ComparisonSpec]
+    skipped: Dict[str, str] = field(default_factory=dict)
+    estimated_candidates: int = 0
+    estimated_cost: float = 0.0
+
+    @property
+    def labels(self) -> List[str]:
+        return [comp.label for comp in self.comparisons]
+
+    def compute(self, candidate_links: pd.MultiIndex, df_left: pd.DataFrame, df_right: pd.DataFrame, cache: PreparedColumnCache) -> pd.DataFrame:
+        # Aday çiftler pozisyonlara çevrilir, değerler önbellekteki dizilerden toplanır
+        left_positions = df_left.index.get_indexer(candidate_links.get_level_values(0))
+        right_positions = df_right.index.get_indexer(candidate_links.get_level_values(1))
+
+        features = {}
+        for comp in self.comparisons:
+            feature = build_compare_feature(comp)
+            left_values = cache.get(self.left, df_left, comp.field, comp.preprocess)
+            right_values = cache.get(self.right, df_right, comp.field, comp.preprocess)
+
+            features[feature.label] = compute_feature(feature, pd.Series(left_values[left_positions]), pd.Series(right_values[right_positions]))
+
+        return pd.DataFrame(features, index=candidate_links)
+
+
+def _field_available(df: pd.DataFrame, field_name: str) -> bool:
+    return field_name in df.columns and df[field_name].notna().any()
+
+
+def estimate_candidates(indexing: IndexingSpec, df_left: pd.DataFrame, df_right: pd.DataFrame) -> int:
+    method, key = indexing.method, indexing.key
+    n_left, n_right = len(df_left), len(df_right)
+    full = n_left * n_right
+
+    if method == 'block' and key in df_left.columns and key in df_right.columns:
+        # Blok boyutlarının çarpımı (kesin sayı)
+        left_counts = df_left[key].value_counts()
+        right_counts = df_right[key].value_counts()
+        shared = left_counts.index.intersection(right_counts.index)
+        return int((left_counts[shared] * right_counts[shared]).sum())
+
+    if method == 'sortedneighbourhood':
+        return int(min(full, (n_left + n_right) * (indexing.window // 2)))
+
+    if method == 'ann':
+        return int(min(full, n_left * indexing.top_k))
+
+    return int(full)
+
+
+def build_comparison_plan(linkage_plan: LinkagePlan, left: str, right: str, df_left: pd.DataFrame, df_right: pd.DataFrame, exclude_fields: Optional[Dict[str, List[str]]] = None) -> ComparisonPlan:
+    """Select the comparison rules that both databases of a pair support.
+
+    A rule is skipped when its field is excluded by either database
+    (``exclude_fields`` in the database config) or when one side has no
+    non-null value for it.
+    """
+    exclude_fields = exclude_fields or {}
+    comparisons, skipped = [], {}
+
+    for comp in linkage_plan.comparisons:
+        field_name = comp.field
+
+        if build_compare_feature(comp) is None:
+            skipped[field_name] = f"unknown method {comp.method}"
+        elif field_name in exclude_fields.get(left, []) or field_name in exclude_fields.get(right, []):
+            skipped[field_name] = 'excluded'
+        elif not _field_available(df_left, field_name):
+            skipped[field_name] = f"not mapped in {left}"
+        elif not _field_available(df_right, field_name):
+            skipped[field_name] = f"not mapped in {right}"
+        else:
+            comparisons.append(comp)
+
+    candidates = estimate_candidates(linkage_plan.indexing, df_left, df_right)
+    cost = candidates * sum(comp.cost for comp in comparisons)
+
+    return ComparisonPlan(name=f"{left}_{right}", left=left, right=right, comparisons=comparisons, skipped=skipped,
+                          estimated_candidates=candidates, estimated_cost=cost)
+
+
+def print_plan_summary(plans: List[ComparisonPlan]):
+    log.info("\nCOMPARISON PLANS:")
+    log.info("=" * 60)
+
+    total_cost = sum(plan.estimated_cost for plan in plans) or 1.0
+    for plan in plans:
+        log.info(f"{plan.name}: {len(plan.comparisons)} fields, ~{plan.estimated_candidates:,} candidates, "
+                 f"cost {plan.estimated_cost:,.0f} ({plan.estimated_cost / total_cost * 100:.1f}%)")
+        log.info(f"   Fields: {', '.join(comp.field for comp in plan.comparisons) or '-'}")
+        for field_name, reason in plan.skipped.items():
+            log.info(f"   Skipped {field_name}: {reason}")
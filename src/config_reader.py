@@ -1,27 +1,74 @@
 import yaml
+import copy
 import os
+import re
+from typing import Dict
+from event_log import log
+from linkage_plan import LinkagePlan, compile_plan
+
+# Okunmuş ve doğrulanmış config'ler: (mutlak yol, mtime, boyut) -> config
+_CONFIG_CACHE: Dict[tuple, dict] = {}
+# Derlenmiş planlar: (config dosyası anahtarı, çalışma dizini) -> plan (göreli yollar cwd'ye göre çözülür)
+_PLAN_CACHE: Dict[tuple, LinkagePlan] = {}
+
+
+def config_file_key(config_path: str) -> tuple:
+    stat = os.stat(config_path)
+    return os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size
+
 
 class ConfigReader:
     def __init__(self, config_path: str):
         self.config_path = config_path
         self.config = {}
 
-        print(f"Config file is being read: {config_path}")
+        log.info(f"Config file is being read: {config_path}")
         
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Config file not found: {config_path}")
-        
+
+        # Aynı dosya (değişmediyse) tekrar okunup doğrulanmaz
+        self.file_key = config_file_key(config_path)
+        if self.file_key in _CONFIG_CACHE:
+            self.config = copy.deepcopy(_CONFIG_CACHE[self.file_key])
+            log.info("Config file already validated, using the cached copy")
+            # Database dosyaları config'ten bağımsız değişebilir; ucuz varlık kontrolü her seferinde yapılır
+            self._check_database_files()
+            return
+
         self._load_config()
         
         # Yeni çoklu database sistemini kontrol et
         if 'databases' in self.config:
             self._validate_multi_database_config()
-            print("Multi-database configuration detected")
+            log.info("Multi-database configuration detected")
         else:
             self._validate_config()
-            print("classic two-database configuration detected")
-        
-        print("Config file read successfully")
+            log.info("classic two-database configuration detected")
+        self._check_database_files()
+
+        _CONFIG_CACHE[self.file_key] = copy.deepcopy(self.config)
+        log.info("Config file read successfully")
+
+    def get_plan(self) -> LinkagePlan:
+        # Plan dosya ve çalışma dizini başına bir kez derlenir; tüm aşamalar aynı nesneyi paylaşır
+        key = (self.file_key, os.getcwd())
+        if key not in _PLAN_CACHE:
+            _PLAN_CACHE[key] = compile_plan(self.config, self.get_results_database_path())
+            plan = _PLAN_CACHE[key]
+            log.info(f"Linkage plan compiled: {len(plan.databases)} databases, {len(plan.sides)} comparisons, "
+                     f"{len(plan.comparisons)} rules",
+                     event='plan.compiled', digest=plan.digest[:12], comparisons=len(plan.sides))
+        return _PLAN_CACHE[key]
+
+    def _check_database_files(self):
+        if 'databases' in self.config:
+            db_configs = self.config['databases']
+        else:
+            db_configs = [self.config['source_database'], self.config['target_database']]
+        for db_config in db_configs:
+            if not os.path.exists(db_config['path']):
+                log.warning(f"Warn: Database file not found: {db_config['path']}")
     
     def _load_config(self):
         try:
@@ -34,7 +81,7 @@ class ConfigReader:
             raise Exception(f"File read ERROR: {e}")
     
     def _validate_config(self):
-        print("Configuration is being checked...")
+        log.info("Configuration is being checked...")
         
         # Zorunlu alanlar
         required_fields = [
@@ -53,11 +100,23 @@ class ConfigReader:
         
         # recordlinkage config kontrolleri
         self._validate_recordlinkage_config()
-        
-        print("Configuration valid")
+        self._validate_prepare_config()
+        self._validate_validation_config()
+        self._validate_checkpoint_config()
+        self._validate_pipeline_config()
+        self._validate_resources_config()
+        self._validate_sweep_config()
+        self._validate_evaluation_config()
+        self._validate_output_config()
+        self._validate_logging_config()
+        self._validate_distributed_config()
+        self._validate_string_encoding_config()
+        self._validate_connection_config(self.config.get('connections', {}), 'connections')
+        
+        log.info("Configuration valid")
 
     def _validate_multi_database_config(self):
-        print("Multi-database configuration is being validated...")
+        log.info("Multi-database configuration is being validated...")
         
         # Zorunlu alanlar
         required_fields = [
@@ -88,8 +147,20 @@ class ConfigReader:
         
         # recordlinkage config kontrolleri
         self._validate_recordlinkage_config()
-        
-        print("Multi-database configuration valid")
+        self._validate_prepare_config()
+        self._validate_validation_config()
+        self._validate_checkpoint_config()
+        self._validate_pipeline_config()
+        self._validate_resources_config()
+        self._validate_sweep_config()
+        self._validate_evaluation_config()
+        self._validate_output_config()
+        self._validate_logging_config()
+        self._validate_distributed_config()
+        self._validate_string_encoding_config()
+        self._validate_connection_config(self.config.get('connections', {}), 'connections')
+        
+        log.info("Multi-database configuration valid")
     
     def _validate_single_database_config(self, db_config: dict, context: str):
         # Zorunlu alanlar
@@ -98,15 +169,30 @@ class ConfigReader:
             if field not in db_config:
                 raise ValueError(f"{context}.{field} missing")
         
-        db_path = db_config['path']
-        if not os.path.exists(db_path):
-            print(f"Warn: Database file not found: {db_path}")
-        
         # Columns alt alanları
         columns = db_config['columns']
         if not isinstance(columns, dict) or len(columns) == 0:
             raise ValueError(f"{context}.columns empty or invalid")
 
+        if not isinstance(db_config.get('exclude_fields', []), list):
+            raise ValueError(f"{context}.exclude_fields should be a list")
+
+        self._validate_connection_config(db_config.get('connection', {}), f"{context}.connection")
+
+        self._validate_column_types(db_config, context)
+
+    def _validate_column_types(self, db_config: dict, context: str):
+        column_types = db_config.get('column_types', {})
+        if not isinstance(column_types, dict):
+            raise ValueError(f"{context}.column_types should be a mapping")
+
+        for column, spec in column_types.items():
+            column_type = spec.get('type') if isinstance(spec, dict) else spec
+            if column_type not in ['numeric', 'date']:
+                raise ValueError(f"Invalid column type for {context}.{column}: {column_type}")
+            if column not in db_config['columns']:
+                raise ValueError(f"{context}.column_types.{column} is not a mapped column")
+
     def _validate_database_config(self, db_key: str):
         db_config = self.config[db_key]
         
@@ -116,14 +202,12 @@ class ConfigReader:
             if field not in db_config:
                 raise ValueError(f"{db_key}.{field} missing")
         
-        db_path = db_config['path']
-        if not os.path.exists(db_path):
-            print(f"Warn: Database file not found: {db_path}")
-        
         # Columns alt alanları
         columns = db_config['columns']
         if not isinstance(columns, dict) or len(columns) == 0:
             raise ValueError(f"{db_key}.columns empty or invalid")
+
+        self._validate_column_types(db_config, db_key)
     
     def _validate_recordlinkage_config(self):
 
@@ -132,11 +216,40 @@ class ConfigReader:
         # Indexing kontrolleri
         if 'indexing' in rl_config:
             indexing = rl_config['indexing']
-            valid_methods = ['block', 'sortedneighbourhood', 'full']
+            valid_methods = ['block', 'sortedneighbourhood', 'full', 'ann']
             
             if 'method' in indexing:
                 if indexing['method'] not in valid_methods:
                     raise ValueError(f"Invalid indexing method: {indexing['method']}")
+
+            if indexing.get('method') == 'sortedneighbourhood':
+                window = indexing.get('window', 3)
+                if not isinstance(window, int) or window < 1 or window % 2 == 0:
+                    raise ValueError(f"sortedneighbourhood window must be a positive odd integer: {window}")
+
+                if indexing.get('engine', 'numpy') not in ['numpy', 'recordlinkage']:
+                    raise ValueError(f"Invalid sortedneighbourhood engine: {indexing['engine']}")
+
+            if indexing.get('method') == 'ann':
+                if indexing.get('algorithm', 'tfidf') not in ['tfidf', 'minhash']:
+                    raise ValueError(f"Invalid ann algorithm: {indexing['algorithm']}")
+
+                if not 0 <= indexing.get('threshold', 0.5) <= 1:
+                    raise ValueError("ann threshold should be between 0 and 1")
+
+            # Türetilmiş anahtarlar: ad -> {column, transform, length} veya bunların listesi
+            derived_keys = indexing.get('derived_keys', {})
+            if not isinstance(derived_keys, dict):
+                raise ValueError("indexing.derived_keys should be a mapping")
+            for name, spec in derived_keys.items():
+                parts = [spec] if isinstance(spec, dict) else spec
+                if not isinstance(parts, list) or not parts:
+                    raise ValueError(f"indexing.derived_keys.{name} should be a mapping or a non-empty list")
+                for part in parts:
+                    if not isinstance(part, dict) or 'column' not in part:
+                        raise ValueError(f"indexing.derived_keys.{name}: every part needs a column")
+                    if part.get('transform', 'raw') not in ['raw', 'prefix', 'soundex', 'nysiis', 'metaphone']:
+                        raise ValueError(f"indexing.derived_keys.{name}: invalid transform {part['transform']}")
         
         # Comparison kontrolleri
         if 'comparison' in rl_config:
@@ -147,7 +260,33 @@ class ConfigReader:
             for comp in comparison:
                 if 'field' not in comp or 'method' not in comp:
                     raise ValueError("comparison should contain field and method")
-        
+
+                for step in comp.get('preprocess', []):
+                    if step not in ['lower', 'strip', 'collapse_spaces', 'digits_only']:
+                        raise ValueError(f"Invalid preprocess step for {comp['field']}: {step}")
+
+                if comp['method'] == 'string' and comp.get('backend', 'auto') not in ['auto', 'rapidfuzz', 'python', 'recordlinkage']:
+                    raise ValueError(f"Invalid string backend for {comp['field']}: {comp['backend']}")
+                if comp['method'] == 'string' and comp.get('backend') == 'rapidfuzz':
+                    from string_similarity import rapidfuzz_available
+                    if not rapidfuzz_available():
+                        raise ValueError(f"{comp['field']}: string backend 'rapidfuzz' requires rapidfuzz>=3.6 (pip install rapidfuzz)")
+
+                if comp['method'] in ['numeric', 'date']:
+                    if comp.get('scoring', 'linear') not in ['step', 'linear', 'squared', 'exp', 'gauss']:
+                        raise ValueError(f"Invalid numeric scoring for {comp['field']}: {comp['scoring']}")
+                    if comp.get('threshold', 0) < 0 or comp.get('scale', 1.0) <= 0:
+                        raise ValueError(f"{comp['field']}: threshold must be >= 0 and scale > 0")
+
+        # Feature store kontrolleri
+        if 'feature_store' in rl_config:
+            feature_store = rl_config['feature_store']
+            if not isinstance(feature_store, dict):
+                raise ValueError("feature_store should be a mapping")
+
+            if not isinstance(feature_store.get('path', ''), str):
+                raise ValueError("feature_store.path should be a string")
+
         # Classification kontrolleri
         if 'classification' in rl_config:
             classification = rl_config['classification']
@@ -156,6 +295,212 @@ class ConfigReader:
             if 'method' in classification:
                 if classification['method'] not in valid_methods:
                     raise ValueError(f"Invalid classification method: {classification['method']}")
+
+    def _validate_validation_config(self):
+        validation = self.config.get('validation', {})
+        if not validation:
+            return
+
+        if not isinstance(validation, dict):
+            raise ValueError("validation should be a mapping")
+
+        if validation.get('mode', 'exact') not in ['exact', 'fast']:
+            raise ValueError(f"Invalid validation.mode: {validation['mode']}")
+
+    def _validate_checkpoint_config(self):
+        checkpoint = self.config.get('checkpoint', {})
+        if not checkpoint:
+            return
+
+        if not isinstance(checkpoint, dict):
+            raise ValueError("checkpoint should be a mapping")
+
+        chunk_size = checkpoint.get('chunk_size', 100000)
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("checkpoint.chunk_size should be a positive integer")
+
+    def _validate_resources_config(self):
+        resources = self.config.get('resources', {})
+        if not resources:
+            return
+
+        if not isinstance(resources, dict):
+            raise ValueError("resources should be a mapping")
+
+        memory_limit = resources.get('memory_limit')
+        if memory_limit is not None and not re.fullmatch(r'\s*[\d.]+\s*([KMG]B?|B)?\s*', str(memory_limit), re.IGNORECASE):
+            raise ValueError(f"Invalid resources.memory_limit: {memory_limit} (e.g. 512MB, 4GB)")
+
+        if not 0 < resources.get('target_fraction', 0.5) <= 1:
+            raise ValueError("resources.target_fraction should be between 0 and 1")
+
+        for key in ['min_chunk', 'max_chunk']:
+            value = resources.get(key, 1)
+            if not isinstance(value, int) or value <= 0:
+                raise ValueError(f"resources.{key} should be a positive integer")
+
+    def _validate_pipeline_config(self):
+        pipeline = self.config.get('pipeline', {})
+        if not pipeline:
+            return
+
+        if not isinstance(pipeline, dict):
+            raise ValueError("pipeline should be a mapping")
+
+        if pipeline.get('mode', 'sequential') not in ['sequential', 'async']:
+            raise ValueError(f"Invalid pipeline.mode: {pipeline['mode']}")
+
+        for key in ['queue_size', 'load_workers', 'link_workers', 'export_workers']:
+            value = pipeline.get(key, 1)
+            if not isinstance(value, int) or value <= 0:
+                raise ValueError(f"pipeline.{key} should be a positive integer")
+
+    def _validate_logging_config(self):
+        logging_config = self.config.get('logging', {})
+        if not logging_config:
+            return
+
+        if not isinstance(logging_config, dict):
+            raise ValueError("logging should be a mapping")
+
+        if logging_config.get('level', 'info') not in ['debug', 'info', 'warning', 'error']:
+            raise ValueError(f"Invalid logging.level: {logging_config['level']}")
+
+        if logging_config.get('format', 'text') not in ['text', 'json']:
+            raise ValueError(f"Invalid logging.format: {logging_config['format']}")
+
+        interval = logging_config.get('progress_interval', 1.0)
+        if not isinstance(interval, (int, float)) or interval < 0:
+            raise ValueError("logging.progress_interval should be a non-negative number")
+
+    def _validate_distributed_config(self):
+        distributed = self.config.get('distributed', {})
+        if not distributed:
+            return
+
+        if not isinstance(distributed, dict):
+            raise ValueError("distributed should be a mapping")
+
+        if distributed.get('partitioning', 'pair') not in ['pair', 'key_hash']:
+            raise ValueError(f"Invalid distributed.partitioning: {distributed['partitioning']}")
+
+        for key in ['workers', 'port', 'max_retries', 'task_timeout']:
+            value = distributed.get(key, 0)
+            if not isinstance(value, int) or value < 0:
+                raise ValueError(f"distributed.{key} should be a non-negative integer")
+
+        if not isinstance(distributed.get('shared_memory', True), bool):
+            raise ValueError("distributed.shared_memory should be true or false")
+
+        partitions = distributed.get('partitions', 1)
+        if not isinstance(partitions, int) or partitions <= 0:
+            raise ValueError("distributed.partitions should be a positive integer")
+
+        if distributed.get('enabled', False) and self.config.get('pipeline', {}).get('mode') == 'async':
+            raise ValueError("distributed.enabled and pipeline.mode: async cannot be used together")
+
+    def _validate_connection_config(self, connections: dict, context: str):
+        if not connections:
+            return
+
+        if not isinstance(connections, dict):
+            raise ValueError(f"{context} should be a mapping")
+
+        for key in ['read_only', 'immutable']:
+            if not isinstance(connections.get(key, True), bool):
+                raise ValueError(f"{context}.{key} should be true or false")
+
+        pool_size = connections.get('pool_size', 1)
+        if not isinstance(pool_size, int) or pool_size <= 0:
+            raise ValueError(f"{context}.pool_size should be a positive integer")
+
+        pragmas = connections.get('pragmas', {})
+        if not isinstance(pragmas, dict):
+            raise ValueError(f"{context}.pragmas should be a mapping")
+        for name, value in pragmas.items():
+            # PRAGMA adı ve değeri SQL'e yazıldığı için sadece basit değerler
+            if not re.fullmatch(r'[a-z_]+', str(name)) or not re.fullmatch(r'-?[\w.]+', str(value)):
+                raise ValueError(f"Invalid {context}.pragmas entry: {name}: {value}")
+
+    def _validate_string_encoding_config(self):
+        encoding = self.config.get('string_encoding', {})
+        if not encoding:
+            return
+
+        if not isinstance(encoding, dict):
+            raise ValueError("string_encoding should be a mapping")
+
+        if not isinstance(encoding.get('enabled', False), bool):
+            raise ValueError("string_encoding.enabled should be true or false")
+
+        ratio = encoding.get('max_unique_ratio', 0.5)
+        if not isinstance(ratio, (int, float)) or not 0 < ratio <= 1:
+            raise ValueError("string_encoding.max_unique_ratio should be between 0 and 1")
+
+        if not isinstance(encoding.get('columns', []), list):
+            raise ValueError("string_encoding.columns should be a list")
+
+    def _validate_sweep_config(self):
+        sweep = self.config.get('sweep', {})
+        if not sweep:
+            return
+
+        if not isinstance(sweep, dict):
+            raise ValueError("sweep should be a mapping")
+
+        thresholds = sweep.get('thresholds')
+        if thresholds is not None and not isinstance(thresholds, (list, dict)):
+            raise ValueError("sweep.thresholds should be a list or a start/stop/step mapping")
+
+        for name in sweep.get('classifiers', []):
+            if name not in ['ecm', 'svm', 'kmeans']:
+                raise ValueError(f"Invalid sweep classifier: {name}")
+
+        for comparison_name, truth in sweep.get('ground_truth', {}).items():
+            if not isinstance(truth, dict) or not ('dataset' in truth or 'csv' in truth):
+                raise ValueError(f"sweep.ground_truth.{comparison_name} needs 'dataset' or 'csv'")
+
+    def _validate_evaluation_config(self):
+        evaluation = self.config.get('evaluation', {})
+        if not evaluation:
+            return
+
+        if not isinstance(evaluation, dict) or not isinstance(evaluation.get('ground_truth', {}), dict):
+            raise ValueError("evaluation.ground_truth should be a mapping of comparison names")
+
+        for comparison_name, truth in evaluation.get('ground_truth', {}).items():
+            if not isinstance(truth, dict) or not ('dataset' in truth or 'csv' in truth):
+                raise ValueError(f"evaluation.ground_truth.{comparison_name} needs 'dataset' or 'csv'")
+
+        if not isinstance(evaluation.get('pair_completeness', True), bool):
+            raise ValueError("evaluation.pair_completeness should be true or false")
+
+    def _validate_output_config(self):
+        output = self.config.get('output', {})
+        result_format = output.get('result_format', 'wide')
+        if result_format not in ['wide', 'compact']:
+            raise ValueError(f"Invalid output.result_format: {result_format}")
+
+        if result_format == 'compact':
+            # Kompakt sonuçlar kaynak kayıtlara kimlik kolonuyla bağlanır
+            databases = self.config.get('databases') or [self.config[key] for key in ('source_database', 'target_database')]
+            for db_config in databases:
+                if 'id' not in db_config['columns']:
+                    raise ValueError(f"output.result_format 'compact' needs an 'id' column mapping ({db_config.get('name', db_config['table'])})")
+
+    def _validate_prepare_config(self):
+        prepare = self.config.get('prepare', {})
+        if not prepare:
+            return
+
+        if not isinstance(prepare, dict):
+            raise ValueError("prepare should be a mapping")
+
+        if prepare.get('index_target', 'inplace') not in ['inplace', 'sidecar']:
+            raise ValueError(f"Invalid prepare.index_target: {prepare['index_target']}")
+
+        if not isinstance(prepare.get('tracking_columns', []), list):
+            raise ValueError("prepare.tracking_columns should be a list")
     
     def is_multi_database_config(self) -> bool:
         return 'databases' in self.config
@@ -197,6 +542,39 @@ class ConfigReader:
     def get_output_config(self):
         return self.config.get('output', {})
     
+    def get_prepare_config(self):
+        return self.config.get('prepare', {})
+
+    def get_validation_config(self):
+        return self.config.get('validation', {})
+
+    def get_checkpoint_config(self):
+        return self.config.get('checkpoint', {})
+
+    def get_resources_config(self):
+        return self.config.get('resources', {})
+
+    def get_pipeline_config(self):
+        return self.config.get('pipeline', {})
+
+    def get_logging_config(self):
+        return self.config.get('logging', {})
+
+    def get_distributed_config(self):
+        return self.config.get('distributed', {})
+
+    def get_connections_config(self):
+        return self.config.get('connections', {})
+
+    def get_string_encoding_config(self):
+        return self.config.get('string_encoding', {})
+
+    def get_sweep_config(self):
+        return self.config.get('sweep', {})
+
+    def get_evaluation_config(self):
+        return self.config.get('evaluation', {})
+
     def get_project_info(self):
         return {
             'name': self.config.get('project_name', 'Unnamed Project'),
@@ -215,13 +593,13 @@ class ConfigReader:
         return fields
     
     def print_summary(self):
-        print("\nCONFIGURATION SUMMARY:")
-        print("=" * 50)
+        log.info("\nCONFIGURATION SUMMARY:")
+        log.info("=" * 50)
         
         # Proje bilgileri
         project_info = self.get_project_info()
-        print(f"Project: {project_info['name']}")
-        print(f"Description: {project_info['description']}")
+        log.info(f"Project: {project_info['name']}")
+        log.info(f"Description: {project_info['description']}")
         
         if self.is_multi_database_config():
             self._print_multi_database_summary()
@@ -231,16 +609,16 @@ class ConfigReader:
     def _print_multi_database_summary(self):
         databases = self.get_databases()
         
-        print(f"\nDATABASES ({len(databases)} databases):")
+        log.info(f"\nDATABASES ({len(databases)} databases):")
         for i, db in enumerate(databases, 1):
-            print(f"{i}. {db['name']}: {db['path']} -> {db['table']}")
+            log.info(f"{i}. {db['name']}: {db['path']} -> {db['table']}")
         
         # Kolon eşleştirmeleri (ilk database'den örnek)
         if databases:
-            print(f"\nCOLUMN MAPPINGS (example from {databases[0]['name']}):")
+            log.info(f"\nCOLUMN MAPPINGS (example from {databases[0]['name']}):")
             cols = databases[0]['columns']
             for logical_name, physical_name in cols.items():
-                print(f"  {logical_name} -> {physical_name}")
+                log.info(f"  {logical_name} -> {physical_name}")
         
         self._print_recordlinkage_summary()
     
@@ -249,43 +627,43 @@ class ConfigReader:
         source_db = self.get_source_database()
         target_db = self.get_target_database()
         
-        print(f"\nDATABASES:")
-        print(f"Source: {source_db['path']} -> {source_db['table']}")
-        print(f"Target: {target_db['path']} -> {target_db['table']}")
+        log.info(f"\nDATABASES:")
+        log.info(f"Source: {source_db['path']} -> {source_db['table']}")
+        log.info(f"Target: {target_db['path']} -> {target_db['table']}")
         
         # Kolon eşleştirmeleri
-        print(f"\n🔗 KOLON EŞLEŞTİRMELERİ:")
-        print("Source Column -> Target Column")
+        log.info(f"\n🔗 KOLON EŞLEŞTİRMELERİ:")
+        log.info("Source Column -> Target Column")
         
         source_cols = source_db['columns']
         target_cols = target_db['columns']
         
         for logical_name in source_cols:
             if logical_name in target_cols:
-                print(f"  {source_cols[logical_name]} -> {target_cols[logical_name]}")
+                log.info(f"  {source_cols[logical_name]} -> {target_cols[logical_name]}")
         
         self._print_recordlinkage_summary()
     
     def _print_recordlinkage_summary(self):
         rl_config = self.get_recordlinkage_config()
-        print(f"\nRECORDLINKAGE SETTINGS:")
+        log.info(f"\nRECORDLINKAGE SETTINGS:")
         
         if 'indexing' in rl_config:
             indexing = rl_config['indexing']
-            print(f"Indexing: {indexing.get('method', 'default')} (key: {indexing.get('key', 'N/A')})")
+            log.info(f"Indexing: {indexing.get('method', 'default')} (key: {indexing.get('key', 'N/A')})")
         
         if 'comparison' in rl_config:
-            print(f"Comparison Rules: {len(rl_config['comparison'])} unit")
+            log.info(f"Comparison Rules: {len(rl_config['comparison'])} unit")
             for i, comp in enumerate(rl_config['comparison'], 1):
                 method = comp.get('method', 'unknown')
                 field = comp.get('field', 'unknown')
-                print(f"  {i}. {field}: {method}")
+                log.info(f"  {i}. {field}: {method}")
         
         if 'classification' in rl_config:
             classification = rl_config['classification']
             method = classification.get('method', 'threshold')
             threshold = classification.get('threshold', 0.7)
-            print(f"Classification: {method} (threshold: {threshold})")
+            log.info(f"Classification: {method} (threshold: {threshold})")
 
     def get_results_database_path(self):
         output_config = self.get_output_config()
@@ -302,6 +680,6 @@ class ConfigReader:
         try:
             os.makedirs(os.path.dirname(results_path), exist_ok=True)
         except Exception as e:
-            print(f"Warning: Could not create results directory: {e}")
+            log.warning(f"Warning: Could not create results directory: {e}")
         
         return results_path
\ No newline at end of file
@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+# Kaynak database'ler sadece okunur: büyük mmap ve sayfa önbelleği, geçici tablolar bellekte
+DEFAULT_PRAGMAS = {'mmap_size': 268435456, 'cache_size': -65536, 'temp_store': 'MEMORY'}
+DEFAULT_SETTINGS = {'read_only': True, 'immutable': True, 'pool_size': 4, 'pragmas': DEFAULT_PRAGMAS}
+
+
+def connection_settings(connections_config: Optional[dict], db_config: Optional[dict] = None) -> dict:
+    # Genel ayarlar (connections) üzerine database'e özel ayarlar (databases[].connection)
+    settings = dict(DEFAULT_SETTINGS, **(connections_config or {}))
+    settings['pragmas'] = dict(DEFAULT_PRAGMAS, **(connections_config or {}).get('pragmas', {}))
+
+    override = (db_config or {}).get('connection', {})
+    settings.update({k: v for k, v in override.items() if k != 'pragmas'})
+    settings['pragmas'].update(override.get('pragmas', {}))
+    return settings
+
+
+def source_uri(path: str, read_only: bool = True, immutable: bool = True) -> str:
+    """SQLite URI of a source database.
+
+    ``mode=ro`` refuses writes; ``immutable=1`` also skips file locking and
+    change detection, so it must only be used for files nobody writes to
+    during the run.
+    """
+    params = []
+    if read_only:
+        params.append('mode=ro')
+        if immutable:
+            params.append('immutable=1')
+    uri = f"file:{quote(os.path.abspath(path))}"
+    return f"{uri}?{'&'.join(params)}" if params else uri
+
+
+def open_source_connection(path: str, settings: dict) -> sqlite3.Connection:
+    # Tuple satırlar (row_factory yok): toplu okumada sqlite3.Row nesnesi üretilmez
+    connection = sqlite3.connect(source_uri(path, settings.get('read_only', True), settings.get('immutable', True)),
+                                 uri=True, check_same_thread=False)
+    for name, value in settings.get('pragmas', {}).items():
+        value = f"'{value}'" if isinstance(value, str) and not value.isalnum() else value
+        connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
+
+class ConnectionPool:
+    """Reusable source connections shared by pipeline stages and threads.
+
+    One pool per database file and settings. ``connection()`` lends an idle
+    connection (or opens a new one) for the duration of a ``with`` block;
+    up to ``pool_size`` idle connections are kept for the next borrower.
+    ``checkout`` hands out a connection until ``close_all``. Connections
+    are opened with ``check_same_thread=False`` and are used by one thread
+    at a time.
+    """
+
+    def __init__(self, path: str, settings: dict):
+        self.path = path
+        self.settings = settings
+        self.size = max(1, settings.get('pool_size', 4))
+        self._idle: List[sqlite3.Connection] = []
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def _acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+
+        connection = open_source_connection(self.path, self.settings)
+        with self._lock:
+            self.opened += 1
+            self._all.append(connection)
+        return connection
+
+    def _release(self, connection: sqlite3.Connection):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+            self._all.remove(connection)
+        connection.close()
+
+    @contextmanager
+    def connection(self):
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._release(connection)
+
+    def checkout(self) -> sqlite3.Connection:
+        return self._acquire()
+
+    def checkin(self, connection: sqlite3.Connection):
+        self._release(connection)
+
+    def close_all(self):
+        with self._lock:
+            connections, self._all, self._idle = self._all, [], []
+        for connection in connections:
+            connection.close()
+
+
+class ConnectionFactory:
+    # Database dosyası + ayarlar -> havuz; tüm aşamalar aynı fabrikayı kullanır
+    def __init__(self, connections_config: Optional[dict] = None):
+        self.connections_config = connections_config or {}
+        self._pools: Dict[tuple, ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def pool(self, db_config: dict) -> ConnectionPool:
+        settings = connection_settings(self.connections_config, db_config)
+        key = (os.path.abspath(db_config['path']), repr(sorted(settings.items())))
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = ConnectionPool(db_config['path'], settings)
+            return self._pools[key]
+
+    def connection(self, db_config: dict):
+        return self.pool(db_config).connection()
+
+    def stats(self) -> Dict[str, dict]:
+        return {pool.path: {'opened': pool.opened, 'reused': pool.reused} for pool in self._pools.values()}
+
+    def close_all(self):
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close_all()
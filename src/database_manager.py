@@ -1,7 +1,48 @@
 import sqlite3
-import pandas as pd
 import os
-from typing import Optional, Dict, List
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, TYPE_CHECKING
+
+from connection_pool import ConnectionFactory
+from event_log import log, NULL_PROGRESS
+
+# İlerleme raporlanırken sonuçlar bu boyutta batch'lerle yazılır (bellek bütçesi yoksa)
+SAVE_BATCH_ROWS = 100000
+
+# Sonuç tabloları kaydı: tablo başına kimlik kolonları ve skor özeti (find_matches bu tabloyu kullanır)
+RESULT_SUMMARY_TABLE = '_result_summary'
+
+# Ground truth metrikleri: karşılaştırma başına bir satır (report komutu tekrar hesaplamadan okur)
+EVALUATION_TABLE = '_evaluation'
+EVALUATION_METRICS = ('true_links', 'matches', 'true_positives', 'precision', 'recall', 'f1', 'true_candidates',
+                      'pair_completeness', 'candidate_pairs', 'total_possible_pairs', 'reduction_ratio')
+
+# SQLite'ın rowid takma adları: tablo şemasında görünmezler ama her rowid tablosunda vardır
+ROWID_ALIASES = ('rowid', '_rowid_', 'oid')
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from linkage_plan import DatabaseSpec
+
+
+def result_id_columns(comparison_name: str, columns) -> Optional[tuple]:
+    # Sonuç tablosunun (tür, sol db, sağ db) bilgisi: link tabloları <sol>_id/<sağ>_id, dedup tabloları group_id/<db>_id taşır
+    columns = set(columns)
+    if comparison_name.endswith('_dedup'):
+        db_name = comparison_name[:-len('_dedup')]
+        if 'group_id' in columns and f'{db_name}_id' in columns:
+            return 'dedup', db_name, None
+
+    # Database adları '_' içerebilir: her ayrım noktası denenir
+    for position, char in enumerate(comparison_name):
+        if char == '_':
+            left, right = comparison_name[:position], comparison_name[position + 1:]
+            if f'{left}_id' in columns and f'{right}_id' in columns:
+                return 'link', left, right
+
+    return None
 
 
 class DatabaseManager:
@@ -13,31 +54,45 @@ class DatabaseManager:
         # Çoklu database sistemi için
         self.database_connections = {}  # name -> connection mapping
 
-        print("Database magnager started")
+        # Doğrulama sonuçları ve kayıt sayısı önbelleği
+        self.table_infos = {}  # name -> table info
+        self.row_count_cache_path = None
+
+        # Bellek bütçesi (resources.memory_limit): kayıt/export batch boyutları
+        self.memory_budget = None
+
+        # Metin kolonlarının sözlük kodlaması (string_encoding): kolon seçimi ve hariç tutulanlar
+        self.string_encoding = None
+
+        # Türetilmiş blocking anahtarları (indexing.derived_keys): ad -> parça tanımları
+        self.derived_keys = None
+
+        # Kaynak bağlantıları (connections): salt okunur URI, PRAGMA'lar ve havuz
+        self.connection_factory = ConnectionFactory()
+
+        log.info("Database magnager started")
 
     def connect_databases(self, source_config, target_config, results_db_path=None):
-        print("Connecting to databases...")
+        log.info("Connecting to databases...")
 
         # Source database
         source_path = source_config['path']
         if not os.path.exists(source_path):
             raise FileNotFoundError(f"Source database not found: {source_path}")
 
-        self.source_connection = sqlite3.connect(source_path)
-        self.source_connection.row_factory = sqlite3.Row
-        print(f"Source database connected: {source_path}")
+        self.source_connection = self.connection_factory.pool(source_config).checkout()
+        log.info(f"Source database connected: {source_path}")
 
         # Target database
         target_path = target_config['path']
         if not os.path.exists(target_path):
             raise FileNotFoundError(f"Target database not found: {target_path}")
 
-        self.target_connection = sqlite3.connect(target_path)
-        self.target_connection.row_factory = sqlite3.Row
-        print(f"Target database connected: {target_path}")
+        self.target_connection = self.connection_factory.pool(target_config).checkout()
+        log.info(f"Target database connected: {target_path}")
 
         # Results database (otomatik oluştur veya var olanı kullan)
-        results_path = "../data/results.db"
+        results_path = results_db_path or "../data/results.db"
         os.makedirs(os.path.dirname(results_path), exist_ok=True)
 
         # Güvenli bağlantı - dosya var olsa bile hata vermez
@@ -45,18 +100,18 @@ class DatabaseManager:
             self.results_connection = sqlite3.connect(results_path)
             self.results_connection.row_factory = sqlite3.Row
             if os.path.exists(results_path):
-                print(f"Results database (existing): {results_path}")
+                log.info(f"Results database (existing): {results_path}")
             else:
-                print(f"Results database (new): {results_path}")
+                log.info(f"Results database (new): {results_path}")
         except Exception as e:
-            print(f"Warning: Results database connection issue: {e}")
+            log.warning(f"Warning: Results database connection issue: {e}")
             # Yine de devam et
             self.results_connection = sqlite3.connect(results_path)
             self.results_connection.row_factory = sqlite3.Row
-            print(f"Results database connected with warning: {results_path}")
+            log.info(f"Results database connected with warning: {results_path}")
 
     def connect_multi_databases(self, databases_config: List[dict], results_db_path: str):
-        print(f"Connecting to {len(databases_config)} databases...")
+        log.info(f"Connecting to {len(databases_config)} databases...")
         
         # Mevcut bağlantıları temizle
         self.disconnect_all()
@@ -69,11 +124,10 @@ class DatabaseManager:
             if not os.path.exists(db_path):
                 raise FileNotFoundError(f"Database not found: {db_path} (for {db_name})")
             
-            connection = sqlite3.connect(db_path)
-            connection.row_factory = sqlite3.Row
+            connection = self.connection_factory.pool(db_config).checkout()
             self.database_connections[db_name] = connection
             
-            print(f"Connected: {db_name} -> {db_path}")
+            log.info(f"Connected: {db_name} -> {db_path}")
         
         # Results database bağlantısı (güvenli)
         os.makedirs(os.path.dirname(results_db_path), exist_ok=True)
@@ -86,52 +140,219 @@ class DatabaseManager:
             self.results_connection.row_factory = sqlite3.Row
             
             if file_exists:
-                print(f"Results database (existing): {results_db_path}")
+                log.info(f"Results database (existing): {results_db_path}")
             else:
-                print(f"Results database (new): {results_db_path}")
+                log.info(f"Results database (new): {results_db_path}")
                 
         except Exception as e:
-            print(f"Warning: Results database connection issue: {e}")
+            log.warning(f"Warning: Results database connection issue: {e}")
             # Yine de devam et
             self.results_connection = sqlite3.connect(results_db_path)
             self.results_connection.row_factory = sqlite3.Row
-            print(f"Results database connected with warning: {results_db_path}")
+            log.info(f"Results database connected with warning: {results_db_path}")
     
+    def connect_results_database(self, results_db_path: str):
+        # Sadece sonuç database'i (rapor yeniden üretimi için)
+        if not os.path.exists(results_db_path):
+            raise FileNotFoundError(f"Results database not found: {results_db_path}")
+
+        self.results_connection = sqlite3.connect(results_db_path)
+        self.results_connection.row_factory = sqlite3.Row
+        log.info(f"Results database connected: {results_db_path}")
+
+    def load_results_table(self, table_name: str) -> 'pd.DataFrame':
+        import pandas as pd
+
+        if not self.results_connection:
+            raise ValueError("Results database connection invalid")
+
+        cursor = self.results_connection.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,))
+        if not cursor.fetchone():
+            log.info(f"Results table not found: {table_name}")
+            return pd.DataFrame()
+
+        return pd.read_sql_query(f"SELECT * FROM {table_name}", self.results_connection)
+
+    def load_result_columns(self, results_db_path: str, table_name: str, columns: List[str]) -> Optional['pd.DataFrame']:
+        # Sadece istenen kolonlar, salt okunur bağlantıyla (ör. değerlendirme için kimlik kolonları)
+        import pandas as pd
+
+        if not os.path.exists(results_db_path):
+            return None
+
+        connection = sqlite3.connect(f"file:{os.path.abspath(results_db_path)}?mode=ro", uri=True)
+        try:
+            existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")}
+            if not existing or not set(columns) <= existing:
+                return None
+            return pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {table_name}", connection)
+        finally:
+            connection.close()
+
     def get_database_connection(self, db_name: str) -> sqlite3.Connection:
         if db_name not in self.database_connections:
             raise ValueError(f"Database connection not found: {db_name}")
         return self.database_connections[db_name]
     
-    def validate_multi_database_schemas(self, databases_config: List[dict]):
-        print("Validating database schemas...")
-        
-        for db_config in databases_config:
-            db_name = db_config['name']
-            connection = self.get_database_connection(db_name)
-            
-            try:
-                table_info = self.validate_table_schema(db_config, connection)
-                print(f"{db_name}: {table_info['row_count']} records")
-            except Exception as e:
-                print(f"{db_name}: {e}")
-                raise
-    
-    def load_data_from_database_by_name(self, db_name: str, db_config: dict, limit: Optional[int] = None) -> pd.DataFrame:
+    def validate_multi_database_schemas(self, databases_config: List[dict], mode: str = 'exact', max_workers: Optional[int] = None):
+        log.info(f"Validating database schemas ({mode} mode)...")
+
+        if mode not in ('exact', 'fast'):
+            raise ValueError(f"Invalid validation mode: {mode}")
+
+        if mode == 'exact':
+            for db_config in databases_config:
+                db_name = db_config['name']
+                connection = self.get_database_connection(db_name)
+
+                try:
+                    table_info = self.validate_table_schema(db_config, connection)
+                    self.table_infos[db_name] = table_info
+                    self._store_cached_row_count(db_config['path'], db_config['table'], table_info['row_count'])
+                    log.info(f"{db_name}: {table_info['row_count']} records")
+                except Exception as e:
+                    log.error(f"{db_name}: {e}")
+                    raise
+            return self.table_infos
+
+        # Hızlı mod: COUNT(*) yerine tahmin, tüm database'ler eşzamanlı
+        def validate_one(db_config):
+            with self.connection_factory.connection(db_config) as connection:
+                return self.validate_table_schema(db_config, connection, count_mode='estimate')
+
+        workers = max_workers or len(databases_config)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {db_config['name']: executor.submit(validate_one, db_config) for db_config in databases_config}
+
+            for db_name, future in futures.items():
+                try:
+                    table_info = future.result()
+                except Exception as e:
+                    log.error(f"{db_name}: {e}")
+                    raise
+
+                self.table_infos[db_name] = table_info
+                log.info(f"{db_name}: ~{table_info['row_count']} records ({table_info['count_source']})")
+
+        return self.table_infos
+
+    def estimate_row_count(self, connection: sqlite3.Connection, table_name: str) -> Optional[int]:
+        cursor = connection.cursor()
+
+        # ANALYZE çalıştırılmışsa sqlite_stat1 ilk değeri tablo satır sayısıdır
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        if cursor.fetchone():
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table_name,))
+            row = cursor.fetchone()
+            if row and row[0]:
+                return int(str(row[0]).split()[0])
+
+        # MAX(rowid) B-tree'nin sonundan okunur (silinmiş kayıtlar varsa üst sınırdır)
+        try:
+            cursor.execute(f"SELECT MAX(rowid) FROM {table_name}")
+            row = cursor.fetchone()
+            return int(row[0]) if row and row[0] is not None else 0
+        except sqlite3.OperationalError:
+            # WITHOUT ROWID tablolar
+            return None
+
+    def _load_row_count_cache(self) -> dict:
+        if not self.row_count_cache_path or not os.path.exists(self.row_count_cache_path):
+            return {}
+
+        try:
+            with open(self.row_count_cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            log.warning(f"Warning: Row count cache could not be read: {e}")
+            return {}
+
+    def _get_cached_row_count(self, db_path: str, table_name: str) -> Optional[int]:
+        entry = self._load_row_count_cache().get(f"{os.path.abspath(db_path)}::{table_name}")
+        if not entry:
+            return None
+
+        # Dosya değiştiyse önbellek geçersiz
+        stat = os.stat(db_path)
+        if entry['mtime'] != stat.st_mtime or entry['size'] != stat.st_size:
+            return None
+
+        return entry['count']
+
+    def _store_cached_row_count(self, db_path: str, table_name: str, count: int):
+        if not self.row_count_cache_path:
+            return
+
+        cache = self._load_row_count_cache()
+        stat = os.stat(db_path)
+        cache[f"{os.path.abspath(db_path)}::{table_name}"] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'count': count}
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.row_count_cache_path)), exist_ok=True)
+            with open(self.row_count_cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+        except Exception as e:
+            log.warning(f"Warning: Row count cache could not be written: {e}")
+
+    def get_exact_row_count(self, db_name: str, db_config: dict) -> int:
+        # Hızlı doğrulamada ertelenen kesin sayım (rapor için)
+        table_info = self.table_infos.get(db_name)
+        if table_info and table_info.get('count_source') in ('exact', 'cache'):
+            return table_info['row_count']
+
+        db_path = db_config['path']
+        table_name = db_config['table']
+
+        count = self._get_cached_row_count(db_path, table_name)
+        if count is None:
+            connection = self.database_connections.get(db_name)
+            if connection is None:
+                with self.connection_factory.connection(db_config) as connection:
+                    count = connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            else:
+                count = connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            self._store_cached_row_count(db_path, table_name, count)
+
+        if table_info is not None:
+            table_info['row_count'] = count
+            table_info['count_source'] = 'exact'
+
+        return count
+
+    def load_data_from_database_by_name(self, db_name: str, db_config: dict, limit: Optional[int] = None) -> 'pd.DataFrame':
         connection = self.get_database_connection(db_name)
         return self.load_data_from_database(db_config, connection, limit)
     
-    def get_all_database_data(self, databases_config: List[dict], limit: Optional[int] = None) -> Dict[str, pd.DataFrame]:
-        print("Loading data from all databases...")
+    def load_data_from_path(self, db_config: dict, limit: Optional[int] = None) -> 'pd.DataFrame':
+        # Havuzdan ödünç bağlantıyla yükler: farklı thread'lerden eşzamanlı çağrılabilir
+        with self.connection_factory.connection(db_config) as connection:
+            return self.load_data_from_database(db_config, connection, limit)
+
+    def get_all_database_data(self, databases_config: List[dict], limit: Optional[int] = None) -> Dict[str, 'pd.DataFrame']:
+        log.info("Loading data from all databases...")
         
         data_dict = {}
+        start_time = time.perf_counter()
         for db_config in databases_config:
             db_name = db_config['name']
             df = self.load_data_from_database_by_name(db_name, db_config, limit)
             data_dict[db_name] = df
-            print(f"✅ {db_name}: {len(df)} records loaded")
-        
+            log.info(f"✅ {db_name}: {len(df)} records loaded", event='load.done', database=db_name, records=len(df))
+
+        self.log_load_throughput(sum(len(df) for df in data_dict.values()), time.perf_counter() - start_time)
         return data_dict
 
+    def log_load_throughput(self, records: int, elapsed: float):
+        # Toplam yükleme verimi ve havuz kullanımı (açılan / yeniden kullanılan bağlantı)
+        pool_stats = self.connection_factory.stats()
+        opened = sum(stats['opened'] for stats in pool_stats.values())
+        reused = sum(stats['reused'] for stats in pool_stats.values())
+        rate = records / elapsed if elapsed > 0 else 0.0
+        log.info(f"Load throughput: {records:,} records in {elapsed:.2f}s ({rate:,.0f} records/s), "
+                 f"connections opened {opened}, reused {reused}", event='load.throughput', records=records,
+                 seconds=round(elapsed, 3), rate=round(rate, 1), connections_opened=opened, connections_reused=reused)
+
     def disconnect_all(self):
         # Klasik bağlantılar
         if self.source_connection:
@@ -146,17 +367,16 @@ class DatabaseManager:
             self.results_connection.close()
             self.results_connection = None
         
-        # Çoklu database bağlantıları
-        for name, connection in self.database_connections.items():
-            if connection:
-                connection.close()
-        
+        # Çoklu database bağlantıları ve havuzdaki boşta bağlantılar
         self.database_connections.clear()
+        self.connection_factory.close_all()
 
-        print("All database connections closed.")
+        log.info("All database connections closed.")
 
-    def get_table_info(self, connection: sqlite3.Connection, table_name: str):
+    def get_table_info(self, connection: sqlite3.Connection, table_name: str, count_mode: str = 'exact'):
+        # Kaynak bağlantıları tuple satır döndürür; şema sorguları kolon adıyla okunur
         cursor = connection.cursor()
+        cursor.row_factory = sqlite3.Row
 
         try:
             # Tablo var mı kontrol et
@@ -174,39 +394,187 @@ class DatabaseManager:
             cursor.execute(f"PRAGMA table_info({table_name})")
             columns = cursor.fetchall()
 
-            # Kayıt sayısını al
-            cursor.execute(f"SELECT COUNT(*) as count FROM {table_name}")
-            count = cursor.fetchone()['count']
+            # Kayıt sayısını al (tahmin modunda tam tarama yapılmaz)
+            if count_mode == 'exact':
+                cursor.execute(f"SELECT COUNT(*) as count FROM {table_name}")
+                count = cursor.fetchone()['count']
+                count_source = 'exact'
+            elif count_mode == 'estimate':
+                count = self.estimate_row_count(connection, table_name)
+                count_source = 'estimate'
+            else:
+                count = None
+                count_source = 'none'
 
             column_info = {}
             for col in columns:
                 column_info[col['name']] = {'type': col['type'], 'nullable': not col['notnull'], 'primary_key': bool(col['pk'])}
 
-            return {'table_name': table_name, 'columns': column_info, 'row_count': count}
+            return {'table_name': table_name, 'columns': column_info, 'row_count': count, 'count_source': count_source}
 
         except Exception as e:
             raise Exception(f"table info not retrieved: {e}")
 
-    def validate_table_schema(self, db_config, connection: sqlite3.Connection):
+    def get_index_info(self, connection: sqlite3.Connection, table_name: str) -> Dict[str, List[str]]:
+        cursor = connection.cursor()
+
+        # Index adı -> kolon listesi (sıralı)
+        indexes = {}
+        cursor.execute(f"PRAGMA index_list({table_name})")
+        for index_row in cursor.fetchall():
+            index_name = index_row[1]
+            cursor.execute(f"PRAGMA index_info('{index_name}')")
+            indexes[index_name] = [col[2] for col in sorted(cursor.fetchall(), key=lambda c: c[0])]
+
+        return indexes
+
+    def is_column_indexed(self, connection: sqlite3.Connection, table_name: str, column: str) -> bool:
+        # rowid ve INTEGER PRIMARY KEY zaten B-tree anahtarıdır
+        if column.lower() in ROWID_ALIASES:
+            return True
+
+        cursor = connection.cursor()
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        pk_columns = [col for col in cursor.fetchall() if col[5]]
+        if len(pk_columns) == 1 and pk_columns[0][1] == column and pk_columns[0][2].upper() == 'INTEGER':
+            return True
+
+        # Kolon bir index'in ilk kolonu ise eşitlik sorguları index'i kullanabilir
+        for index_columns in self.get_index_info(connection, table_name).values():
+            if index_columns and index_columns[0] == column:
+                return True
+
+        return False
+
+    def find_missing_indexes(self, db_config: dict, connection: sqlite3.Connection, logical_columns: List[str]) -> List[str]:
+        table_name = db_config['table']
+        columns_mapping = db_config['columns']
+
+        missing = []
+        for logical_name in logical_columns:
+            physical_name = columns_mapping.get(logical_name)
+            if not physical_name or physical_name in missing:
+                continue
+            if not self.is_column_indexed(connection, table_name, physical_name):
+                missing.append(physical_name)
+
+        return missing
+
+    def time_lookup_query(self, connection: sqlite3.Connection, table_name: str, column: str, repeat: int = 3) -> Optional[float]:
+        cursor = connection.cursor()
+
+        # Örnek değer ile eşitlik sorgusu (blocking / incremental sorgu tipi)
+        cursor.execute(f"SELECT {column} FROM {table_name} WHERE {column} IS NOT NULL LIMIT 1")
+        sample = cursor.fetchone()
+        if sample is None:
+            return None
+
+        best = None
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE {column} = ?", (sample[0],))
+            cursor.fetchone()
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+
+        return best
+
+    def prepare_indexes(self, databases: List[tuple], logical_columns: List[str], create: bool = False, target: str = 'inplace') -> Dict[str, dict]:
+        log.info("Checking indexes on source databases...")
+
+        if target not in ('inplace', 'sidecar'):
+            raise ValueError(f"Invalid index target: {target}")
+
+        report = {}
+        for db_name, db_config in databases:
+            db_path = db_config['path']
+            table_name = db_config['table']
+
+            if not os.path.exists(db_path):
+                raise FileNotFoundError(f"Database not found: {db_path} (for {db_name})")
+
+            # Kaynak bağlantılarından bağımsız, yazılabilir geçici bağlantı
+            connection = sqlite3.connect(db_path)
+            try:
+                missing = self.find_missing_indexes(db_config, connection, logical_columns)
+                entry = {'path': db_path, 'missing': missing, 'created': [], 'timings': {}}
+                report[db_name] = entry
+
+                if not missing:
+                    log.info(f"{db_name}: all blocking/id columns are indexed")
+                    continue
+
+                log.info(f"{db_name}: missing indexes on {missing}")
+
+                for column in missing:
+                    entry['timings'][column] = {'before': self.time_lookup_query(connection, table_name, column)}
+
+                if not create:
+                    continue
+
+                if target == 'sidecar':
+                    base, ext = os.path.splitext(db_path)
+                    sidecar_path = f"{base}.indexed{ext or '.db'}"
+                    sidecar = sqlite3.connect(sidecar_path)
+                    connection.backup(sidecar)
+                    connection.close()
+                    connection = sidecar
+                    entry['path'] = sidecar_path
+                    log.info(f"{db_name}: sidecar copy created: {sidecar_path}")
+
+                for column in missing:
+                    index_name = f"idx_rl_{table_name}_{column}"
+                    connection.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({column})")
+                    entry['created'].append(index_name)
+                connection.commit()
+
+                for column in missing:
+                    entry['timings'][column]['after'] = self.time_lookup_query(connection, table_name, column)
+
+            finally:
+                connection.close()
+
+            for column, timing in entry['timings'].items():
+                before = timing.get('before')
+                after = timing.get('after')
+                if before is None:
+                    continue
+                if after is None:
+                    log.info(f"  {column}: lookup {before * 1000:.2f} ms (no index)")
+                else:
+                    log.info(f"  {column}: lookup {before * 1000:.2f} ms -> {after * 1000:.2f} ms")
+
+        return report
+
+    def validate_table_schema(self, db_config, connection: sqlite3.Connection, count_mode: str = 'exact'):
         table_name = db_config['table']
         expected_columns = db_config['columns']
 
-        print(f"Table schema is being checked: {table_name}")
+        log.info(f"Table schema is being checked: {table_name}")
 
-        # Tablo bilgilerini al
-        table_info = self.get_table_info(connection, table_name)
+        # Tablo bilgilerini al (önbellekte güncel kesin sayım varsa onu kullan)
+        if count_mode == 'estimate':
+            cached_count = self._get_cached_row_count(db_config['path'], table_name)
+            if cached_count is not None:
+                table_info = self.get_table_info(connection, table_name, count_mode='none')
+                table_info['row_count'] = cached_count
+                table_info['count_source'] = 'cache'
+            else:
+                table_info = self.get_table_info(connection, table_name, count_mode='estimate')
+        else:
+            table_info = self.get_table_info(connection, table_name, count_mode=count_mode)
         actual_columns = table_info['columns']
 
         # Kolonları kontrol et
         missing_columns = []
         for logical_name, physical_name in expected_columns.items():
-            if physical_name not in actual_columns:
+            if physical_name not in actual_columns and physical_name.lower() not in ROWID_ALIASES:
                 missing_columns.append(physical_name)
 
         if missing_columns:
-            print(f"Warn: Missing columns: {missing_columns}")
+            log.warning(f"Warn: Missing columns: {missing_columns}")
         else:
-            print(f"Schema is valid: {len(expected_columns)} columns found")
+            log.info(f"Schema is valid: {len(expected_columns)} columns found")
 
         return table_info
 
@@ -214,7 +582,7 @@ class DatabaseManager:
         table_name = db_config['table']
         columns_mapping = db_config['columns']
 
-        print(f"Data is being load: {table_name}")
+        log.info(f"Data is being load: {table_name}")
 
         # SQL sorgusu oluştur
         physical_columns = list(columns_mapping.values())
@@ -225,19 +593,77 @@ class DatabaseManager:
         if limit:
             query += f" LIMIT {limit}"
 
+        # pandas sadece veri yükleme aşamasında gerekli (hızlı CLI başlangıcı)
+        import pandas as pd
+
         try:
             # Veriyi yükle
+            start_time = time.perf_counter()
             df = pd.read_sql_query(query, connection)
 
             rename_mapping = {v: k for k, v in columns_mapping.items()}
             df = df.rename(columns=rename_mapping)
 
-            print(f"{len(df)} record loaded")
+            # Tip ipuçları olan kolonlar bir kez dönüştürülür (tarih: epoch'tan gün sayısı)
+            if db_config.get('column_types'):
+                from typed_columns import apply_column_types
+                apply_column_types(df, db_config['column_types'])
+
+            # Türetilmiş anahtarlar ham kolonlardan, sözlük kodlamasından önce hesaplanır
+            if self.derived_keys:
+                from blocking_keys import apply_derived_keys
+                apply_derived_keys(df, self.derived_keys)
+
+            # Tekrarlı metin kolonları int kod + benzersiz değer tablosuna çevrilir
+            if self.string_encoding:
+                from string_encoding import encode_string_columns, log_encoding_report
+                encoding_report = encode_string_columns(df, self.string_encoding.get('max_unique_ratio', 0.5),
+                                                        self.string_encoding.get('columns'), self.string_encoding.get('exclude', ()))
+                log_encoding_report(table_name, encoding_report)
+
+            elapsed = time.perf_counter() - start_time
+            log.info(f"{len(df)} record loaded", event='load.table', table=table_name, records=len(df),
+                     seconds=round(elapsed, 3), rate=round(len(df) / elapsed, 1) if elapsed > 0 else None)
             return df
 
         except Exception as e:
             raise Exception(f"Data lod ERROR: {e}")
 
+    def load_sample(self, db_config: dict, sample_size: int, seed: int = 0):
+        # Tam tarama yapmadan rastgele rowid'lerle örnek; (df, tahmini satır sayısı) döner
+        import numpy as np
+        import pandas as pd
+
+        table_name = db_config['table']
+        columns_mapping = db_config['columns']
+        columns_sql = ', '.join(columns_mapping.values())
+
+        with self.connection_factory.connection(db_config) as connection:
+            try:
+                max_rowid = connection.execute(f"SELECT MAX(rowid) FROM {table_name}").fetchone()[0] or 0
+            except sqlite3.OperationalError:
+                max_rowid = None
+
+            if max_rowid is None or max_rowid <= sample_size:
+                df = pd.read_sql_query(f"SELECT {columns_sql} FROM {table_name} LIMIT {sample_size}", connection)
+                estimated_rows = len(df) if max_rowid is not None else self.estimate_row_count(connection, table_name) or len(df)
+            else:
+                rng = np.random.default_rng(seed)
+                rowids = np.sort(rng.choice(max_rowid, size=sample_size, replace=False)) + 1
+                frames = []
+                for start in range(0, len(rowids), 500):
+                    batch = ', '.join(str(int(rowid)) for rowid in rowids[start:start + 500])
+                    frames.append(pd.read_sql_query(f"SELECT {columns_sql} FROM {table_name} WHERE rowid IN ({batch})", connection))
+                df = pd.concat(frames, ignore_index=True)
+                estimated_rows = int(round(max_rowid * len(df) / len(rowids)))
+
+        df = df.rename(columns={v: k for k, v in columns_mapping.items()})
+        if db_config.get('column_types'):
+            from typed_columns import apply_column_types
+            apply_column_types(df, db_config['column_types'])
+
+        return df, estimated_rows
+
     def get_source_data(self, source_config, limit: Optional[int] = None):
         if not self.source_connection:
             raise ValueError("Source database connection invalid")
@@ -254,61 +680,291 @@ class DatabaseManager:
         if not self.results_connection:
             raise ValueError("Results database connection invalid")
 
-        print(f"Result are being saved: {table_name}")
+        log.info(f"Result are being saved: {table_name}")
 
         try:
             # Boş DataFrame kontrolü
             if results_df.empty:
-                print(f"⚠️ No matches found, creating empty table: {table_name}")
+                log.info(f"⚠️ No matches found, creating empty table: {table_name}")
                 # Boş tablo oluştur (sadece sütun yapısı ile) - var olan tabloyu değiştir
                 results_df.to_sql(table_name, self.results_connection, if_exists='replace', index=False)
-                print(f"✅ Empty table created: {table_name}")
+                self._drop_result_summary(table_name)
+                log.info(f"✅ Empty table created: {table_name}")
                 return
             
             # Sonuçları kaydet - var olan tabloyu değiştir
-            results_df.to_sql(table_name, self.results_connection, if_exists='replace', index=False)
+            self._write_table(results_df, table_name)
+            self.index_result_table('source_target', table_name, results_df)
 
-            print(f"{len(results_df)} results saved.")
+            log.info(f"{len(results_df)} results saved.", event='save.done', table=table_name, rows=len(results_df))
 
         except Exception as e:
             raise Exception(f"Result save ERROR: {e}")
     
-    def save_multi_results(self, results_dict: Dict[str, pd.DataFrame], table_prefix: str = "linkage"):
+    def _batch_rows(self, results_df: 'pd.DataFrame') -> Optional[int]:
+        # Bütçe yoksa pandas varsayılanı (tek seferde)
+        if self.memory_budget is None:
+            return None
+        return self.memory_budget.batch_rows('export_rows', results_df)
+
+    def _write_table(self, results_df: 'pd.DataFrame', table_name: str):
+        # İlerleme açıksa batch'ler halinde yazılır (satır/s ve ETA); sessiz modda tek to_sql çağrısı
+        batch_rows = self._batch_rows(results_df)
+        progress = log.progress(f"saving {table_name}", total=len(results_df), unit='rows')
+        if progress is NULL_PROGRESS:
+            results_df.to_sql(table_name, self.results_connection, if_exists='replace', index=False, chunksize=batch_rows)
+            return
+
+        step = batch_rows or SAVE_BATCH_ROWS
+        for start in range(0, len(results_df), step):
+            batch = results_df.iloc[start:start + step]
+            batch.to_sql(table_name, self.results_connection, if_exists='replace' if start == 0 else 'append', index=False)
+            progress.update(len(batch))
+        progress.finish()
+
+    def _write_csv(self, results_df: 'pd.DataFrame', csv_path: str):
+        batch_rows = self._batch_rows(results_df)
+        progress = log.progress(f"exporting {os.path.basename(csv_path)}", total=len(results_df), unit='rows')
+        if progress is NULL_PROGRESS:
+            results_df.to_csv(csv_path, index=False, encoding='utf-8', chunksize=batch_rows)
+            return
+
+        step = batch_rows or SAVE_BATCH_ROWS
+        for start in range(0, len(results_df), step):
+            batch = results_df.iloc[start:start + step]
+            batch.to_csv(csv_path, index=False, encoding='utf-8', mode='w' if start == 0 else 'a', header=start == 0)
+            progress.update(len(batch))
+        progress.finish()
+
+    def get_result_table_name(self, comparison_name: str, table_prefix: str = "linkage") -> str:
+        return f"{table_prefix}_{comparison_name}".replace('-', '_').replace(' ', '_')
+
+    def save_multi_results(self, results_dict: Dict[str, 'pd.DataFrame'], table_prefix: str = "linkage"):
         if not self.results_connection:
             raise ValueError("Results database connection invalid")
         
-        print(f"Saving {len(results_dict)} result tables...")
+        log.info(f"Saving {len(results_dict)} result tables...")
         
         saved_tables = {}
         
         try:
             for comparison_name, results_df in results_dict.items():
                 # Boş DataFrame kontrolü
+                # Tablo adını oluştur: prefix_comparison_name
+                table_name = self.get_result_table_name(comparison_name, table_prefix)
+
                 if results_df.empty:
-                    print(f"{comparison_name}: No matches found, skipping table creation")
+                    # Önceki çalışmadan kalan tablo rapora karışmasın
+                    self.results_connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+                    self._drop_result_summary(table_name)
+                    log.info(f"{comparison_name}: No matches found, skipping table creation")
                     saved_tables[comparison_name] = f"SKIPPED_EMPTY_{comparison_name}"
                     continue
                 
-                # Tablo adını oluştur: prefix_comparison_name
-                table_name = f"{table_prefix}_{comparison_name}".replace('-', '_').replace(' ', '_')
-                
                 # Sonuçları kaydet - var olan tabloyu değiştir
-                results_df.to_sql(table_name, self.results_connection, if_exists='replace', index=False)
+                self._write_table(results_df, table_name)
+                self.index_result_table(comparison_name, table_name, results_df)
                 
                 saved_tables[comparison_name] = table_name
-                print(f"{comparison_name}: {len(results_df)} results -> {table_name}")
+                log.info(f"{comparison_name}: {len(results_df)} results -> {table_name}", event='save.done', table=table_name, rows=len(results_df))
             
             # Eğer hiçbir tablo kaydedilmediyse bilgi ver
             if not any(not name.startswith("SKIPPED_EMPTY_") for name in saved_tables.values()):
-                print("No matches found in any comparison, no tables created")
+                log.info("No matches found in any comparison, no tables created")
             
             return saved_tables
             
         except Exception as e:
             raise Exception(f"Multi-result save ERROR: {e}")
 
-    def export_to_csv(self, results_df: pd.DataFrame, csv_path: str):
-        print(f"CSV is being export: {csv_path}")
+    def index_result_table(self, comparison_name: str, table_name: str, results_df: 'pd.DataFrame'):
+        # to_sql tabloyu indexsiz yazar; id kolonları için kapsayan index'ler oluşturulur ve tablo _result_summary'ye kaydedilir
+        sides = result_id_columns(comparison_name, results_df.columns)
+        if sides is None:
+            log.warning(f"{table_name}: id columns not found, result table not indexed")
+            return
+
+        kind, left, right = sides
+        left_column = f'{left}_id'
+        right_column = 'group_id' if kind == 'dedup' else f'{right}_id'
+        score = ['total_score'] if 'total_score' in results_df.columns else []
+
+        start_time = time.perf_counter()
+        for name, columns in ((left_column, [left_column, right_column] + score), (right_column, [right_column, left_column] + score),
+                              ('score', score)):
+            if columns:
+                quoted = ', '.join(f'"{column}"' for column in columns)
+                self.results_connection.execute(f'CREATE INDEX IF NOT EXISTS "{table_name}_{name}_idx" ON "{table_name}" ({quoted})')
+
+        scores = results_df['total_score'] if score else None
+        self.results_connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS {RESULT_SUMMARY_TABLE} (
+                table_name TEXT PRIMARY KEY,
+                comparison_name TEXT,
+                kind TEXT,
+                left_db TEXT,
+                right_db TEXT,
+                left_id_column TEXT,
+                right_id_column TEXT,
+                rows INTEGER,
+                score_min REAL,
+                score_avg REAL,
+                score_max REAL,
+                saved_at TEXT
+            )""")
+        self.results_connection.execute(f"INSERT OR REPLACE INTO {RESULT_SUMMARY_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                        (table_name, comparison_name, kind, left, right, left_column, right_column, len(results_df),
+                                         float(scores.min()) if scores is not None else None,
+                                         float(scores.mean()) if scores is not None else None,
+                                         float(scores.max()) if scores is not None else None,
+                                         time.strftime('%Y-%m-%d %H:%M:%S')))
+        self.results_connection.commit()
+        log.debug(f"{table_name}: indexes created ({time.perf_counter() - start_time:.3f}s)", event='save.indexed', table=table_name)
+
+    def _drop_result_summary(self, table_name: str):
+        # Boş kalan / silinen sonuç tablosu aramalara karışmasın
+        exists = self.results_connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (RESULT_SUMMARY_TABLE,)).fetchone()
+        if exists:
+            self.results_connection.execute(f"DELETE FROM {RESULT_SUMMARY_TABLE} WHERE table_name = ?", (table_name,))
+            self.results_connection.commit()
+
+    def find_matches(self, db_name: str, record_id, results_db_path: Optional[str] = None) -> List[dict]:
+        # Bir kaydın tüm sonuç tablolarındaki eşleşmeleri (dedup'ta grup üyeleri), en yüksek skor önce
+        connection = self.results_connection
+        if connection is None:
+            if not results_db_path or not os.path.exists(results_db_path):
+                raise FileNotFoundError(f"Results database not found: {results_db_path}")
+            connection = sqlite3.connect(f"file:{os.path.abspath(results_db_path)}?mode=ro", uri=True)
+
+        try:
+            if not connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (RESULT_SUMMARY_TABLE,)).fetchone():
+                raise ValueError(f"{RESULT_SUMMARY_TABLE} table not found, results were saved by an older version")
+
+            tables = connection.execute(f"""
+                SELECT comparison_name, table_name, kind, left_db, right_db, left_id_column, right_id_column
+                FROM {RESULT_SUMMARY_TABLE} WHERE left_db = ? OR right_db = ? ORDER BY comparison_name""", (db_name, db_name)).fetchall()
+
+            rows = []
+            for comparison_name, table_name, kind, left, right, left_column, right_column in tables:
+                if kind == 'dedup':
+                    query = (f'SELECT other."{left_column}", other.total_score FROM "{table_name}" AS record '
+                             f'JOIN "{table_name}" AS other ON other.group_id = record.group_id '
+                             f'WHERE record."{left_column}" = ? AND other."{left_column}" != record."{left_column}"')
+                    matched_db = left
+                elif left == db_name:
+                    query = f'SELECT "{right_column}", total_score FROM "{table_name}" WHERE "{left_column}" = ?'
+                    matched_db = right
+                else:
+                    query = f'SELECT "{left_column}", total_score FROM "{table_name}" WHERE "{right_column}" = ?'
+                    matched_db = left
+
+                rows.extend({'comparison_name': comparison_name, 'table_name': table_name, 'matched_db': matched_db,
+                             'matched_id': matched_id, 'total_score': score}
+                            for matched_id, score in connection.execute(query, (record_id,)))
+
+            return sorted(rows, key=lambda row: row['total_score'] if row['total_score'] is not None else float('-inf'), reverse=True)
+
+        finally:
+            if connection is not self.results_connection:
+                connection.close()
+
+    def load_wide_results(self, table_name: str, databases: Dict[str, 'DatabaseSpec'], results_db_path: str) -> Optional['pd.DataFrame']:
+        # Kaynak database'ler bağlanıp kayıt kolonları (<taraf>_<kolon>) kimlik kolonlarıyla geri birleştirilir;
+        # eşleşmesi olmadığı için tablosu hiç yazılmamış çiftlerde None döner
+        import pandas as pd
+        from connection_pool import source_uri
+
+        if not os.path.exists(results_db_path):
+            raise FileNotFoundError(f"Results database not found: {results_db_path}")
+
+        connection = sqlite3.connect(f"file:{os.path.abspath(results_db_path)}?mode=ro", uri=True)
+        try:
+            if not connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone():
+                return None
+
+            summary = None
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (RESULT_SUMMARY_TABLE,)).fetchone():
+                summary = connection.execute(f"SELECT kind, left_db, right_db, left_id_column, right_id_column FROM {RESULT_SUMMARY_TABLE} "
+                                             f"WHERE table_name = ?", (table_name,)).fetchone()
+            if summary is None:
+                raise ValueError(f"{table_name} not found in {RESULT_SUMMARY_TABLE}")
+
+            kind, left, right, left_column, right_column = summary
+            sides = [(left, left_column)] + ([(right, right_column)] if kind == 'link' else [])
+            result_columns = {row[1] for row in connection.execute(f'PRAGMA table_info("{table_name}")')}
+
+            selects, joins = ['result.*'], []
+            for position, (side, id_column) in enumerate(sides):
+                db = databases[side]
+                mapping = db.column_map
+                if 'id' not in mapping:
+                    raise ValueError(f"{side}: an 'id' column mapping is needed to join records")
+
+                connection.execute(f"ATTACH DATABASE ? AS source{position}", (source_uri(db.path, immutable=False),))
+                for logical, physical in mapping.items():
+                    name = f"{side}_{logical}"
+                    if logical != 'id' and name not in result_columns:
+                        selects.append(f'record{position}."{physical}" AS "{name}"')
+                joins.append(f'LEFT JOIN source{position}."{db.table}" AS record{position} '
+                             f'ON record{position}."{mapping["id"]}" = result."{id_column}"')
+
+            view_name = f"{table_name}_wide"
+            connection.execute(f'CREATE TEMP VIEW "{view_name}" AS SELECT {", ".join(selects)} FROM "{table_name}" AS result {" ".join(joins)}')
+            return pd.read_sql_query(f'SELECT * FROM "{view_name}"', connection)
+
+        finally:
+            connection.close()
+
+    def save_pair_stats(self, comparison_name: str, table_name: str, stats: dict):
+        # Rapor aşaması süre ve blocking verimliliğini bu tablodan okur
+        if not self.results_connection:
+            raise ValueError("Results database connection invalid")
+
+        self.results_connection.execute("""
+            CREATE TABLE IF NOT EXISTS _pair_stats (
+                comparison_name TEXT PRIMARY KEY,
+                table_name TEXT,
+                left_records INTEGER,
+                right_records INTEGER,
+                candidate_pairs INTEGER,
+                total_possible_pairs INTEGER,
+                matches INTEGER,
+                elapsed REAL,
+                saved_at TEXT
+            )""")
+        self.results_connection.execute("INSERT OR REPLACE INTO _pair_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                        (comparison_name, table_name, stats.get('left_records'), stats.get('right_records'),
+                                         stats.get('candidate_pairs'), stats.get('total_possible_pairs'), stats.get('matches'),
+                                         stats.get('elapsed'), time.strftime('%Y-%m-%d %H:%M:%S')))
+        self.results_connection.commit()
+
+    def save_evaluation_metrics(self, comparison_name: str, metrics: dict):
+        # report komutu ground truth metriklerini bu tablodan okur (değerlendirme yeniden yapılmaz)
+        if not self.results_connection:
+            raise ValueError("Results database connection invalid")
+
+        self.results_connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS {EVALUATION_TABLE} (
+                comparison_name TEXT PRIMARY KEY,
+                true_links INTEGER,
+                matches INTEGER,
+                true_positives INTEGER,
+                precision REAL,
+                recall REAL,
+                f1 REAL,
+                true_candidates INTEGER,
+                pair_completeness REAL,
+                candidate_pairs INTEGER,
+                total_possible_pairs INTEGER,
+                reduction_ratio REAL,
+                saved_at TEXT
+            )""")
+        self.results_connection.execute(f"INSERT OR REPLACE INTO {EVALUATION_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                        (comparison_name, *(metrics.get(name) for name in EVALUATION_METRICS), time.strftime('%Y-%m-%d %H:%M:%S')))
+        self.results_connection.commit()
+
+    def export_to_csv(self, results_df: 'pd.DataFrame', csv_path: str):
+        log.info(f"CSV is being export: {csv_path}")
 
         try:
             # Directory oluştur (var ise sorun yok)
@@ -317,28 +973,28 @@ class DatabaseManager:
             # Dosya var mı kontrol et
             file_exists = os.path.exists(csv_path)
             if file_exists:
-                print(f"CSV file already exists, will be overwritten: {csv_path}")
+                log.info(f"CSV file already exists, will be overwritten: {csv_path}")
 
             # Boş DataFrame kontrolü
             if results_df.empty:
-                print(f"No matches found, creating empty CSV: {csv_path}")
+                log.info(f"No matches found, creating empty CSV: {csv_path}")
                 results_df.to_csv(csv_path, index=False, encoding='utf-8')
-                print(f"Empty CSV created: {csv_path}")
+                log.info(f"Empty CSV created: {csv_path}")
                 return
 
             # CSV'ye export et (var olan dosyayı üstüne yaz)
-            results_df.to_csv(csv_path, index=False, encoding='utf-8')
+            self._write_csv(results_df, csv_path)
 
             if file_exists:
-                print(f"CSV export completed (overwritten): {csv_path}")
+                log.info(f"CSV export completed (overwritten): {csv_path}")
             else:
-                print(f"CSV export completed (new): {csv_path}")
+                log.info(f"CSV export completed (new): {csv_path}")
 
         except Exception as e:
             raise Exception(f"CSV export ERROR: {e}")
     
-    def export_multi_results_to_csv(self, results_dict: Dict[str, pd.DataFrame], base_path: str = "../results"):
-        print(f"Exporting {len(results_dict)} result files to CSV...")
+    def export_multi_results_to_csv(self, results_dict: Dict[str, 'pd.DataFrame'], base_path: str = "../results"):
+        log.info(f"Exporting {len(results_dict)} result files to CSV...")
         
         exported_files = {}
         
@@ -349,7 +1005,7 @@ class DatabaseManager:
             for comparison_name, results_df in results_dict.items():
                 # Boş DataFrame kontrolü
                 if results_df.empty:
-                    print(f"{comparison_name}: No matches found, skipping CSV export")
+                    log.info(f"{comparison_name}: No matches found, skipping CSV export")
                     exported_files[comparison_name] = f"SKIPPED_EMPTY_{comparison_name}.csv"
                     continue
                 
@@ -360,20 +1016,20 @@ class DatabaseManager:
                 # Dosya var mı kontrol et
                 file_exists = os.path.exists(csv_path)
                 if file_exists:
-                    print(f"{comparison_name}: CSV file will be overwritten")
+                    log.info(f"{comparison_name}: CSV file will be overwritten")
                 
                 # CSV'ye export et (var olan dosyayı üstüne yaz)
-                results_df.to_csv(csv_path, index=False, encoding='utf-8')
+                self._write_csv(results_df, csv_path)
                 
                 exported_files[comparison_name] = csv_path
                 if file_exists:
-                    print(f"{comparison_name}: {csv_path} (overwritten)")
+                    log.info(f"{comparison_name}: {csv_path} (overwritten)")
                 else:
-                    print(f"{comparison_name}: {csv_path} (new)")
+                    log.info(f"{comparison_name}: {csv_path} (new)")
             
             # Eğer hiçbir dosya export edilmediyse bilgi ver
             if not any(not path.startswith("SKIPPED_EMPTY_") for path in exported_files.values()):
-                print("No matches found in any comparison, no CSV files created")
+                log.info("No matches found in any comparison, no CSV files created")
             
             return exported_files
             
@@ -0,0 +1,245 @@
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from comparison_features import build_compare_feature, compute_features_on_positions
+from linkage_plan import LinkagePlan, compile_rules_plan
+from memory_budget import current_rss
+from event_log import log
+
+
+class DeduplicationEngine:
+    """Single-table duplicate detection on positional pair arrays.
+
+    Candidate pairs are generated directly as ``i < j`` int arrays (within
+    blocks for block indexing), features are computed on the aligned value
+    arrays in chunks, and matched pairs are clustered with a vectorized
+    union-find. The result is one row per record of every duplicate group,
+    with one survivor record chosen per group.
+    """
+
+    def __init__(self, config: Optional[dict] = None, memory_budget=None, linkage_plan: Optional[LinkagePlan] = None):
+        self.memory_budget = memory_budget
+        self.linkage_plan = linkage_plan if linkage_plan is not None else compile_rules_plan(config)
+        self.classification = self.linkage_plan.classification
+
+        self.survivor_rule = self.linkage_plan.deduplication.survivor
+        self.chunk_size = self.linkage_plan.deduplication.chunk_size
+
+        if self.survivor_rule not in ('completeness', 'first'):
+            raise ValueError(f"Unknown survivor rule: {self.survivor_rule}")
+
+        self.features = [f for f in (build_compare_feature(comp) for comp in self.linkage_plan.comparisons) if f is not None]
+        if not self.features:
+            raise ValueError("Comparison is empty")
+
+        self.stats = {}
+
+    @staticmethod
+    def _expand_ranges(lo: np.ndarray, hi: np.ndarray):
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        owners = np.repeat(np.arange(len(lo)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return owners, np.repeat(lo, counts) + offsets
+
+    def generate_pairs(self, df: pd.DataFrame, indexer=None):
+        method = self.linkage_plan.indexing.method
+        n_records = len(df)
+
+        if method == 'block':
+            key = self.linkage_plan.indexing.key
+            if not key:
+                raise ValueError("Key required for block method")
+
+            # Blok kodları; eksik anahtar (-1) hiçbir bloğa girmez
+            codes, _ = pd.factorize(df[key], sort=False)
+            valid = np.flatnonzero(codes >= 0)
+            order = valid[np.argsort(codes[valid], kind='stable')]
+            sorted_codes = codes[order]
+
+            # Her kayıt, bloğunda kendisinden sonra gelenlerle eşleşir (i < j)
+            block_end = np.searchsorted(sorted_codes, sorted_codes, side='right')
+            owners, partners = self._expand_ranges(np.arange(1, len(order) + 1), block_end)
+            left, right = order[owners], order[partners]
+
+        elif method == 'full':
+            left, right = np.triu_indices(n_records, k=1)
+
+        else:
+            if indexer is None:
+                raise ValueError(f"Indexer required for {method} deduplication")
+            candidate_links = indexer.index(df)
+            left = df.index.get_indexer(candidate_links.get_level_values(0))
+            right = df.index.get_indexer(candidate_links.get_level_values(1))
+
+        left, right = np.minimum(left, right).astype(np.int64), np.maximum(left, right).astype(np.int64)
+        return left, right
+
+    def _classify(self, feature_matrix: np.ndarray, left: np.ndarray, right: np.ndarray):
+        method = self.classification.method
+        scores = feature_matrix.sum(axis=1)
+
+        if method == 'threshold':
+            return scores >= self.classification.min_score(feature_matrix.shape[1]), scores
+
+        # ML sınıflandırıcılar tüm özellik matrisine ihtiyaç duyar
+        import recordlinkage as rl
+
+        classifiers = {'ecm': rl.ECMClassifier, 'svm': rl.SVMClassifier, 'kmeans': rl.KMeansClassifier}
+        if method not in classifiers:
+            raise ValueError(f"Unkown classification method: {method}")
+
+        features_df = pd.DataFrame(feature_matrix, index=pd.MultiIndex.from_arrays([left, right]), columns=[f.label for f in self.features])
+        classifier = classifiers[method]()
+        classifier.fit(features_df)
+        matches = classifier.predict(features_df)
+        return features_df.index.isin(matches), scores
+
+    def score_pairs(self, df: pd.DataFrame, left: np.ndarray, right: np.ndarray):
+        method = self.classification.method
+
+        # Eşik sınıflandırmada parçalı hesap: bellekte sadece eşleşen çiftler tutulur
+        chunk_size = self.chunk_size if method == 'threshold' else max(len(left), 1)
+
+        # Bellek bütçesi varsa parça boyutu her parçadan önce yeniden seçilir
+        budgeted = self.memory_budget is not None and method == 'threshold'
+
+        matched_left, matched_right, matched_scores = [], [], []
+        start = 0
+        while start < len(left):
+            if budgeted:
+                chunk_size = self.memory_budget.chunk_size('dedup_pairs', self.memory_budget.pair_bytes(len(self.features)))
+            chunk_left, chunk_right = left[start:start + chunk_size], right[start:start + chunk_size]
+            start += chunk_size
+
+            rss_before = current_rss() if budgeted else None
+            computed = compute_features_on_positions(self.features, df, df, chunk_left, chunk_right)
+            feature_matrix = np.column_stack([computed[f.label] for f in self.features])
+            if budgeted:
+                self.memory_budget.measure('dedup_pairs', len(chunk_left), feature_matrix.nbytes + chunk_left.nbytes * 2, rss_before)
+
+            is_match, scores = self._classify(feature_matrix, chunk_left, chunk_right)
+            matched_left.append(chunk_left[is_match])
+            matched_right.append(chunk_right[is_match])
+            matched_scores.append(scores[is_match])
+
+        if not matched_left:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+
+        return np.concatenate(matched_left), np.concatenate(matched_right), np.concatenate(matched_scores)
+
+    @staticmethod
+    def union_find(n_records: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        # Vektörel union-find: her bileşen en küçük pozisyonu kök olarak alır
+        labels = np.arange(n_records)
+        if len(left) == 0:
+            return labels
+
+        while True:
+            roots = np.minimum(labels[left], labels[right])
+            updated = labels.copy()
+            np.minimum.at(updated, left, roots)
+            np.minimum.at(updated, right, roots)
+            np.minimum.at(updated, labels, updated)
+
+            # Yol sıkıştırma
+            while True:
+                compressed = updated[updated]
+                if np.array_equal(compressed, updated):
+                    break
+                updated = compressed
+
+            if np.array_equal(updated, labels):
+                return labels
+            labels = updated
+
+    def choose_survivors(self, df: pd.DataFrame, group_positions: np.ndarray, group_roots: np.ndarray) -> dict:
+        if self.survivor_rule == 'first':
+            completeness = np.zeros(len(group_positions))
+        else:
+            # En dolu kayıt kalır; eşitlikte en önceki kayıt
+            completeness = df.iloc[group_positions].notna().sum(axis=1).to_numpy()
+
+        order = np.lexsort((group_positions, -completeness, group_roots))
+        first_in_group = np.r_[True, group_roots[order][1:] != group_roots[order][:-1]]
+        survivors = group_positions[order][first_in_group]
+        return dict(zip(group_roots[order][first_in_group], survivors))
+
+    def format_groups(self, df: pd.DataFrame, data_name: str, labels: np.ndarray, left: np.ndarray, right: np.ndarray, scores: np.ndarray) -> pd.DataFrame:
+        group_sizes = np.bincount(labels, minlength=len(labels))
+        group_positions = np.flatnonzero(group_sizes[labels] > 1)
+
+        if len(group_positions) == 0:
+            return pd.DataFrame()
+
+        group_roots = labels[group_positions]
+        survivors = self.choose_survivors(df, group_positions, group_roots)
+        survivor_positions = np.array([survivors[root] for root in group_roots])
+
+        # Kayıt bazında en yüksek çift skoru
+        max_scores = np.zeros(len(labels))
+        np.maximum.at(max_scores, left, scores)
+        np.maximum.at(max_scores, right, scores)
+
+        # Grup numaraları 1'den başlar (kök sırasına göre)
+        _, group_ids = np.unique(group_roots, return_inverse=True)
+        record_ids = df['id'].to_numpy() if 'id' in df.columns else df.index.to_numpy()
+        n_features = len(self.features)
+
+        results_df = pd.DataFrame({
+            'group_id': group_ids + 1,
+            f'{data_name}_id': record_ids[group_positions],
+            'survivor_id': record_ids[survivor_positions],
+            'is_survivor': group_positions == survivor_positions,
+            'group_size': group_sizes[group_roots],
+            'total_score': max_scores[group_positions],
+            'score_ratio': max_scores[group_positions] / n_features,
+        })
+
+        results_df['match_quality'] = pd.cut(results_df['score_ratio'], [-np.inf, 0.5, 0.7, 0.8, 0.9, np.inf], right=False,
+                                             labels=['VERY_POOR', 'POOR', 'FAIR', 'GOOD', 'EXCELLENT']).astype(str)
+        results_df['confidence'] = np.select([results_df['score_ratio'] >= 0.9, results_df['score_ratio'] >= 0.7], ['HIGH', 'MEDIUM'], 'LOW')
+
+        if self.linkage_plan.output.result_format == 'compact':
+            # Kayıt kolonları kopyalanmaz; gerektiğinde kaynak tabloyla birleştirilir
+            return results_df.sort_values(['group_id', 'is_survivor'], ascending=[True, False]).reset_index(drop=True)
+
+        # Kayıt verileri
+        record_columns = df.iloc[group_positions].reset_index(drop=True)
+        record_columns.columns = [f'{data_name}_{col}' for col in record_columns.columns]
+        record_columns = record_columns.drop(columns=[c for c in record_columns.columns if c in results_df.columns])
+        results_df = pd.concat([results_df, record_columns], axis=1)
+
+        return results_df.sort_values(['group_id', 'is_survivor'], ascending=[True, False]).reset_index(drop=True)
+
+    def run(self, df: pd.DataFrame, data_name: str = "data", indexer=None) -> pd.DataFrame:
+        start_time = time.time()
+
+        left, right = self.generate_pairs(df, indexer)
+        pairs_elapsed = time.time() - start_time
+        total_possible = len(df) * (len(df) - 1) // 2
+        log.info(f"Candidate pairs generated: {len(left):,} of {total_possible:,} ({pairs_elapsed:.2f}s)")
+
+        matched_left, matched_right, scores = self.score_pairs(df, left, right)
+        log.info(f"Duplicate pairs: {len(matched_left):,}")
+
+        labels = self.union_find(len(df), matched_left, matched_right)
+        results_df = self.format_groups(df, data_name, labels, matched_left, matched_right, scores)
+
+        n_groups = results_df['group_id'].nunique() if not results_df.empty else 0
+        self.stats = {
+            'total_records': len(df),
+            'total_possible_pairs': total_possible,
+            'candidate_pairs': len(left),
+            'duplicate_pairs': len(matched_left),
+            'duplicate_groups': n_groups,
+            'records_in_groups': len(results_df),
+            'elapsed': time.time() - start_time,
+        }
+
+        log.info(f"Duplicate groups: {n_groups} ({len(results_df)} records, {self.stats['elapsed']:.2f}s)")
+        return results_df
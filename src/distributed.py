@@ -0,0 +1,426 @@
+import os
+import queue
+import socket
+import threading
+import time
+from dataclasses import replace
+from itertools import combinations
+from multiprocessing import get_context
+from multiprocessing.managers import BaseManager, DictProxy
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from event_log import log
+from linkage_plan import LinkagePlan
+from memory_budget import current_rss
+from shared_frames import SharedFrameCache, SharedFrameStore, shared_memory_enabled
+
+
+class LinkageManager(BaseManager):
+    # Worker tarafı: coordinator'ın TCP üzerinden paylaştığı kuyruklar
+    pass
+
+
+LinkageManager.register('get_tasks')
+LinkageManager.register('get_results')
+LinkageManager.register('get_claims', proxytype=DictProxy)
+LinkageManager.register('get_workers', proxytype=DictProxy)
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid worker address: {address} (expected host:port)")
+    return host, int(port)
+
+
+def partition_frame(df: pd.DataFrame, key, partitions: int) -> List[pd.DataFrame]:
+    """Split a table by a stable hash of the blocking key.
+
+    ``hash_pandas_object`` gives the same hash for the same value in every
+    process (unlike ``hash()``), so equal keys of both tables land in the
+    same partition and block indexing finds exactly the same candidates.
+    """
+    codes = pd.util.hash_pandas_object(df[key], index=False).to_numpy() % partitions
+    return [df[codes == partition] for partition in range(partitions)]
+
+
+def run_worker(address: Tuple[str, int], authkey: bytes, worker_id: Optional[str] = None,
+               connect_timeout: float = 30.0, log_level: Optional[str] = None):
+    """Worker loop: take a task, link its pair/partition, send the result back.
+
+    Runs until the coordinator sends a ``None`` task or goes away. Errors of
+    a task are returned to the coordinator, which decides about retries.
+    """
+    from record_linker import RecordLinker
+
+    if log_level:
+        log.configure(level=log_level)
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    manager = LinkageManager(address=address, authkey=authkey)
+
+    # Coordinator henüz dinlemiyorsa bağlantı tekrar denenir
+    deadline = time.time() + connect_timeout
+    while True:
+        try:
+            manager.connect()
+            break
+        except (ConnectionError, OSError):
+            if time.time() > deadline:
+                raise
+            time.sleep(0.5)
+
+    tasks = manager.get_tasks()
+    results = manager.get_results()
+    claims = manager.get_claims()
+    manager.get_workers().update({worker_id: os.getpid()})
+    log.info(f"Worker {worker_id} connected to {address[0]}:{address[1]}", event='worker.start', worker=worker_id)
+
+    # Paylaşılan bellekteki tablolar bir kez bağlanır; başlangıç RSS'i kazancı ölçmek için gönderilir
+    frames = SharedFrameCache()
+    baseline_rss = current_rss()
+
+    while True:
+        try:
+            task = tasks.get()
+        except (EOFError, ConnectionError, OSError):
+            break
+        if task is None:
+            break
+
+        claims.update({task['task_id']: (worker_id, os.getpid(), time.time())})
+        message = {'task_id': task['task_id'], 'worker': worker_id}
+        try:
+            linker = RecordLinker(linkage_plan=task['linkage_plan'])
+            if task['plan'] is not None:
+                linker.comparison_plans = {task['plan'].name: task['plan']}
+            left, right = frames.get(task['left']), frames.get(task['right'])
+            message['results'], message['stats'] = linker.link_pair(left, right, task['db1'], task['db2'])
+            del linker, left, right
+        except Exception as e:
+            message['error'] = str(e)
+        message['rss'] = current_rss()
+        message['baseline_rss'] = baseline_rss
+
+        try:
+            results.put(message)
+        except (EOFError, ConnectionError, OSError):
+            break
+
+    frames.close()
+    log.info(f"Worker {worker_id} stopped", event='worker.stop', worker=worker_id)
+
+
+class DistributedLinkage:
+    """Pairwise linkage over worker processes connected through TCP.
+
+    The coordinator serves a task queue, a result queue and a claims table
+    with a ``multiprocessing`` manager. Work is split per database pair
+    (``partitioning: pair``) or, for block indexing, each pair is further
+    split into ``partitions`` by a hash of the blocking key; partitions of
+    one pair are merged before the pair is emitted. ``workers`` local
+    processes are started on this machine and more can join from other
+    hosts with ``main.py worker --connect host:port --authkey ...``.
+
+    A task is sent again when its worker returns an error, when the local
+    worker process that claimed it dies, or after ``task_timeout`` seconds;
+    after ``max_retries`` resends the pair part is recorded as failed.
+
+    With ``shared_memory`` (default, loopback host only) tables are put in
+    shared memory once and tasks carry handles instead of pickled
+    DataFrames; the peak RSS of every worker is reported at the end.
+    """
+
+    def __init__(self, linkage_plan: LinkagePlan):
+        self.linkage_plan = linkage_plan
+        spec = linkage_plan.distributed
+        self.workers = spec.workers
+        self.host = spec.host
+        self.port = spec.port
+        self.authkey = (spec.authkey or os.urandom(16).hex()).encode('utf-8')
+        self.partitioning = spec.partitioning
+        self.partitions = spec.partitions
+        self.max_retries = spec.max_retries
+        self.task_timeout = spec.task_timeout
+        self.worker_log_level = spec.worker_log_level
+        self.poll_interval = 0.5
+
+        if self.partitioning == 'key_hash' and (self.linkage_plan.indexing.method != 'block' or self.linkage_plan.classification.method != 'threshold'):
+            # Komşu pencereleri ve eğitilen sınıflandırıcılar bölümlemeden etkilenir
+            log.warning("key_hash partitioning needs block indexing and threshold classification, using pair partitioning")
+            self.partitioning = 'pair'
+
+        self.shared_memory = shared_memory_enabled(spec.shared_memory, self.host)
+        self.frame_store = None
+        self.worker_rss: Dict[str, dict] = {}
+
+        self.stats = {'tasks': 0, 'retries': 0, 'failed': 0, 'respawned': 0}
+        self._processes = []
+        self._server = None
+        self._server_thread = None
+
+    def run(self, data_dict: Dict[str, pd.DataFrame], db_names: List[str], exclude_fields: Optional[Dict[str, List[str]]] = None,
+            checkpoint=None, on_result=None):
+        """Link all database pairs on the workers.
+
+        Returns ``(all_results, master_linker)`` like
+        ``RecordLinker.run_multi_database_linkage`` does with ``on_result``.
+        """
+        from record_linker import RecordLinker
+
+        master = RecordLinker(linkage_plan=self.linkage_plan)
+        master.pair_stats = {}
+        all_results = {}
+
+        pending_pairs = []
+        for db1, db2 in combinations(db_names, 2):
+            comparison_name = f"{db1}_{db2}"
+            if checkpoint is not None and checkpoint.is_pair_complete(comparison_name):
+                restored = checkpoint.load_pair_results(comparison_name)
+                log.info(f"\nSkipping {comparison_name}: {len(restored)} matches restored from checkpoint")
+                master._emit_pair_result(all_results, comparison_name, restored, None, on_result)
+            else:
+                pending_pairs.append((db1, db2))
+
+        if not pending_pairs:
+            return all_results, master
+
+        master.build_comparison_plans(data_dict, db_names, exclude_fields)
+        if self.shared_memory:
+            self.frame_store = SharedFrameStore()
+        try:
+            tasks, parts = self._build_tasks(data_dict, pending_pairs, master.comparison_plans)
+        except Exception:
+            self._close_frame_store()
+            raise
+        self.stats['tasks'] = len(tasks)
+        if self.frame_store is not None:
+            self.frame_store.print_summary()
+
+        log.info(f"Distributed linkage: {len(pending_pairs)} pairs, {len(tasks)} tasks ({self.partitioning} partitioning), "
+                 f"{self.workers} local workers", event='distributed.start', pairs=len(pending_pairs), tasks=len(tasks),
+                 partitioning=self.partitioning, workers=self.workers)
+
+        start_time = time.perf_counter()
+        self._start_server()
+        try:
+            self._start_local_workers()
+
+            def pair_done(comparison_name: str, frames: list, stats_list: list):
+                results, stats = self._merge_pair(data_dict, parts[comparison_name], frames, stats_list)
+                if checkpoint is not None:
+                    checkpoint.save_pair_results(comparison_name, results)
+                log.info(f"{comparison_name}: {len(results)} matches found", event='pair.done', pair=comparison_name, matches=len(results))
+                master._emit_pair_result(all_results, comparison_name, results, stats, on_result)
+
+            self._collect(tasks, parts, pair_done)
+        finally:
+            self._shutdown()
+            self._close_frame_store()
+
+        elapsed = time.perf_counter() - start_time
+        log.info(f"Distributed linkage finished in {elapsed:.2f}s: {self.stats['tasks']} tasks, {self.stats['retries']} retries, "
+                 f"{self.stats['failed']} failed, {self.stats['respawned']} workers restarted",
+                 event='distributed.done', seconds=round(elapsed, 3), **self.stats)
+        self.print_worker_memory()
+        return all_results, master
+
+    def print_worker_memory(self):
+        for worker, rss in sorted(self.worker_rss.items()):
+            log.info(f"   {worker}: peak RSS {rss['peak'] / 1024 / 1024:,.1f} MB (after start {rss['baseline'] / 1024 / 1024:,.1f} MB)",
+                     event='worker.rss', worker=worker, peak_rss=rss['peak'], baseline_rss=rss['baseline'])
+
+    def _close_frame_store(self):
+        if self.frame_store is not None:
+            self.frame_store.close()
+            self.frame_store = None
+
+    def _build_tasks(self, data_dict, pairs, plans):
+        # Worker'lar kalıcı özellik deposunu kullanmaz (parçaların parmak izi yok)
+        worker_plan = replace(self.linkage_plan, feature_store=replace(self.linkage_plan.feature_store, enabled=False))
+        key = self.linkage_plan.indexing.key
+
+        tasks = {}
+        parts = {}
+        split_cache = {}
+        shared = {}
+
+        def frame(name: str, df: pd.DataFrame):
+            # Her tablo/bölüm paylaşılan belleğe bir kez yazılır, görevler sadece handle taşır
+            if self.frame_store is None:
+                return df
+            if name not in shared:
+                shared[name] = self.frame_store.share(name, df)
+            return shared[name]
+        for db1, db2 in pairs:
+            comparison_name = f"{db1}_{db2}"
+            if self.partitioning == 'key_hash':
+                for db_name in (db1, db2):
+                    if db_name not in split_cache:
+                        split_cache[db_name] = partition_frame(data_dict[db_name], key, self.partitions)
+                # Bir tarafı boş olan bölümde aday çift olamaz
+                pieces = [(p, frame(f"{db1}#{p}", split_cache[db1][p]), frame(f"{db2}#{p}", split_cache[db2][p]))
+                          for p in range(self.partitions) if len(split_cache[db1][p]) and len(split_cache[db2][p])]
+            else:
+                pieces = [(0, frame(db1, data_dict[db1]), frame(db2, data_dict[db2]))]
+
+            parts[comparison_name] = {'db1': db1, 'db2': db2, 'tasks': []}
+            for partition, left, right in pieces:
+                task_id = len(tasks)
+                tasks[task_id] = {'task_id': task_id, 'pair': comparison_name, 'db1': db1, 'db2': db2, 'partition': partition,
+                                  'left': left, 'right': right, 'plan': plans.get(comparison_name), 'linkage_plan': worker_plan}
+                parts[comparison_name]['tasks'].append(task_id)
+
+        return tasks, parts
+
+    def _merge_pair(self, data_dict, part, frames, stats_list):
+        db1, db2 = part['db1'], part['db2']
+        frames = [frame for frame in frames if not frame.empty]
+        if frames:
+            results = pd.concat(frames, ignore_index=True).sort_values('total_score', ascending=False, kind='mergesort')
+        else:
+            results = pd.DataFrame()
+
+        stats = {'left_records': len(data_dict[db1]), 'right_records': len(data_dict[db2]),
+                 'candidate_pairs': sum(s.get('candidate_pairs') or 0 for s in stats_list),
+                 'total_possible_pairs': len(data_dict[db1]) * len(data_dict[db2]),
+                 'matches': len(results), 'elapsed': sum(s.get('elapsed', 0.0) for s in stats_list)}
+        errors = [s['error'] for s in stats_list if 'error' in s]
+        if errors:
+            stats['error'] = '; '.join(errors)
+        return results, stats
+
+    def _start_server(self):
+        # Kuyruklar coordinator sürecinde durur; manager sunucusu bir thread'de TCP'den sunar
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._claims = {}
+        self._worker_ids = {}
+
+        class _ServingManager(LinkageManager):
+            pass
+
+        _ServingManager.register('get_tasks', callable=lambda: self._tasks)
+        _ServingManager.register('get_results', callable=lambda: self._results)
+        _ServingManager.register('get_claims', callable=lambda: self._claims, proxytype=DictProxy)
+        _ServingManager.register('get_workers', callable=lambda: self._worker_ids, proxytype=DictProxy)
+
+        self._server = _ServingManager(address=(self.host, self.port), authkey=self.authkey).get_server()
+        self.address = self._server.address
+        self._server_thread = threading.Thread(target=self._server.serve_forever, name='distributed-server', daemon=True)
+        self._server_thread.start()
+        log.info(f"Coordinator listening on {self.address[0]}:{self.address[1]}", event='distributed.listen',
+                 host=self.address[0], port=self.address[1])
+
+    def _start_local_workers(self):
+        self._context = get_context('spawn')
+        for i in range(self.workers):
+            self._spawn_worker(f"local-{i}")
+
+    def _spawn_worker(self, worker_id: str):
+        process = self._context.Process(target=run_worker, args=(self.address, self.authkey, worker_id, 30.0, self.worker_log_level),
+                                        name=worker_id, daemon=True)
+        process.start()
+        self._processes.append(process)
+
+    def _collect(self, tasks: dict, parts: dict, pair_done):
+        pending = dict(tasks)
+        attempts = {task_id: 0 for task_id in tasks}
+        sent_at = {}
+        done = {name: {} for name in parts}
+
+        def send(task_id):
+            sent_at[task_id] = time.time()
+            self._tasks.put(pending[task_id])
+
+        def finish(task_id, results, stats):
+            task = pending.pop(task_id)
+            self._claims.pop(task_id, None)
+            done[task['pair']][task_id] = (results, stats)
+            if len(done[task['pair']]) == len(parts[task['pair']]['tasks']):
+                finished = done.pop(task['pair'])
+                pair_done(task['pair'], [finished[t][0] for t in parts[task['pair']]['tasks']],
+                          [finished[t][1] for t in parts[task['pair']]['tasks']])
+
+        def retry(task_id, reason: str):
+            task = pending[task_id]
+            self._claims.pop(task_id, None)
+            attempts[task_id] += 1
+            if attempts[task_id] > self.max_retries:
+                self.stats['failed'] += 1
+                log.error(f"{task['pair']} (partition {task['partition']}) failed after {self.max_retries} retries: {reason}",
+                          event='task.failed', pair=task['pair'], partition=task['partition'], reason=reason)
+                finish(task_id, pd.DataFrame(), {'candidate_pairs': 0, 'elapsed': 0.0, 'error': reason})
+            else:
+                self.stats['retries'] += 1
+                log.warning(f"{task['pair']} (partition {task['partition']}) is sent again ({attempts[task_id]}/{self.max_retries}): {reason}",
+                            event='task.retry', pair=task['pair'], partition=task['partition'], attempt=attempts[task_id], reason=reason)
+                send(task_id)
+
+        for task_id in list(pending):
+            send(task_id)
+
+        progress = log.progress('distributed', total=len(tasks), unit='tasks')
+        while pending:
+            try:
+                message = self._results.get(timeout=self.poll_interval)
+            except queue.Empty:
+                message = None
+
+            if message is not None and message.get('rss'):
+                rss = self.worker_rss.setdefault(message['worker'], {'peak': 0, 'baseline': message.get('baseline_rss') or 0})
+                rss['peak'] = max(rss['peak'], message['rss'])
+
+            if message is not None and message['task_id'] in pending:
+                task_id = message['task_id']
+                error = message.get('error') or message.get('stats', {}).get('error')
+                if error:
+                    retry(task_id, f"{message['worker']}: {error}")
+                else:
+                    finish(task_id, message['results'], message['stats'])
+                    progress.update()
+
+            self._check_workers(pending, retry)
+
+            if self.task_timeout:
+                now = time.time()
+                for task_id in [t for t in pending if now - sent_at[t] > self.task_timeout]:
+                    retry(task_id, f"no result within {self.task_timeout}s")
+        progress.finish()
+
+    def _check_workers(self, pending: dict, retry):
+        # Ölen yerel worker'ın üstlendiği görevler tekrar kuyruğa girer, yerine yenisi başlatılır
+        for process in [p for p in self._processes if not p.is_alive()]:
+            self._processes.remove(process)
+            lost = [task_id for task_id, (_, pid, _) in list(self._claims.items()) if pid == process.pid and task_id in pending]
+            if not pending:
+                continue
+
+            log.warning(f"Worker {process.name} exited (code {process.exitcode}), {len(lost)} tasks to resend",
+                        event='worker.lost', worker=process.name, exitcode=process.exitcode, tasks=len(lost))
+            for task_id in lost:
+                retry(task_id, f"worker {process.name} exited")
+
+            self.stats['respawned'] += 1
+            self._spawn_worker(f"{process.name.split('#')[0]}#{self.stats['respawned']}")
+
+    def _shutdown(self):
+        # Bağlı her worker için bir durdurma işareti (uzak worker'lar dahil)
+        for _ in range(max(len(self._worker_ids), len(self._processes))):
+            self._tasks.put(None)
+
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+        if self._server is not None:
+            stop_event = getattr(self._server, 'stop_event', None)
+            if stop_event is not None:
+                stop_event.set()
+            self._server_thread.join(timeout=5)
+            self._server.listener.close()
+            self._server = None
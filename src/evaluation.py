@@ -0,0 +1,215 @@
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from event_log import log
+
+if TYPE_CHECKING:
+    from linkage_plan import EvaluationSpec, GroundTruthSpec
+
+FEBRL_DATASETS = ('febrl1', 'febrl2', 'febrl3', 'febrl4')
+
+
+def load_febrl_links(dataset: str) -> Tuple[np.ndarray, np.ndarray]:
+    """True links of a FEBRL dataset as SQLite rowids.
+
+    The databases under ``data/febrl`` keep the row order of the
+    recordlinkage datasets, so record ``i`` of the dataset is ``rowid i + 1``.
+    For ``febrl4`` the left ids belong to ``patients_original`` and the right
+    ids to ``patients_duplicates``; the other datasets link a table to itself.
+    """
+    from recordlinkage import datasets
+
+    if dataset not in FEBRL_DATASETS:
+        raise ValueError(f"Unknown FEBRL dataset: {dataset}")
+
+    if dataset == 'febrl4':
+        df_a, df_b, links = datasets.load_febrl4(return_links=True)
+    else:
+        df_a, links = getattr(datasets, f'load_{dataset}')(return_links=True)
+        df_b = df_a
+
+    rowid_a = pd.Series(np.arange(1, len(df_a) + 1), index=df_a.index)
+    rowid_b = pd.Series(np.arange(1, len(df_b) + 1), index=df_b.index)
+
+    left = rowid_a.loc[links.get_level_values(0)].to_numpy()
+    right = rowid_b.loc[links.get_level_values(1)].to_numpy()
+    return left, right
+
+
+def load_ground_truth(truth: 'GroundTruthSpec') -> Tuple[np.ndarray, np.ndarray]:
+    # {dataset: febrl4} veya {csv: yol, left: kolon, right: kolon}
+    if truth.dataset:
+        return load_febrl_links(truth.dataset)
+
+    if truth.csv:
+        if not os.path.exists(truth.csv):
+            raise FileNotFoundError(f"Ground truth file not found: {truth.csv}")
+
+        truth_df = pd.read_csv(truth.csv)
+        return truth_df[truth.left].to_numpy(), truth_df[truth.right].to_numpy()
+
+    raise ValueError("ground_truth needs either 'dataset' or 'csv'")
+
+
+def pair_codes(pairs: List[Tuple[np.ndarray, np.ndarray]], dedup: bool = False) -> List[np.ndarray]:
+    """Encode several ``(left_ids, right_ids)`` pair lists as int64 codes.
+
+    All lists share one vocabulary per side, so equal pairs get equal codes
+    and set operations work on plain integers. For deduplication the pair
+    order is irrelevant: both sides share one vocabulary and each pair is
+    stored as ``(min, max)``.
+    """
+    sizes = [len(left) for left, _ in pairs]
+    all_left = np.concatenate([np.asarray(left) for left, _ in pairs])
+    all_right = np.concatenate([np.asarray(right) for _, right in pairs])
+
+    if dedup:
+        codes, uniques = pd.factorize(np.concatenate([all_left, all_right]))
+        n_right = len(uniques)
+        left_codes, right_codes = codes[:len(all_left)], codes[len(all_left):]
+        left_codes, right_codes = np.minimum(left_codes, right_codes), np.maximum(left_codes, right_codes)
+    else:
+        left_codes, _ = pd.factorize(all_left)
+        right_codes, right_uniques = pd.factorize(all_right)
+        n_right = len(right_uniques)
+
+    codes = left_codes.astype(np.int64) * max(n_right, 1) + right_codes.astype(np.int64)
+    return np.split(codes, np.cumsum(sizes)[:-1])
+
+
+def encode_pairs(left_ids: np.ndarray, right_ids: np.ndarray, truth_left: np.ndarray, truth_right: np.ndarray, dedup: bool = False):
+    # Aday kodları (sırası korunur) ve tekil gerçek bağlantı kodları
+    candidate_codes, truth_codes = pair_codes([(left_ids, right_ids), (truth_left, truth_right)], dedup)
+    return candidate_codes, np.unique(truth_codes)
+
+
+def label_candidates(left_ids: np.ndarray, right_ids: np.ndarray, truth_left: np.ndarray, truth_right: np.ndarray,
+                     loaded_left: np.ndarray, loaded_right: np.ndarray, dedup: bool = False):
+    # Aday çiftler için doğruluk etiketi ve yüklenen kayıtlar arasındaki gerçek bağlantı sayısı
+    keep = np.isin(truth_left, loaded_left) & np.isin(truth_right, loaded_right)
+
+    candidate_codes, truth_codes = encode_pairs(left_ids, right_ids, truth_left[keep], truth_right[keep], dedup)
+    return np.isin(candidate_codes, truth_codes), len(truth_codes)
+
+
+def precision_recall(true_positives, predicted, n_true):
+    true_positives = np.asarray(true_positives, dtype=np.float64)
+    predicted = np.asarray(predicted, dtype=np.float64)
+
+    precision = np.divide(true_positives, predicted, out=np.zeros_like(true_positives), where=predicted > 0)
+    recall = true_positives / n_true if n_true else np.zeros_like(true_positives)
+    denominator = precision + recall
+    f1 = np.divide(2 * precision * recall, denominator, out=np.zeros_like(true_positives), where=denominator > 0)
+    return precision, recall, f1
+
+
+def record_ids(df: pd.DataFrame) -> np.ndarray:
+    # Sonuç tablolarındaki kimlikler: 'id' kolonu varsa o, yoksa DataFrame index'i
+    return df['id'].to_numpy() if 'id' in df.columns else df.index.to_numpy()
+
+
+def group_pairs(group_ids: np.ndarray, member_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Every pair of records that share a duplicate group.
+
+    Deduplication results list group members, not pairs; evaluating them as
+    pairs counts all links implied by the groups (transitive closure).
+    """
+    order = np.argsort(np.asarray(group_ids), kind='stable')
+    groups, members = np.asarray(group_ids)[order], np.asarray(member_ids)[order]
+
+    # Her üye, grubunda kendisinden sonra gelenlerle eşleşir
+    group_end = np.searchsorted(groups, groups, side='right')
+    counts = group_end - np.arange(1, len(groups) + 1)
+    owners = np.repeat(np.arange(len(groups)), counts)
+    partners = owners + 1 + np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return members[owners], members[partners]
+
+
+def linkage_metrics(predicted: Tuple[np.ndarray, np.ndarray], truth: Tuple[np.ndarray, np.ndarray],
+                    loaded: Optional[Tuple[np.ndarray, np.ndarray]] = None, candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                    candidate_pairs: Optional[int] = None, total_possible_pairs: Optional[int] = None, dedup: bool = False) -> dict:
+    """Quality metrics of one comparison against its true links.
+
+    Predicted, true and (optionally) candidate pairs are int-encoded on
+    shared vocabularies; the counts come from ``np.intersect1d`` on the
+    unique codes. ``loaded`` (record ids of both sides) drops true links
+    whose records were not loaded (``--limit`` runs). Pair completeness
+    needs the candidate pairs; the reduction ratio only needs their count.
+    """
+    truth_left, truth_right = np.asarray(truth[0]), np.asarray(truth[1])
+    if loaded is not None:
+        keep = np.isin(truth_left, loaded[0]) & np.isin(truth_right, loaded[1])
+        truth_left, truth_right = truth_left[keep], truth_right[keep]
+
+    pairs = [predicted, (truth_left, truth_right)] + ([candidates] if candidates is not None else [])
+    codes = [np.unique(c) for c in pair_codes(pairs, dedup)]
+    predicted_codes, truth_codes = codes[0], codes[1]
+
+    true_positives = len(np.intersect1d(predicted_codes, truth_codes, assume_unique=True))
+    precision, recall, f1 = precision_recall([true_positives], [len(predicted_codes)], len(truth_codes))
+    metrics = {'true_links': len(truth_codes), 'matches': len(predicted_codes), 'true_positives': true_positives,
+               'precision': float(precision[0]), 'recall': float(recall[0]), 'f1': float(f1[0])}
+
+    if candidates is not None:
+        true_candidates = len(np.intersect1d(codes[2], truth_codes, assume_unique=True))
+        metrics['true_candidates'] = true_candidates
+        metrics['pair_completeness'] = true_candidates / len(truth_codes) if len(truth_codes) else 0.0
+        if candidate_pairs is None:
+            candidate_pairs = len(codes[2])
+
+    if candidate_pairs is not None:
+        metrics['candidate_pairs'] = int(candidate_pairs)
+        if total_possible_pairs:
+            metrics['total_possible_pairs'] = int(total_possible_pairs)
+            metrics['reduction_ratio'] = 1 - candidate_pairs / total_possible_pairs
+
+    return metrics
+
+
+def format_metrics(metrics: dict) -> str:
+    parts = []
+    if 'pair_completeness' in metrics:
+        parts.append(f"PC {metrics['pair_completeness'] * 100:.1f}%")
+    if 'reduction_ratio' in metrics:
+        parts.append(f"RR {metrics['reduction_ratio'] * 100:.2f}%")
+    parts.append(f"precision {metrics['precision']:.3f}, recall {metrics['recall']:.3f}, F1 {metrics['f1']:.3f}")
+    return ', '.join(parts)
+
+
+class LinkageEvaluator:
+    """Scores linkage results against ``evaluation.ground_truth``.
+
+    Ground truth is configured per comparison name like the threshold
+    sweep (``{dataset: febrl4}`` or ``{csv: path, left: col, right: col}``)
+    and loaded once. Results are kept per comparison for the report.
+    """
+
+    def __init__(self, evaluation: 'EvaluationSpec'):
+        self.evaluation = evaluation
+        self.pair_completeness = evaluation.pair_completeness
+        self.results: Dict[str, dict] = {}
+        self._truth: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.evaluation.enabled
+
+    def has_truth(self, comparison_name: str) -> bool:
+        return self.evaluation.truth(comparison_name) is not None
+
+    def truth(self, comparison_name: str) -> Tuple[np.ndarray, np.ndarray]:
+        if comparison_name not in self._truth:
+            self._truth[comparison_name] = load_ground_truth(self.evaluation.truth(comparison_name))
+        return self._truth[comparison_name]
+
+    def evaluate(self, comparison_name: str, predicted: Tuple[np.ndarray, np.ndarray], **kwargs) -> dict:
+        metrics = linkage_metrics(predicted, self.truth(comparison_name), **kwargs)
+        self.results[comparison_name] = metrics
+
+        log.info(f"{comparison_name}: {format_metrics(metrics)} ({metrics['true_positives']:,} of {metrics['true_links']:,} true links found)",
+                 event='evaluation.done', comparison=comparison_name,
+                 **{key: round(value, 6) if isinstance(value, float) else value for key, value in metrics.items()})
+        return metrics
@@ -0,0 +1,192 @@
+import json
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+
+class Progress:
+    """Progress of one long stage with throughput and ETA.
+
+    ``update`` only adds to a counter; an event is written at most every
+    ``interval`` seconds and once more by ``finish``.
+    """
+
+    def __init__(self, log: 'EventLog', stage: str, total: Optional[int], unit: str = 'items'):
+        self.log = log
+        self.stage = stage
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.start_time = time.perf_counter()
+        self._last_emit = self.start_time
+
+    def update(self, count: int = 1):
+        self.done += count
+        if self.total is not None and self.done >= self.total:
+            return  # son durum finish() ile yazılır
+
+        now = time.perf_counter()
+        if now - self._last_emit >= self.log.progress_interval:
+            self._last_emit = now
+            self._emit(now, final=False)
+
+    def finish(self):
+        self._emit(time.perf_counter(), final=True)
+
+    def _emit(self, now: float, final: bool):
+        elapsed = now - self.start_time
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        fields = {'stage': self.stage, 'done': self.done, 'total': self.total, 'unit': self.unit,
+                  'elapsed': round(elapsed, 3), 'rate': round(rate, 1)}
+
+        if final:
+            message = f"{self.stage}: {self.done:,} {self.unit} in {elapsed:.2f}s ({rate:,.0f} {self.unit}/s)"
+        elif self.total:
+            eta = (self.total - self.done) / rate if rate > 0 else None
+            fields.update(percent=round(self.done / self.total * 100, 1), eta=round(eta, 1) if eta is not None else None)
+            message = (f"{self.stage}: {self.done:,}/{self.total:,} {self.unit} ({fields['percent']:.1f}%, "
+                       f"{rate:,.0f} {self.unit}/s, ETA {eta if eta is not None else 0:.0f}s)")
+        else:
+            message = f"{self.stage}: {self.done:,} {self.unit} ({rate:,.0f} {self.unit}/s)"
+
+        self.log.emit('info', 'progress.done' if final else 'progress', message, **fields)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.finish()
+
+
+class NullProgress:
+    # Sessiz modda ilerleme takibi hiçbir şey yapmaz
+    done = 0
+
+    def update(self, count: int = 1):
+        pass
+
+    def finish(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+NULL_PROGRESS = NullProgress()
+
+
+class EventLog:
+    """Leveled event and metrics output for the whole pipeline.
+
+    ``text`` format writes the message only (the familiar console output);
+    ``json`` format writes one object per line with time, level, event name,
+    message and structured fields. Events below the configured level return
+    before any formatting, and ``quiet`` (level ``warning``, no progress)
+    keeps the cost of disabled calls to one integer comparison.
+    """
+
+    def __init__(self):
+        self.level = LEVELS['info']
+        self.format = 'text'
+        self.stream: TextIO = sys.stdout
+        self.progress_interval = 1.0
+        self.progress_enabled = True
+        self._lock = threading.Lock()
+        self._file = None
+
+    def configure(self, level: Optional[str] = None, format: Optional[str] = None, file: Optional[str] = None,
+                  progress_interval: Optional[float] = None, quiet: bool = False):
+        if level is not None:
+            if level not in LEVELS:
+                raise ValueError(f"Unknown log level: {level}")
+            self.level = LEVELS[level]
+        if format is not None:
+            if format not in ('text', 'json'):
+                raise ValueError(f"Unknown log format: {format}")
+            self.format = format
+        if progress_interval is not None:
+            self.progress_interval = progress_interval
+        if file is not None:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(file, 'a', encoding='utf-8')
+            self.stream = self._file
+        if quiet:
+            self.level = max(self.level, LEVELS['warning'])
+
+        self.progress_enabled = self.level <= LEVELS['info']
+
+    def enabled(self, level: str) -> bool:
+        return LEVELS[level] >= self.level
+
+    def _format(self, level: str, event: Optional[str], message: str, fields: dict) -> Optional[str]:
+        if self.format == 'json':
+            # Sadece süsleme olan satırlar (====, boş satır) JSON'a yazılmaz
+            message = message.strip()
+            if not fields and not any(c.isalnum() for c in message):
+                return None
+            record = {'ts': round(time.time(), 3), 'level': level, 'event': event or 'message', 'message': message}
+            record.update(fields)
+            return json.dumps(record, default=str, ensure_ascii=False)
+        return message
+
+    def emit(self, level: str, event: Optional[str], message: str = '', **fields):
+        if LEVELS[level] < self.level:
+            return
+
+        line = self._format(level, event, message, fields)
+        if line is None:
+            return
+
+        with self._lock:
+            self.stream.write(line + '\n')
+            if LEVELS[level] >= LEVELS['warning']:
+                self.stream.flush()
+
+    def debug(self, message: str, event: Optional[str] = None, **fields):
+        if self.level <= 10:
+            self.emit('debug', event, message, **fields)
+
+    def info(self, message: str, event: Optional[str] = None, **fields):
+        if self.level <= 20:
+            self.emit('info', event, message, **fields)
+
+    def warning(self, message: str, event: Optional[str] = None, **fields):
+        if self.level <= 30:
+            self.emit('warning', event, message, **fields)
+
+    def error(self, message: str, event: Optional[str] = None, **fields):
+        self.emit('error', event, message, **fields)
+
+    def result(self, message: str, event: Optional[str] = None, **fields):
+        # Komutun cevabı (eşleşmeler, öneri, tarama tablosu): log seviyesinden bağımsız olarak stdout'a yazılır
+        line = self._format('result', event, message, fields)
+        if line is None:
+            return
+
+        with self._lock:
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+            if self.stream is not sys.stdout:
+                self.stream.write(line + '\n')
+
+    def metric(self, name: str, value, message: Optional[str] = None, **fields):
+        # Sayısal ölçüm: JSON'da {"event": "metric", "metric": ad, "value": değer}
+        if self.level <= 20:
+            self.emit('info', 'metric', message if message is not None else f"{name}: {value}", metric=name, value=value, **fields)
+
+    def progress(self, stage: str, total: Optional[int] = None, unit: str = 'items'):
+        if not self.progress_enabled:
+            return NULL_PROGRESS
+        return Progress(self, stage, total, unit)
+
+
+# Tüm modüllerin kullandığı tek örnek (main.py CLI/config ile ayarlar)
+log = EventLog()
@@ -0,0 +1,97 @@
+import os
+import json
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from checkpoint import compute_config_hash
+from linkage_plan import ComparisonSpec, IndexingSpec
+
+
+class FeatureStore:
+    """Candidate pairs and feature columns persisted as memory-mapped NumPy files.
+
+    Every comparison gets a directory keyed by the input fingerprints of both
+    databases and the resolved indexing spec. The candidate pairs are stored once as
+    positional ``left.npy`` / ``right.npy`` arrays, and every comparison rule
+    as its own ``<rule hash>.npy`` column. Changing one rule therefore only
+    recomputes that column; all other columns are loaded with ``mmap_mode='r'``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def pair_key(fingerprints: List[str], indexing: IndexingSpec) -> str:
+        # Varsayılanları çözülmüş spec: aynı indekslemenin farklı yazımları aynı anahtarı verir
+        return compute_config_hash({'inputs': fingerprints, 'indexing': indexing.as_dict()})[:24]
+
+    @staticmethod
+    def feature_key(rule: ComparisonSpec) -> str:
+        # Config'teki kural sözlüğünden: önceki çalışmaların kolonları geçerli kalır
+        return compute_config_hash(rule.as_config())[:24]
+
+    def _pair_dir(self, pair_key: str) -> str:
+        return os.path.join(self.path, pair_key)
+
+    def _write_array(self, path: str, values: np.ndarray):
+        # Yarım yazılmış dosya okunmasın: geçici dosya + atomik yer değiştirme
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, np.ascontiguousarray(values))
+        os.replace(tmp_path, path)
+
+    def _read_array(self, path: str) -> Optional[np.ndarray]:
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def _update_meta(self, pair_key: str, **entries):
+        meta_path = os.path.join(self._pair_dir(pair_key), 'meta.json')
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+        for key, value in entries.items():
+            if isinstance(value, dict) and isinstance(meta.get(key), dict):
+                meta[key].update(value)
+            else:
+                meta[key] = value
+
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, default=str)
+
+    def load_candidates(self, pair_key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        left = self._read_array(os.path.join(self._pair_dir(pair_key), 'left.npy'))
+        right = self._read_array(os.path.join(self._pair_dir(pair_key), 'right.npy'))
+        if left is None or right is None or len(left) != len(right):
+            return None
+        return left, right
+
+    def save_candidates(self, pair_key: str, left: np.ndarray, right: np.ndarray, name: str = ''):
+        # Önce feature kolonları silinir: yeni aday çiftlerle eski kolonlar hizalanmaz
+        pair_dir = self._pair_dir(pair_key)
+        if os.path.isdir(pair_dir):
+            for filename in os.listdir(pair_dir):
+                if filename.endswith('.npy'):
+                    os.remove(os.path.join(pair_dir, filename))
+
+        self._write_array(os.path.join(pair_dir, 'left.npy'), np.asarray(left, dtype=np.int64))
+        self._write_array(os.path.join(pair_dir, 'right.npy'), np.asarray(right, dtype=np.int64))
+        self._update_meta(pair_key, name=name, candidate_pairs=len(left), features={})
+
+    def load_feature(self, pair_key: str, rule: ComparisonSpec) -> Optional[np.ndarray]:
+        values = self._read_array(os.path.join(self._pair_dir(pair_key), f"{self.feature_key(rule)}.npy"))
+        if values is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return values
+
+    def save_feature(self, pair_key: str, rule: ComparisonSpec, values: np.ndarray):
+        feature_key = self.feature_key(rule)
+        self._write_array(os.path.join(self._pair_dir(pair_key), f"{feature_key}.npy"), np.asarray(values, dtype=np.float64))
+        self._update_meta(pair_key, features={feature_key: {'label': rule.label, 'rule': rule.as_config()}})
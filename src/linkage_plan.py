@@ -0,0 +1,426 @@
+import os
+from dataclasses import dataclass, replace
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+
+from checkpoint import compute_config_hash
+
+# Karşılaştırma başına göreli maliyet (aday çift başına, exact = 1)
+METHOD_COST = {'exact': 1.0, 'numeric': 2.0, 'date': 2.0}
+STRING_ALGORITHM_COST = {
+    'jaro': 8.0, 'jarowinkler': 8.0, 'levenshtein': 10.0, 'damerau_levenshtein': 12.0,
+    'qgram': 6.0, 'cosine': 6.0, 'smith_waterman': 20.0, 'lcs': 15.0,
+}
+
+# Kuralda eşik verilmezse: string benzerlik, sayısal fark, tarih farkı (gün)
+DEFAULT_THRESHOLDS = {'string': 0.85, 'numeric': 1, 'date': 365}
+
+
+def comparison_cost(comp: dict) -> float:
+    if comp['method'] == 'string':
+        return STRING_ALGORITHM_COST.get(comp.get('algorithm', 'jarowinkler'), 10.0)
+    return METHOD_COST.get(comp['method'], 1.0)
+
+
+def freeze(value):
+    # dict -> sıralı (anahtar, değer) tuple'ı, list -> tuple: plan alanları hashlenebilir kalır
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class FrozenSlots:
+    # dataclass(slots=True) Python 3.10 ister; __slots__ sınıflarda elle yazılır. Dondurulmuş
+    # sınıflarda varsayılan pickle durumu setattr ile geri yüklenemediği için durum burada taşınır
+    __slots__ = ()
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+    def as_dict(self) -> dict:
+        # Önbellek anahtarları için: çözülmüş alanlar (varsayılanlar dahil)
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass(frozen=True)
+class DatabaseSpec(FrozenSlots):
+    __slots__ = ('name', 'path', 'table', 'columns', 'exclude_fields')
+
+    name: str
+    path: str
+    table: str
+    columns: Tuple[Tuple[str, str], ...]
+    exclude_fields: Tuple[str, ...]
+
+    @classmethod
+    def from_config(cls, name: str, db_config: dict) -> 'DatabaseSpec':
+        return cls(name=name, path=os.path.abspath(db_config['path']), table=db_config['table'],
+                   columns=tuple(db_config['columns'].items()), exclude_fields=tuple(db_config.get('exclude_fields', [])))
+
+    @property
+    def column_map(self) -> Dict[str, str]:
+        return dict(self.columns)
+
+
+@dataclass(frozen=True)
+class ComparisonSpec(FrozenSlots):
+    __slots__ = ('field', 'method', 'label', 'algorithm', 'threshold', 'backend', 'scoring', 'scale', 'preprocess', 'cost', 'options')
+
+    field: str
+    method: str
+    label: str
+    algorithm: Optional[str]
+    threshold: Optional[float]
+    backend: str
+    scoring: str
+    scale: float
+    preprocess: Tuple[str, ...]
+    cost: float
+    options: Tuple[Tuple[str, Any], ...]
+
+    @classmethod
+    def from_config(cls, comp: dict) -> 'ComparisonSpec':
+        method = comp['method']
+        return cls(field=comp['field'], method=method, label=f"{comp['field']}_{method}",
+                   algorithm=comp.get('algorithm', 'jarowinkler') if method == 'string' else None,
+                   threshold=comp.get('threshold', DEFAULT_THRESHOLDS.get(method)), backend=comp.get('backend', 'auto'),
+                   scoring=comp.get('scoring', 'linear'), scale=comp.get('scale', 1.0), preprocess=tuple(comp.get('preprocess', [])),
+                   cost=comparison_cost(comp), options=freeze(comp))
+
+    def as_config(self) -> dict:
+        # Config'teki kural; özellik deposu ve tarama önbelleği anahtarları bundan hesaplanır
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in self.options}
+
+
+@dataclass(frozen=True)
+class IndexingSpec(FrozenSlots):
+    __slots__ = ('method', 'key', 'derived_keys', 'window', 'engine', 'adaptive', 'min_window', 'max_window', 'similarity_threshold',
+                 'algorithm', 'top_k', 'threshold', 'ngram', 'num_perm', 'bands')
+
+    method: str
+    key: Optional[str]
+    derived_keys: Tuple[Tuple[str, Any], ...]
+    window: int
+    engine: str
+    adaptive: bool
+    min_window: Optional[int]
+    max_window: Optional[int]
+    similarity_threshold: float
+    algorithm: str
+    top_k: int
+    threshold: float
+    ngram: int
+    num_perm: int
+    bands: int
+
+    @classmethod
+    def from_config(cls, indexing_config: Optional[dict]) -> 'IndexingSpec':
+        indexing_config = indexing_config or {}
+        return cls(method=indexing_config.get('method', 'block'), key=indexing_config.get('key'),
+                   derived_keys=freeze(indexing_config.get('derived_keys', {})),
+                   window=indexing_config.get('window', 3), engine=indexing_config.get('engine', 'numpy'),
+                   adaptive=indexing_config.get('adaptive', False), min_window=indexing_config.get('min_window'),
+                   max_window=indexing_config.get('max_window'), similarity_threshold=indexing_config.get('similarity_threshold', 0.8),
+                   algorithm=indexing_config.get('algorithm', 'tfidf'), top_k=indexing_config.get('top_k', 10),
+                   threshold=indexing_config.get('threshold', 0.5), ngram=indexing_config.get('ngram', 3),
+                   num_perm=indexing_config.get('num_perm', 64), bands=indexing_config.get('bands', 16))
+
+
+@dataclass(frozen=True)
+class ClassificationSpec(FrozenSlots):
+    __slots__ = ('method', 'threshold')
+
+    method: str
+    threshold: float
+
+    @classmethod
+    def from_config(cls, classification_config: Optional[dict]) -> 'ClassificationSpec':
+        classification_config = classification_config or {}
+        return cls(method=classification_config.get('method', 'threshold'), threshold=float(classification_config.get('threshold', 0.7)))
+
+    def min_score(self, n_features: int) -> float:
+        return self.threshold * n_features
+
+
+@dataclass(frozen=True)
+class FeatureStoreSpec(FrozenSlots):
+    __slots__ = ('enabled', 'path')
+
+    enabled: bool
+    path: str
+
+    @classmethod
+    def from_config(cls, store_config: Optional[dict]) -> 'FeatureStoreSpec':
+        store_config = store_config or {}
+        return cls(enabled=store_config.get('enabled', False), path=os.path.abspath(store_config.get('path', '../results/feature_store')))
+
+
+@dataclass(frozen=True)
+class DedupSpec(FrozenSlots):
+    __slots__ = ('survivor', 'chunk_size')
+
+    survivor: str
+    chunk_size: int
+
+    @classmethod
+    def from_config(cls, dedup_config: Optional[dict]) -> 'DedupSpec':
+        dedup_config = dedup_config or {}
+        return cls(survivor=dedup_config.get('survivor', 'completeness'), chunk_size=dedup_config.get('chunk_size', 500000))
+
+
+@dataclass(frozen=True)
+class OutputSpec(FrozenSlots):
+    __slots__ = ('save_to_db', 'export_csv', 'result_format', 'results_db_path', 'results_table', 'table_prefix',
+                 'csv_path', 'csv_base_path', 'report_workers')
+
+    save_to_db: bool
+    export_csv: bool
+    result_format: str
+    results_db_path: Optional[str]
+    results_table: str
+    table_prefix: str
+    csv_path: str
+    csv_base_path: str
+    report_workers: Optional[int]
+
+    @classmethod
+    def from_config(cls, output_config: Optional[dict], results_db_path: Optional[str]) -> 'OutputSpec':
+        output_config = output_config or {}
+        return cls(save_to_db=output_config.get('save_to_db', True), export_csv=output_config.get('export_csv', True),
+                   result_format=output_config.get('result_format', 'wide'),
+                   results_db_path=os.path.abspath(results_db_path) if results_db_path else None,
+                   results_table=output_config.get('results_table', 'match_results'), table_prefix=output_config.get('table_prefix', 'linkage'),
+                   csv_path=output_config.get('csv_path', '../results/linkage_results.csv'),
+                   csv_base_path=output_config.get('csv_base_path', '../results'), report_workers=output_config.get('report_workers'))
+
+
+@dataclass(frozen=True)
+class PipelineSpec(FrozenSlots):
+    __slots__ = ('mode', 'queue_size', 'load_workers', 'link_workers', 'export_workers')
+
+    mode: str
+    queue_size: int
+    load_workers: int
+    link_workers: int
+    export_workers: int
+
+    @classmethod
+    def from_config(cls, pipeline_config: Optional[dict]) -> 'PipelineSpec':
+        pipeline_config = pipeline_config or {}
+        return cls(mode=pipeline_config.get('mode', 'sequential'), queue_size=pipeline_config.get('queue_size', 2),
+                   load_workers=pipeline_config.get('load_workers', 2), link_workers=pipeline_config.get('link_workers', 1),
+                   export_workers=pipeline_config.get('export_workers', 1))
+
+
+@dataclass(frozen=True)
+class DistributedSpec(FrozenSlots):
+    __slots__ = ('enabled', 'workers', 'host', 'port', 'authkey', 'partitioning', 'partitions', 'max_retries', 'task_timeout',
+                 'worker_log_level', 'shared_memory')
+
+    enabled: bool
+    workers: int
+    host: str
+    port: int
+    authkey: Optional[str]
+    partitioning: str
+    partitions: int
+    max_retries: int
+    task_timeout: float
+    worker_log_level: str
+    shared_memory: bool
+
+    @classmethod
+    def from_config(cls, distributed_config: Optional[dict]) -> 'DistributedSpec':
+        distributed_config = distributed_config or {}
+        workers = distributed_config.get('workers', os.cpu_count() or 1)
+        # authkey verilmezse koordinatör her çalışmada rastgele bir anahtar üretir
+        authkey = distributed_config.get('authkey')
+        return cls(enabled=distributed_config.get('enabled', False), workers=workers, host=distributed_config.get('host', '127.0.0.1'),
+                   port=distributed_config.get('port', 0), authkey=str(authkey) if authkey else None,
+                   partitioning=distributed_config.get('partitioning', 'pair'), partitions=distributed_config.get('partitions', workers or 1),
+                   max_retries=distributed_config.get('max_retries', 2), task_timeout=distributed_config.get('task_timeout', 1800),
+                   worker_log_level=distributed_config.get('worker_log_level', 'warning'),
+                   shared_memory=distributed_config.get('shared_memory', True))
+
+
+@dataclass(frozen=True)
+class CheckpointSpec(FrozenSlots):
+    __slots__ = ('enabled', 'chunk_size', 'keep')
+
+    enabled: bool
+    chunk_size: int
+    keep: bool
+
+    @classmethod
+    def from_config(cls, checkpoint_config: Optional[dict]) -> 'CheckpointSpec':
+        checkpoint_config = checkpoint_config or {}
+        return cls(enabled=checkpoint_config.get('enabled', False), chunk_size=checkpoint_config.get('chunk_size', 100000),
+                   keep=checkpoint_config.get('keep', False))
+
+
+@dataclass(frozen=True)
+class GroundTruthSpec(FrozenSlots):
+    __slots__ = ('dataset', 'csv', 'left', 'right')
+
+    dataset: Optional[str]
+    csv: Optional[str]
+    left: str
+    right: str
+
+    @classmethod
+    def from_config(cls, truth_config: dict) -> 'GroundTruthSpec':
+        csv = truth_config.get('csv')
+        return cls(dataset=truth_config.get('dataset'), csv=os.path.abspath(csv) if csv else None,
+                   left=truth_config.get('left', 'left_id'), right=truth_config.get('right', 'right_id'))
+
+
+def ground_truth_specs(truth_config: Optional[dict]) -> Tuple[Tuple[str, GroundTruthSpec], ...]:
+    return tuple((name, GroundTruthSpec.from_config(truth)) for name, truth in (truth_config or {}).items())
+
+
+@dataclass(frozen=True)
+class EvaluationSpec(FrozenSlots):
+    __slots__ = ('ground_truth', 'pair_completeness')
+
+    ground_truth: Tuple[Tuple[str, GroundTruthSpec], ...]
+    pair_completeness: bool
+
+    @classmethod
+    def from_config(cls, evaluation_config: Optional[dict]) -> 'EvaluationSpec':
+        evaluation_config = evaluation_config or {}
+        return cls(ground_truth=ground_truth_specs(evaluation_config.get('ground_truth')),
+                   pair_completeness=evaluation_config.get('pair_completeness', True))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.ground_truth)
+
+    def truth(self, comparison_name: str) -> Optional[GroundTruthSpec]:
+        return dict(self.ground_truth).get(comparison_name)
+
+
+@dataclass(frozen=True)
+class SweepSpec(FrozenSlots):
+    __slots__ = ('thresholds', 'classifiers', 'ground_truth')
+
+    thresholds: Tuple[float, ...]
+    classifiers: Tuple[str, ...]
+    ground_truth: Tuple[Tuple[str, GroundTruthSpec], ...]
+
+    @classmethod
+    def from_config(cls, sweep_config: Optional[dict], evaluation: EvaluationSpec) -> 'SweepSpec':
+        from threshold_sweep import parse_thresholds
+
+        sweep_config = sweep_config or {}
+        # Ground truth bir kez tanımlanır: sweep.ground_truth yoksa evaluation.ground_truth kullanılır
+        ground_truth = ground_truth_specs(sweep_config.get('ground_truth')) or evaluation.ground_truth
+        return cls(thresholds=tuple(parse_thresholds(sweep_config.get('thresholds'))), classifiers=tuple(sweep_config.get('classifiers', [])),
+                   ground_truth=ground_truth)
+
+    def truth(self, comparison_name: str) -> Optional[GroundTruthSpec]:
+        return dict(self.ground_truth).get(comparison_name)
+
+
+@dataclass(frozen=True)
+class LinkagePlan(FrozenSlots):
+    """Validated configuration compiled once into typed, immutable specs.
+
+    Database paths are resolved against the working directory at compile
+    time and every section carries its defaults: comparison rules with
+    their feature label and relative cost, indexing, classification,
+    feature store, deduplication, output, pipeline, distributed,
+    checkpoint, evaluation and sweep settings. ``sides`` lists the
+    comparisons of the run as ``(name, left, right)`` (``right`` is None
+    for deduplication). The plan is hashed by its ``digest`` (config and
+    resolved paths); it is picklable and is handed unchanged to linkers,
+    pipeline stages and distributed workers, which read no config dicts.
+    """
+
+    __slots__ = ('digest', 'multi_database', 'databases', 'sides', 'indexing', 'comparisons', 'classification', 'feature_store',
+                 'deduplication', 'output', 'pipeline', 'distributed', 'checkpoint', 'evaluation', 'sweep')
+
+    digest: str
+    multi_database: bool
+    databases: Tuple[DatabaseSpec, ...]
+    sides: Tuple[Tuple[str, str, Optional[str]], ...]
+    indexing: IndexingSpec
+    comparisons: Tuple[ComparisonSpec, ...]
+    classification: ClassificationSpec
+    feature_store: FeatureStoreSpec
+    deduplication: DedupSpec
+    output: OutputSpec
+    pipeline: PipelineSpec
+    distributed: DistributedSpec
+    checkpoint: CheckpointSpec
+    evaluation: EvaluationSpec
+    sweep: SweepSpec
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    @property
+    def rules_digest(self) -> str:
+        # Checkpoint anahtarı: sadece eşleşmeleri etkileyen ayarlar (çıktı veya pipeline ayarı resume'u bozmaz)
+        return compute_config_hash({'indexing': self.indexing.as_dict(), 'comparisons': [rule.as_dict() for rule in self.comparisons],
+                                    'classification': self.classification.as_dict(), 'deduplication': self.deduplication.as_dict()})
+
+    @property
+    def database_names(self) -> List[str]:
+        return [db.name for db in self.databases]
+
+    @property
+    def exclude_fields(self) -> Dict[str, List[str]]:
+        return {db.name: list(db.exclude_fields) for db in self.databases}
+
+    def with_database_path(self, name: str, path: str) -> 'LinkagePlan':
+        # Sidecar index kopyası gibi yol değişikliklerinde yeni plan (ve yeni digest) üretilir
+        databases = tuple(replace(db, path=os.path.abspath(path)) if db.name == name else db for db in self.databases)
+        return replace(self, databases=databases, digest=compute_config_hash({'plan': self.digest, 'paths': [db.path for db in databases]}))
+
+
+def _plan(config: dict, databases: Tuple[DatabaseSpec, ...], sides, multi_database: bool, results_db_path: Optional[str],
+          digest_source) -> LinkagePlan:
+    rl_config = config['recordlinkage_config']
+    evaluation = EvaluationSpec.from_config(config.get('evaluation'))
+    return LinkagePlan(digest=compute_config_hash(digest_source), multi_database=multi_database, databases=databases, sides=sides,
+                       indexing=IndexingSpec.from_config(rl_config.get('indexing')),
+                       comparisons=tuple(ComparisonSpec.from_config(comp) for comp in rl_config.get('comparison', [])),
+                       classification=ClassificationSpec.from_config(rl_config.get('classification')),
+                       feature_store=FeatureStoreSpec.from_config(rl_config.get('feature_store')),
+                       deduplication=DedupSpec.from_config(rl_config.get('deduplication')),
+                       output=OutputSpec.from_config(config.get('output'), results_db_path),
+                       pipeline=PipelineSpec.from_config(config.get('pipeline')),
+                       distributed=DistributedSpec.from_config(config.get('distributed')),
+                       checkpoint=CheckpointSpec.from_config(config.get('checkpoint')),
+                       evaluation=evaluation, sweep=SweepSpec.from_config(config.get('sweep'), evaluation))
+
+
+def compile_plan(config: dict, results_db_path: str) -> LinkagePlan:
+    if 'databases' in config:
+        databases = tuple(DatabaseSpec.from_config(db['name'], db) for db in config['databases'])
+    else:
+        databases = (DatabaseSpec.from_config('source', config['source_database']),
+                     DatabaseSpec.from_config('target', config['target_database']))
+
+    names = [db.name for db in databases]
+    if 'databases' not in config:
+        sides = (('source_target', 'source', 'target'),)
+    elif len(names) == 1:
+        sides = ((f"{names[0]}_dedup", names[0], None),)
+    else:
+        sides = tuple((f"{db1}_{db2}", db1, db2) for db1, db2 in combinations(names, 2))
+
+    return _plan(config, databases, sides, 'databases' in config, results_db_path,
+                 {'config': config, 'paths': [db.path for db in databases], 'results': os.path.abspath(results_db_path)})
+
+
+def compile_rules_plan(linkage_config: dict) -> LinkagePlan:
+    # Config dosyası olmadan kurulan linker'lar (benchmark, doğrudan kullanım) için sadece kurallar
+    config = {'recordlinkage_config': linkage_config, 'output': {'result_format': linkage_config.get('result_format', 'wide')}}
+    return _plan(config, (), (), False, None, {'rules': linkage_config})
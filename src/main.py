@@ -1,62 +1,135 @@
 import sys
 import os
-from typing import Optional, Dict
+import argparse
+from typing import Optional, Dict, List, TYPE_CHECKING
 import time
 from datetime import datetime
+from itertools import combinations
 
+# Ağır bağımlılıklar (pandas, recordlinkage) ihtiyaç duyulan aşamada import edilir
 from config_reader import ConfigReader
+from connection_pool import ConnectionFactory
 from database_manager import DatabaseManager
-from record_linker import RecordLinker
-import pandas as pd
+from event_log import log
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# CLI'dan verilen log ayarları (--quiet, --log-level, ...) config'deki logging bölümünü ezer
+LOG_OVERRIDES: Dict = {}
+
+
+def configure_logging(logging_config: dict):
+    settings = {'level': logging_config.get('level'), 'format': logging_config.get('format'),
+                'file': logging_config.get('file'), 'progress_interval': logging_config.get('progress_interval')}
+    settings.update(LOG_OVERRIDES)
+    log.configure(**settings)
 
 
 class LinkageCoordinator:
 
     def __init__(self, config_path: str):
-        print(f"Config file: {config_path}")
+        log.info(f"Config file: {config_path}")
 
         self.config_reader = ConfigReader(config_path)
+        configure_logging(self.config_reader.get_logging_config())
+
+        # Derlenmiş plan: çözülmüş yollar, tipli kurallar ve maliyetler; tüm aşamalar ve worker'lar aynı nesneyi kullanır
+        self.plan = self.config_reader.get_plan()
         self.db_manager = DatabaseManager()
+        self.db_manager.connection_factory = ConnectionFactory(self.config_reader.get_connections_config())
         self.record_linker = None
+        self.checkpoint = None
+        self.saved_files = {}
+        self.data_limit = None
+        self.pipeline_metrics = {}
+        self.evaluation_results = {}
+
+        # Bellek bütçesi (resources.memory_limit): parça ve batch boyutları buna göre seçilir
+        from memory_budget import MemoryBudget
+        self.memory_budget = MemoryBudget.from_config(self.config_reader.get_resources_config())
+        self.db_manager.memory_budget = self.memory_budget
+
+        # Türetilmiş blocking anahtarları yüklemede tablolara kolon olarak eklenir
+        self.db_manager.derived_keys = dict(self.plan.indexing.derived_keys) or None
+
+        # Sözlük kodlaması: indeksleme anahtarı ham kalır (indeksleyiciler metin değer bekler)
+        string_encoding = self.config_reader.get_string_encoding_config()
+        if string_encoding.get('enabled', False):
+            indexing_key = self.plan.indexing.key
+            self.db_manager.string_encoding = dict(string_encoding, exclude=[indexing_key] if indexing_key else [])
 
         # Sistem tipini belirle
-        self.is_multi_database = self.config_reader.is_multi_database_config()
+        self.is_multi_database = self.plan.multi_database
         
         if self.is_multi_database:
-            print("Multi-database system initialized")
+            log.info("Multi-database system initialized")
             self._init_multi_database_config()
         else:
-            print("Classic two-database system initialized")
+            log.info("Classic two-database system initialized")
             self._init_classic_config()
 
-        print("Coordinator ready")
+        log.info("Coordinator ready")
 
     def _init_classic_config(self):
         # Konfigürasyonları al
         self.source_config = self.config_reader.get_source_database()
         self.target_config = self.config_reader.get_target_database()
-        self.linkage_config = self.config_reader.get_recordlinkage_config()
-        self.output_config = self.config_reader.get_output_config()
-        self.results_db_path = self.config_reader.get_results_database_path()
+        self.results_db_path = self.plan.output.results_db_path
 
     def _init_multi_database_config(self):
         # Konfigürasyonları al
         self.databases_config = self.config_reader.get_databases()
-        self.linkage_config = self.config_reader.get_recordlinkage_config()
-        self.output_config = self.config_reader.get_output_config()
-        self.results_db_path = self.config_reader.get_results_database_path()
+        self.results_db_path = self.plan.output.results_db_path
 
     def validate_setup(self):
-        print("Setup is being validated...")
+        log.info("Setup is being validated...")
 
         # Config özeti göster
         self.config_reader.print_summary()
 
+        prepare_config = self.config_reader.get_prepare_config()
+        if prepare_config.get('check_indexes', False):
+            self.prepare_indexes(prepare_config)
+
         if self.is_multi_database:
             self._validate_multi_database_setup()
         else:
             self._validate_classic_setup()
 
+    def prepare_indexes(self, prepare_config: dict):
+        # Blocking, id ve güncelleme takip kolonları (mantıksal adlar)
+        logical_columns = ['id']
+        indexing_key = self.plan.indexing.key
+        if indexing_key:
+            logical_columns.append(indexing_key)
+        logical_columns.extend(prepare_config.get('tracking_columns', []))
+
+        if self.is_multi_database:
+            databases = [(db['name'], db) for db in self.databases_config]
+        else:
+            databases = [('source', self.source_config), ('target', self.target_config)]
+
+        report = self.db_manager.prepare_indexes(databases, logical_columns, create=prepare_config.get('create_indexes', False), target=prepare_config.get('index_target', 'inplace'))
+
+        # Sidecar kopyası oluşturulduysa bu çalışma onu kullanır
+        for db_name, db_config in databases:
+            entry = report[db_name]
+            if not entry['created'] or entry['path'] == db_config['path']:
+                continue
+
+            updated_config = dict(db_config, path=entry['path'])
+            if self.is_multi_database:
+                self.databases_config = [updated_config if db['name'] == db_name else db for db in self.databases_config]
+            elif db_name == 'source':
+                self.source_config = updated_config
+            else:
+                self.target_config = updated_config
+            self.plan = self.plan.with_database_path(db_name, entry['path'])
+            log.info(f"{db_name}: using indexed sidecar {entry['path']}")
+
+        return report
+
     def _validate_classic_setup(self):
         try:
             self.db_manager.connect_databases(self.source_config, self.target_config, self.results_db_path)
@@ -64,138 +137,252 @@ class LinkageCoordinator:
             self.db_manager.validate_table_schema(self.source_config, self.db_manager.source_connection)
             self.db_manager.validate_table_schema(self.target_config, self.db_manager.target_connection)
 
-            print("classic setup checks passed successfully")
+            log.info("classic setup checks passed successfully")
 
         except Exception as e:
-            print(f"Setup ERROR: {e}")
+            log.error(f"Setup ERROR: {e}")
             raise
 
     def _validate_multi_database_setup(self):
         try:
+            validation_config = self.config_reader.get_validation_config()
+            self.db_manager.row_count_cache_path = validation_config.get('count_cache_path')
+
             self.db_manager.connect_multi_databases(self.databases_config, self.results_db_path)
-            self.db_manager.validate_multi_database_schemas(self.databases_config)
+            self.db_manager.validate_multi_database_schemas(self.databases_config, mode=validation_config.get('mode', 'exact'), max_workers=validation_config.get('max_workers'))
 
-            print("Multi-database setup checks passed successfully")
+            log.info("Multi-database setup checks passed successfully")
 
         except Exception as e:
-            print(f"Multi-database setup ERROR: {e}")
+            log.error(f"Multi-database setup ERROR: {e}")
             raise
 
+    def setup_checkpoint(self, limit: Optional[int] = None, resume: bool = False):
+        if not (self.plan.checkpoint.enabled or resume):
+            return None
+
+        if not self.is_multi_database:
+            log.warning("Checkpointing is only supported for multi-database runs")
+            return None
+
+        from checkpoint import CheckpointManager, fingerprint_inputs
+
+        self.checkpoint = CheckpointManager(self.db_manager.results_connection,
+                                            self.plan.rules_digest,
+                                            fingerprint_inputs(self.databases_config, limit),
+                                            chunk_size=self.plan.checkpoint.chunk_size)
+        self.checkpoint.start(resume=resume)
+        return self.checkpoint
+
+    def get_pending_databases(self) -> List[str]:
+        # Resume'da sadece tamamlanmamış çiftlerin database'leri yüklenir
+        db_names = self.plan.database_names
+        if self.checkpoint is None:
+            return db_names
+
+        if len(db_names) == 1:
+            pending_pairs = [] if self.checkpoint.is_pair_complete(f"{db_names[0]}_dedup") else [(db_names[0],)]
+        else:
+            pending_pairs = [pair for pair in combinations(db_names, 2) if not self.checkpoint.is_pair_complete(f"{pair[0]}_{pair[1]}")]
+
+        needed = {name for pair in pending_pairs for name in pair}
+        return [name for name in db_names if name in needed]
+
     def load_data(self, limit: Optional[int] = None):
+        self.data_limit = limit
         if self.is_multi_database:
-            return self._load_multi_database_data(limit)
+            return self._load_multi_database_data(limit, self.get_pending_databases())
         else:
             return self._load_classic_data(limit)
 
     def _load_classic_data(self, limit: Optional[int] = None):
-        print("classic data loading...")
+        log.info("classic data loading...")
 
         try:
+            start_time = time.perf_counter()
+
             # Source data
             source_df = self.db_manager.get_source_data(self.source_config, limit)
-            print(f"Source data loaded: {len(source_df)} records")
+            log.info(f"Source data loaded: {len(source_df)} records")
 
             # Target data
             target_df = self.db_manager.get_target_data(self.target_config, limit)
-            print(f"Target data loaded: {len(target_df)} records")
+            log.info(f"Target data loaded: {len(target_df)} records")
 
+            self.db_manager.log_load_throughput(len(source_df) + len(target_df), time.perf_counter() - start_time)
             return source_df, target_df
 
         except Exception as e:
-            print(f"Data load ERROR: {e}")
+            log.error(f"Data load ERROR: {e}")
             raise
 
-    def _load_multi_database_data(self, limit: Optional[int] = None):
-        print("Multi-database data loading...")
+    def _load_multi_database_data(self, limit: Optional[int] = None, db_names: Optional[List[str]] = None):
+        log.info("Multi-database data loading...")
 
         try:
-            data_dict = self.db_manager.get_all_database_data(self.databases_config, limit)
+            databases_config = self.databases_config
+            if db_names is not None and len(db_names) < len(databases_config):
+                skipped = [db['name'] for db in databases_config if db['name'] not in db_names]
+                log.info(f"Skipping data load for checkpointed databases: {', '.join(skipped)}")
+                databases_config = [db for db in databases_config if db['name'] in db_names]
+
+            data_dict = self.db_manager.get_all_database_data(databases_config, limit)
             
             total_records = sum(len(df) for df in data_dict.values())
-            print(f"Total records loaded from {len(data_dict)} databases: {total_records}")
+            log.info(f"Total records loaded from {len(data_dict)} databases: {total_records}")
             
             return data_dict
 
         except Exception as e:
-            print(f"Multi-database data load ERROR: {e}")
+            log.error(f"Multi-database data load ERROR: {e}")
             raise
 
     def run_record_linkage(self, source_df, target_df):
-        print("Record Linkage are being started...")
+        log.info("Record Linkage are being started...")
+
+        from record_linker import RecordLinker
 
         try:
-            self.record_linker = RecordLinker(self.linkage_config)
-            results_df = self.record_linker.run_full_linkage(source_df, target_df)
+            self.record_linker = RecordLinker(memory_budget=self.memory_budget, linkage_plan=self.plan)
+
+            store_key = None
+            if self.record_linker.feature_store is not None:
+                from checkpoint import fingerprint_inputs
+                from feature_store import FeatureStore
+
+                fingerprints = [fingerprint_inputs([dict(config, name=side)], self.data_limit)
+                                for side, config in (('source', self.source_config), ('target', self.target_config))]
+                store_key = FeatureStore.pair_key(fingerprints, self.plan.indexing)
+
+            results_df = self.record_linker.run_full_linkage(source_df, target_df, store_key=store_key)
             return results_df
 
         except Exception as e:
-            print(f"Record linkage ERROR: {e}")
+            log.error(f"Record linkage ERROR: {e}")
+            raise
+
+    def run_multi_database_linkage(self, data_dict: Dict[str, 'pd.DataFrame'], on_result=None):
+        log.info("Multi-database linkage starting...")
+
+        from record_linker import RecordLinker
+
+        try:
+            self.record_linker = RecordLinker(memory_budget=self.memory_budget, linkage_plan=self.plan)
+            db_names = self.plan.database_names
+            exclude_fields = self.plan.exclude_fields
+
+            fingerprints = None
+            if self.record_linker.feature_store is not None:
+                from checkpoint import fingerprint_inputs
+                fingerprints = {db['name']: fingerprint_inputs([db], self.data_limit) for db in self.databases_config}
+
+            results_dict = self.record_linker.run_multi_database_linkage(data_dict, checkpoint=self.checkpoint, db_names=db_names,
+                                                                         exclude_fields=exclude_fields, on_result=on_result,
+                                                                         fingerprints=fingerprints)
+            return results_dict
+
+        except Exception as e:
+            log.error(f"Multi-database linkage ERROR: {e}")
+            raise
+
+    def run_distributed_linkage(self, data_dict: Dict[str, 'pd.DataFrame'], on_result=None):
+        log.info("Distributed multi-database linkage starting...")
+
+        from distributed import DistributedLinkage
+
+        try:
+            runner = DistributedLinkage(self.plan)
+            db_names = self.plan.database_names
+            exclude_fields = self.plan.exclude_fields
+
+            results_dict, self.record_linker = runner.run(data_dict, db_names, exclude_fields=exclude_fields,
+                                                          checkpoint=self.checkpoint, on_result=on_result)
+            self.pipeline_metrics = {'distributed': dict(runner.stats)}
+            return results_dict
+
+        except Exception as e:
+            log.error(f"Distributed linkage ERROR: {e}")
             raise
 
-    def run_multi_database_linkage(self, data_dict: Dict[str, pd.DataFrame]):
-        print("Multi-database linkage starting...")
+    def run_pipelined_linkage(self, limit: Optional[int] = None):
+        log.info("Pipelined multi-database linkage starting...")
+
+        from pipeline_orchestrator import PipelineOrchestrator
 
+        self.data_limit = limit
         try:
-            self.record_linker = RecordLinker(self.linkage_config)
-            results_dict = self.record_linker.run_multi_database_linkage(data_dict)
+            orchestrator = PipelineOrchestrator(self)
+            results_dict = orchestrator.run(limit)
+            self.pipeline_metrics = orchestrator.metrics_summary()
             return results_dict
 
         except Exception as e:
-            print(f"Multi-database linkage ERROR: {e}")
+            log.error(f"Pipelined linkage ERROR: {e}")
             raise
 
     def save_results(self, results_df):
-        print("Results are being saved...")
+        log.info("Results are being saved...")
 
         saved_files = {}
 
         try:
             # Database'e kaydet
-            if self.output_config.get('save_to_db', True):
-                table_name = self.output_config.get('results_table', 'match_results')
+            output = self.plan.output
+            if output.save_to_db:
+                table_name = output.results_table
                 self.db_manager.save_results(results_df, table_name)
                 saved_files['database'] = f"{self.results_db_path} -> {table_name}"
 
             # CSV'ye export et
-            if self.output_config.get('export_csv', True):
-                csv_path = self.output_config.get('csv_path', '../results/linkage_results.csv')
+            if output.export_csv:
+                csv_path = output.csv_path
                 self.db_manager.export_to_csv(results_df, csv_path)
                 saved_files['csv'] = csv_path
 
-            print("Results saved successfully")
+            log.info("Results saved successfully")
             return saved_files
 
         except Exception as e:
-            print(f"Results save ERROR: {e}")
+            log.error(f"Results save ERROR: {e}")
             return saved_files
 
     def save_multi_results(self, results_dict):
-        print("Multi-database results are being saved...")
+        log.info("Multi-database results are being saved...")
 
         saved_files = {}
 
         try:
             # Database'e kaydet
-            if self.output_config.get('save_to_db', True):
-                table_prefix = self.output_config.get('table_prefix', 'linkage')
-                saved_tables = self.db_manager.save_multi_results(results_dict, table_prefix)
+            output = self.plan.output
+            if output.save_to_db:
+                saved_tables = self.db_manager.save_multi_results(results_dict, output.table_prefix)
                 saved_files['database'] = saved_tables
 
             # CSV'ye export et
-            if self.output_config.get('export_csv', True):
-                csv_base_path = self.output_config.get('csv_base_path', '../results')
-                exported_files = self.db_manager.export_multi_results_to_csv(results_dict, csv_base_path)
+            if output.export_csv:
+                exported_files = self.db_manager.export_multi_results_to_csv(results_dict, output.csv_base_path)
                 saved_files['csv'] = exported_files
 
-            print("Multi-database results saved successfully")
+            log.info("Multi-database results saved successfully")
             return saved_files
 
         except Exception as e:
-            print(f"Multi-database results save ERROR: {e}")
+            log.error(f"Multi-database results save ERROR: {e}")
             return saved_files
 
+    def save_pair_result(self, comparison_name: str, results_df: 'pd.DataFrame', stats: Optional[dict] = None):
+        # Çift biter bitmez kaydedilir; rapor aşaması sonuçları database'den okur
+        saved = self.save_multi_results({comparison_name: results_df})
+
+        for kind, entries in saved.items():
+            self.saved_files.setdefault(kind, {}).update(entries)
+
+        if stats is not None and self.plan.output.save_to_db:
+            table_name = self.db_manager.get_result_table_name(comparison_name, self.plan.output.table_prefix)
+            self.db_manager.save_pair_stats(comparison_name, table_name, stats)
+
     def generate_report(self, results_data):
-        print("Report is being generated...")
+        log.info("Report is being generated...")
 
         try:
             project_info = self.config_reader.get_project_info()
@@ -206,10 +393,259 @@ class LinkageCoordinator:
                 return self._generate_classic_report(results_data, project_info)
 
         except Exception as e:
-            print(f"Report create ERROR: {e}")
+            log.error(f"Report create ERROR: {e}")
             return ""
 
+    def run_threshold_sweep(self, limit: Optional[int] = None, thresholds=None, output: Optional[str] = None, recompute: bool = False):
+        log.info("THRESHOLD SWEEP STARTING")
+        log.info("=" * 60)
+
+        import numpy as np
+        from evaluation import record_ids
+        from feature_store import FeatureStore
+        from record_linker import RecordLinker
+        from threshold_sweep import FeatureSet, ThresholdSweep
+        from checkpoint import fingerprint_inputs
+
+        try:
+            self.validate_setup()
+            data = self.load_data(limit)
+
+            sweep = ThresholdSweep(self.plan.sweep, thresholds)
+            log.info(f"Threshold grid: {sweep.thresholds}")
+            self.record_linker = RecordLinker(memory_budget=self.memory_budget, linkage_plan=self.plan)
+            if self.record_linker.feature_store is None:
+                # Tarama özellikleri her zaman depoya yazar (feature_store.enabled kapalı olsa da); run ile aynı klasör
+                self.record_linker.feature_store = FeatureStore(self.plan.feature_store.path)
+
+            # (karşılaştırma adı, sol db, sağ db veya None, plan)
+            if self.is_multi_database:
+                db_names = self.plan.database_names
+                db_configs = {db['name']: db for db in self.databases_config}
+                if len(db_names) == 1:
+                    comparisons = [(f"{db_names[0]}_dedup", db_names[0], None, None)]
+                else:
+                    plans = self.record_linker.build_comparison_plans(data, db_names, self.plan.exclude_fields)
+                    comparisons = [(name, plan.left, plan.right, plan) for name, plan in plans.items()]
+            else:
+                data = {'source': data[0], 'target': data[1]}
+                db_configs = {'source': dict(self.source_config, name='source'), 'target': dict(self.target_config, name='target')}
+                comparisons = [('source_target', 'source', 'target', None)]
+
+            for comparison_name, left, right, plan in comparisons:
+                df_left = data[left]
+                df_right = data[right] if right else None
+
+                # Run ile aynı depo anahtarı: girdiler ve indeksleme değişmediyse kolonlar kural bazında tekrar kullanılır
+                store_key = None
+                if not recompute:
+                    fingerprints = [fingerprint_inputs([db_configs[side]], limit) for side in ([left, right] if right else [left])]
+                    store_key = FeatureStore.pair_key(fingerprints, self.plan.indexing)
+
+                start_time = time.time()
+                left_positions, right_positions, columns = self.record_linker.compute_candidate_features(df_left, df_right, plan, store_key, comparison_name)
+                feature_set = FeatureSet(record_ids(df_left)[left_positions], record_ids(df_right if right else df_left)[right_positions],
+                                         columns, dedup=right is None)
+                log.info(f"{comparison_name}: {len(feature_set):,} feature rows ready ({time.time() - start_time:.2f}s)")
+
+                loaded_right = record_ids(df_right) if right else record_ids(df_left)
+                sweep.evaluate(comparison_name, feature_set, record_ids(df_left), np.asarray(loaded_right))
+
+            sweep.print_results()
+            if output:
+                sweep.save_results(output)
+
+            return sweep.results_frame()
+
+        finally:
+            self.db_manager.disconnect_all()
+
+    def get_comparison_sides(self) -> List[tuple]:
+        # (karşılaştırma adı, sol taraf, sağ taraf veya None = tekilleştirme)
+        return list(self.plan.sides)
+
+    def get_result_table(self, comparison_name: str) -> str:
+        if not self.is_multi_database:
+            return self.plan.output.results_table
+        return self.db_manager.get_result_table_name(comparison_name, self.plan.output.table_prefix)
+
+    def export_wide_results(self, comparison_names: Optional[List[str]] = None, output_dir: Optional[str] = None) -> Dict[str, str]:
+        # Kompakt sonuç tablolarının kayıt kolonlu (geniş) hali sadece istendiğinde üretilir
+        databases = {db.name: db for db in self.plan.databases}
+        output_dir = output_dir or self.plan.output.csv_base_path
+
+        exported = {}
+        for comparison_name in self.get_comparison_names():
+            if comparison_names and comparison_name not in comparison_names:
+                continue
+
+            table_name = self.get_result_table(comparison_name)
+            try:
+                wide_df = self.db_manager.load_wide_results(table_name, databases, self.results_db_path)
+            except ValueError as e:
+                log.warning(f"{comparison_name}: {e}")
+                continue
+            if wide_df is None:
+                log.info(f"{comparison_name}: no matches, no result table to export")
+                continue
+
+            csv_path = os.path.join(output_dir, f"linkage_{comparison_name}_wide.csv".replace('-', '_').replace(' ', '_'))
+            self.db_manager.export_to_csv(wide_df, csv_path)
+            exported[comparison_name] = csv_path
+
+        return exported
+
+    def _predicted_pairs(self, comparison_name: str, left: str, right: Optional[str], results_df=None):
+        # Eşleşen kimlik çiftleri: bellekteki sonuçtan veya sonuç database'inden sadece kimlik kolonları
+        import numpy as np
+        from evaluation import group_pairs
+
+        columns = ['group_id', f'{left}_id'] if right is None else [f'{left}_id', f'{right}_id']
+        table_name = self.get_result_table(comparison_name)
+
+        if results_df is None or not hasattr(results_df, 'columns'):
+            match_count = results_df
+            results_df = self.db_manager.load_result_columns(self.results_db_path, table_name, columns)
+            if results_df is None:
+                # Eşleşmesi olmayan çiftler için tablo oluşturulmaz
+                return (np.empty(0, dtype=np.int64),) * 2 if match_count == 0 else None
+
+        if results_df.empty:
+            return (np.empty(0, dtype=np.int64),) * 2
+
+        if right is None:
+            return group_pairs(results_df['group_id'].to_numpy(), results_df[f'{left}_id'].to_numpy())
+        return results_df[f'{left}_id'].to_numpy(), results_df[f'{right}_id'].to_numpy()
+
+    def evaluate_results(self, results, data=None) -> Dict[str, dict]:
+        """Score the run against ``evaluation.ground_truth``.
+
+        Predicted pairs come from the in-memory results or, when they were
+        streamed to the results database, from its id columns. With loaded
+        ``data`` the true links are limited to the loaded records and the
+        candidate pairs are regenerated (indexing only) for pair
+        completeness.
+        """
+        from evaluation import LinkageEvaluator, record_ids
+        from record_linker import RecordLinker
+
+        evaluator = LinkageEvaluator(self.plan.evaluation)
+        if not self.is_multi_database:
+            results = {'source_target': results}
+            data = {'source': data[0], 'target': data[1]} if data is not None else None
+
+        data = data or {}
+        results = results or {}
+        pair_stats = self.record_linker.pair_stats if self.record_linker else {}
+        indexer = RecordLinker(linkage_plan=self.plan) if evaluator.pair_completeness else None
+
+        for comparison_name, left, right in self.get_comparison_sides():
+            if not evaluator.has_truth(comparison_name):
+                continue
+
+            predicted = self._predicted_pairs(comparison_name, left, right, results.get(comparison_name))
+            if predicted is None:
+                log.warning(f"{comparison_name}: results not found, evaluation skipped")
+                continue
+
+            stats = pair_stats.get(comparison_name) or {}
+            kwargs = {'dedup': right is None, 'candidate_pairs': stats.get('candidate_pairs'), 'total_possible_pairs': stats.get('total_possible_pairs')}
+
+            df_left = data.get(left)
+            df_right = df_left if right is None else data.get(right)
+            if df_left is not None and df_right is not None:
+                left_ids, right_ids = record_ids(df_left), record_ids(df_right)
+                kwargs['loaded'] = (left_ids, right_ids)
+                if kwargs['total_possible_pairs'] is None:
+                    kwargs['total_possible_pairs'] = len(df_left) * (len(df_left) - 1) // 2 if right is None else len(df_left) * len(df_right)
+
+                if indexer is not None:
+                    left_positions, right_positions = indexer.candidate_positions(df_left, None if right is None else df_right)
+                    kwargs['candidates'] = (left_ids[left_positions], right_ids[right_positions])
+
+            evaluator.evaluate(comparison_name, predicted, **kwargs)
+            if self.plan.output.save_to_db and self.db_manager.results_connection is not None:
+                self.db_manager.save_evaluation_metrics(comparison_name, evaluator.results[comparison_name])
+
+        self.evaluation_results = evaluator.results
+        return evaluator.results
+
+    def get_comparison_names(self) -> List[str]:
+        return [name for name, _, _ in self.get_comparison_sides()]
+
+    def profile_blocking_keys(self, sample_size: int = 20000, recall_target: float = 0.9, seed: int = 0, output: Optional[str] = None):
+        # Tam tarama yok: her tablodan rastgele rowid örneği
+        from blocking_profile import BlockingProfiler
+
+        if self.is_multi_database:
+            databases = [(db['name'], db) for db in self.databases_config]
+        else:
+            databases = [('source', self.source_config), ('target', self.target_config)]
+
+        profiler = BlockingProfiler(self.db_manager, databases, sample_size=sample_size, recall_target=recall_target, seed=seed,
+                                    current_key=self.plan.indexing.key)
+        profiler.run()
+        profiler.print_report()
+        if output:
+            profiler.save_results(output)
+        return profiler
+
+    def find_matches(self, db_name: str, record_id) -> List[dict]:
+        # Sonuç tablolarında indeksli arama: bir kaydın tüm kaynaklardaki eşleşmeleri
+        start_time = time.perf_counter()
+        matches = self.db_manager.find_matches(db_name, record_id, self.results_db_path)
+        elapsed = time.perf_counter() - start_time
+
+        log.result(f"{db_name} #{record_id}: {len(matches)} matches ({elapsed * 1000:.1f} ms)", event='lookup.done',
+                   db=db_name, record_id=str(record_id), matches=len(matches), seconds=round(elapsed, 6))
+        for match in matches:
+            log.result(f"   {match['comparison_name']}: {match['matched_db']} #{match['matched_id']} (score {match['total_score']:.2f})")
+        return matches
+
+    def regenerate_report(self):
+        log.info("Report is being regenerated from results database...")
+
+        if not os.path.exists(self.results_db_path):
+            log.error(f"Results database not found: {self.results_db_path}")
+            return ""
+
+        # İstatistikler SQL ile hesaplanır, sonuç tabloları belleğe yüklenmez; ground truth metrikleri kayıtlı tablodan okunur
+        from report_builder import ReportBuilder
+
+        try:
+            self.evaluation_results = ReportBuilder(self.results_db_path).load_evaluation()
+            return self.generate_report(None)
+
+        finally:
+            self.db_manager.disconnect_all()
+
+    def collect_report_stats(self, results_data=None):
+        # {comparison_name: istatistik} ve çift bazlı süre/blocking kayıtları
+        from report_builder import ReportBuilder
+
+        output = self.plan.output
+        if output.save_to_db and os.path.exists(self.results_db_path):
+            builder = ReportBuilder(self.results_db_path, max_workers=output.report_workers)
+
+            if self.is_multi_database:
+                tables = {name: self.db_manager.get_result_table_name(name, output.table_prefix) for name in self.get_comparison_names()}
+            else:
+                tables = {'source_target': output.results_table}
+
+            return builder.collect(tables), builder.load_pair_stats()
+
+        # Database'e yazılmayan sonuçlar bellekten özetlenir
+        if not self.is_multi_database:
+            results_data = {'source_target': results_data}
+
+        table_stats = {name: ReportBuilder.frame_stats(df) for name, df in (results_data or {}).items() if df is not None and not df.empty}
+        pair_stats = self.record_linker.pair_stats if self.record_linker else {}
+        return table_stats, pair_stats
+
     def _generate_classic_report(self, results_df, project_info):
+        table_stats, _ = self.collect_report_stats(results_df)
+        stats = table_stats.get('source_target') or {'matches': 0}
+
         # Rapor içeriği
         report_content = f"""# {project_info['name']} - Record Linkage Raporu
             Oluşturulma Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -222,34 +658,54 @@ class LinkageCoordinator:
             - **Target**: {self.target_config['path']} -> {self.target_config['table']}
             
             ## Sonuç Özeti
-            - **Toplam Eşleşme**: {len(results_df)}
+            - **Toplam Eşleşme**: {stats['matches']}
             
             """
 
-        if not results_df.empty:
+        metrics = self.evaluation_results.get('source_target')
+        if metrics is not None:
+            # Ground truth değerlendirmesi
+            report_content += "\n## Değerlendirme (Ground Truth)\n"
+            report_content += f"- **Gerçek Bağlantı**: {metrics['true_links']} (bulunan: {metrics['true_positives']})\n"
+            if 'pair_completeness' in metrics:
+                report_content += f"- **Pair Completeness**: %{metrics['pair_completeness'] * 100:.1f}\n"
+            if 'reduction_ratio' in metrics:
+                report_content += f"- **Reduction Ratio**: %{metrics['reduction_ratio'] * 100:.2f}\n"
+            report_content += f"- **Precision / Recall / F1**: {metrics['precision']:.3f} / {metrics['recall']:.3f} / {metrics['f1']:.3f}\n"
+
+        if stats['matches']:
             # Kalite dağılımı
-            quality_counts = results_df['match_quality'].value_counts()
             report_content += "\n## Kalite Dağılımı\n"
-            for quality, count in quality_counts.items():
-                percentage = (count / len(results_df)) * 100
+            for quality, count in stats.get('quality', {}).items():
+                percentage = (count / stats['matches']) * 100
                 report_content += f"- **{quality}**: {count} (%{percentage:.1f})\n"
 
             # Güven dağılımı
-            confidence_counts = results_df['confidence'].value_counts()
             report_content += "\n## Güven Dağılımı\n"
-            for confidence, count in confidence_counts.items():
-                percentage = (count / len(results_df)) * 100
+            for confidence, count in stats.get('confidence', {}).items():
+                percentage = (count / stats['matches']) * 100
                 report_content += f"- **{confidence}**: {count} (%{percentage:.1f})\n"
 
+            if 'histogram' in stats:
+                from report_builder import ReportBuilder
+
+                report_content += f"\n## Skor Histogramı (score_ratio)\n{ReportBuilder.format_histogram(stats['histogram'])}\n"
+
         # Konfigürasyon detayları
         report_content += self._get_config_details()
 
         return self._save_report(report_content)
 
     def _generate_multi_database_report(self, results_dict, project_info):
-        # Sadece boş olmayan sonuçları say
-        non_empty_results = {k: v for k, v in results_dict.items() if not v.empty}
-        total_matches = sum(len(df) for df in non_empty_results.values())
+        from evaluation import format_metrics
+        from report_builder import ReportBuilder
+
+        # İstatistikler sonuç database'inden (SQL) veya kaydedilmediyse bellekten
+        table_stats, pair_stats = self.collect_report_stats(results_dict)
+        comparison_names = self.get_comparison_names()
+
+        non_empty = {name: stats for name, stats in table_stats.items() if stats and stats['matches']}
+        total_matches = sum(stats['matches'] for stats in non_empty.values())
         
         report_content = f"""# {project_info['name']} - Multi-Database Record Linkage Raporu
             Oluşturulma Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -261,35 +717,59 @@ class LinkageCoordinator:
             """
         
         for i, db in enumerate(self.databases_config, 1):
-            report_content += f"{i}. **{db['name']}**: {db['path']} -> {db['table']}\n"
+            # Hızlı doğrulamada ertelenen kesin sayım burada yapılır
+            row_count = self.db_manager.get_exact_row_count(db['name'], db)
+            report_content += f"{i}. **{db['name']}**: {db['path']} -> {db['table']} ({row_count} kayıt)\n"
 
         report_content += f"""
             ## Genel Özet
-            - **Toplam Karşılaştırma**: {len(results_dict)}
-            - **Başarılı Karşılaştırma**: {len(non_empty_results)}
+            - **Toplam Karşılaştırma**: {len(comparison_names)}
+            - **Başarılı Karşılaştırma**: {len(non_empty)}
             - **Toplam Eşleşme**: {total_matches}
             
             ## Karşılaştırma Detayları
             """
 
-        for comparison_name, results_df in results_dict.items():
+        for comparison_name in comparison_names:
             report_content += f"\n### {comparison_name}\n"
-            
-            if results_df.empty:
+
+            # Çift planı (bu çalışmada hesaplandıysa)
+            plan = self.record_linker.comparison_plans.get(comparison_name) if self.record_linker else None
+            if plan is not None:
+                report_content += f"- **Karşılaştırılan Alanlar**: {', '.join(comp.field for comp in plan.comparisons)}\n"
+                report_content += f"- **Tahmini Maliyet**: ~{plan.estimated_candidates:,} aday çift, {plan.estimated_cost:,.0f} birim\n"
+
+            # Süre ve blocking verimliliği (_pair_stats)
+            pair = pair_stats.get(comparison_name)
+            if pair is not None:
+                report_content += f"- **Süre**: {pair['elapsed']:.2f} s\n"
+                if pair.get('candidate_pairs') is not None and pair.get('total_possible_pairs'):
+                    efficiency = (1 - pair['candidate_pairs'] / pair['total_possible_pairs']) * 100
+                    report_content += f"- **Aday Çift**: {pair['candidate_pairs']:,} / {pair['total_possible_pairs']:,} (Blocking verimliliği: %{efficiency:.1f})\n"
+
+            # Ground truth değerlendirmesi (evaluation.ground_truth)
+            metrics = self.evaluation_results.get(comparison_name)
+            if metrics is not None:
+                report_content += f"- **Değerlendirme**: {format_metrics(metrics)} ({metrics['true_positives']} / {metrics['true_links']} gerçek bağlantı)\n"
+
+            stats = non_empty.get(comparison_name)
+            if stats is None:
                 report_content += f"- **Eşleşme Sayısı**: 0 (Eşleşme bulunamadı)\n"
                 continue
                 
-            report_content += f"- **Eşleşme Sayısı**: {len(results_df)}\n"
+            report_content += f"- **Eşleşme Sayısı**: {stats['matches']}\n"
             
             # Kalite dağılımı
-            if 'match_quality' in results_df.columns:
-                quality_counts = results_df['match_quality'].value_counts()
-                report_content += f"- **Kalite Dağılımı**: {dict(quality_counts)}\n"
+            if 'quality' in stats:
+                report_content += f"- **Kalite Dağılımı**: {stats['quality']}\n"
             
             # Güven dağılımı
-            if 'confidence' in results_df.columns:
-                confidence_counts = results_df['confidence'].value_counts()
-                report_content += f"- **Güven Dağılımı**: {dict(confidence_counts)}\n"
+            if 'confidence' in stats:
+                report_content += f"- **Güven Dağılımı**: {stats['confidence']}\n"
+
+            # Skor histogramı
+            if 'histogram' in stats:
+                report_content += f"- **Skor Histogramı (score_ratio)**: {ReportBuilder.format_histogram(stats['histogram'])}\n"
 
         # Konfigürasyon detayları
         report_content += self._get_config_details()
@@ -298,9 +778,10 @@ class LinkageCoordinator:
 
     def _get_config_details(self):
         config_content = "\n## Konfigürasyon Detayları\n"
-        config_content += f"- **Indexing**: {self.linkage_config.get('indexing', {})}\n"
-        config_content += f"- **Comparison**: {len(self.linkage_config.get('comparison', []))} kural\n"
-        config_content += f"- **Classification**: {self.linkage_config.get('classification', {})}\n"
+        indexing, classification = self.plan.indexing, self.plan.classification
+        config_content += f"- **Indexing**: {indexing.method} (anahtar: {indexing.key})\n"
+        config_content += f"- **Comparison**: {len(self.plan.comparisons)} kural\n"
+        config_content += f"- **Classification**: {classification.method} (eşik: {classification.threshold})\n"
         return config_content
 
     def _save_report(self, report_content):
@@ -312,73 +793,120 @@ class LinkageCoordinator:
         # Dosya var mı kontrol et (aynı saniyede çalışma durumu)
         file_exists = os.path.exists(report_path)
         if file_exists:
-            print(f"Report file already exists, will be overwritten: {report_path}")
+            log.info(f"Report file already exists, will be overwritten: {report_path}")
 
         try:
             with open(report_path, 'w', encoding='utf-8') as f:
                 f.write(report_content)
 
             if file_exists:
-                print(f"Report created (overwritten): {report_path}")
+                log.info(f"Report created (overwritten): {report_path}")
             else:
-                print(f"Report created (new): {report_path}")
+                log.info(f"Report created (new): {report_path}")
             
             return report_path
             
         except Exception as e:
-            print(f"Report save ERROR: {e}")
+            log.error(f"Report save ERROR: {e}")
             return ""
 
-    def run_full_pipeline(self, data_limit: Optional[int] = None):
-        print("FULL PIPELINE IS STARTED")
-        print("=" * 60)
+    def run_full_pipeline(self, data_limit: Optional[int] = None, resume: bool = False):
+        log.info("FULL PIPELINE IS STARTED")
+        log.info("=" * 60)
 
         pipeline_start = time.time()
 
         try:
-            print("\nStep 1: Setup Checks")
+            log.info("\nStep 1: Setup Checks")
             self.validate_setup()
-
-            print("\nStep 2: Data Loading")
-            data = self.load_data(data_limit)
-
-            print("\nStep 3: Record Linkage")
-            if self.is_multi_database:
-                results = self.run_multi_database_linkage(data)
+            self.setup_checkpoint(data_limit, resume)
+
+            # Yükleme, linkage, kayıt ve export aşamaları üst üste bindirilir (pipeline.mode: async)
+            pipelined = (self.is_multi_database and len(self.databases_config) > 1
+                         and self.plan.pipeline.mode == 'async')
+            # Çiftler (veya blocking anahtarı bölümleri) TCP ile bağlanan worker süreçlerinde karşılaştırılır
+            distributed = (self.is_multi_database and len(self.databases_config) > 1
+                           and self.plan.distributed.enabled)
+            # Çoklu database'de her çift bittiğinde kaydedilir ve bellekten bırakılır
+            stream_results = self.is_multi_database and self.plan.output.save_to_db
+            # Ground truth verildiyse sonuçlar kayıttan sonra değerlendirilir
+            evaluate = self.plan.evaluation.enabled
+            evaluation_data = None
+            self.saved_files = {}
+
+            if pipelined:
+                log.info("\nStep 2-3: Pipelined Data Loading and Record Linkage")
+                results = self.run_pipelined_linkage(data_limit)
             else:
-                source_df, target_df = data
-                results = self.run_record_linkage(source_df, target_df)
-
-            print("\nStep 4: Save Results")
-            if self.is_multi_database:
+                log.info("\nStep 2: Data Loading")
+                data = self.load_data(data_limit)
+
+                log.info("\nStep 3: Record Linkage")
+                if distributed:
+                    results = self.run_distributed_linkage(data, on_result=self.save_pair_result if stream_results else None)
+                elif self.is_multi_database:
+                    results = self.run_multi_database_linkage(data, on_result=self.save_pair_result if stream_results else None)
+                else:
+                    source_df, target_df = data
+                    results = self.run_record_linkage(source_df, target_df)
+                # Değerlendirme aday çiftleri yüklenmiş tablolardan yeniden üretir
+                evaluation_data = data if evaluate else None
+                data = None
+
+            log.info("\nStep 4: Save Results")
+            if pipelined:
+                saved_files = self.saved_files
+                log.info("Results were saved and exported by the pipeline stages")
+            elif stream_results:
+                saved_files = self.saved_files
+                log.info("Results were saved after each comparison")
+            elif self.is_multi_database:
                 saved_files = self.save_multi_results(results)
             else:
                 saved_files = self.save_results(results)
 
-            print("\nStep 5: Generate Report")
+            if evaluate:
+                log.info("\nStep 5: Evaluation")
+                if pipelined:
+                    # Pipeline tabloları aşama aralarında bırakır: değerlendirme için tekrar yüklenir
+                    evaluation_data = self._load_multi_database_data(data_limit)
+                self.evaluate_results(results, evaluation_data)
+                evaluation_data = None
+
+            log.info("\nStep 6: Generate Report")
             report_path = self.generate_report(results)
 
+            if self.checkpoint is not None:
+                self.checkpoint.finish('complete')
+                if not self.plan.checkpoint.keep:
+                    self.checkpoint.cleanup()
+
             # Pipeline sonuçları
             pipeline_elapsed = time.time() - pipeline_start
 
             if self.is_multi_database:
-                total_matches = sum(len(df) for df in results.values() if not df.empty) if isinstance(results, dict) else 0
-                successful_comparisons = len([k for k, v in results.items() if not v.empty]) if isinstance(results, dict) else 0
+                # Sonuçlar kaydedilip bırakıldıysa değerler eşleşme sayılarıdır
+                match_counts = {k: v if isinstance(v, int) else len(v) for k, v in results.items()}
+                total_matches = sum(match_counts.values())
+                successful_comparisons = len([k for k, v in match_counts.items() if v > 0])
                 
-                print("\n" + "=" * 60)
-                print("MULTI-DATABASE PIPELINE COMPLETED SUCCESSFULLY")
-                print(f"Total Duration: {pipeline_elapsed:.2f} seconds")
-                print(f"Total comparisons: {len(results)}")
-                print(f"Successful comparisons: {successful_comparisons}")
-                print(f"Total matches found: {total_matches}")
+                log.info("\n" + "=" * 60)
+                log.info("MULTI-DATABASE PIPELINE COMPLETED SUCCESSFULLY")
+                log.info(f"Total Duration: {pipeline_elapsed:.2f} seconds")
+                log.info(f"Total comparisons: {len(results)}")
+                log.info(f"Successful comparisons: {successful_comparisons}")
+                log.info(f"Total matches found: {total_matches}", event='pipeline.done', seconds=round(pipeline_elapsed, 3),
+                         comparisons=len(results), successful_comparisons=successful_comparisons, matches=total_matches)
             else:
-                print("\n" + "=" * 60)
-                print("PIPELINE COMPLETED SUCCESSFULLY")
-                print(f"Total Duration: {pipeline_elapsed:.2f} seconds")
-                print(f"Matches found: {len(results)}")
+                log.info("\n" + "=" * 60)
+                log.info("PIPELINE COMPLETED SUCCESSFULLY")
+                log.info(f"Total Duration: {pipeline_elapsed:.2f} seconds")
+                log.info(f"Matches found: {len(results)}", event='pipeline.done', seconds=round(pipeline_elapsed, 3), matches=len(results))
 
-            print(f"Report: {report_path}")
-            print(f"Saved files: {saved_files}")
+            log.info(f"Report: {report_path}")
+            log.info(f"Saved files: {saved_files}")
+            if self.memory_budget is not None:
+                self.memory_budget.print_summary()
 
             return {
                 'success': True, 
@@ -390,38 +918,43 @@ class LinkageCoordinator:
             }
 
         except Exception as e:
-            print(f"\n Pipeline ERROR: {e}")
+            log.error(f"\n Pipeline ERROR: {e}")
+            if self.checkpoint is not None:
+                self.checkpoint.finish('failed')
+                log.warning(f"Checkpoint kept, rerun with --resume to continue (run {self.checkpoint.run_id})")
             return {'success': False, 'error': str(e)}
 
         finally:
             self.db_manager.disconnect_all()
-            print("The connections are closed")
+            log.info("The connections are closed")
 
 
-def main(config: str, limit: Optional[int] = None, debug: bool = False):
+def main(config: str, limit: Optional[int] = None, debug: bool = False, resume: bool = False):
     # Debug mode ayarları
     if debug:
-        print("Debug mode is ON")
-        print(f"Arguments: 'config': '{config}', 'limit': {limit}, 'debug': {debug}")
+        LOG_OVERRIDES.setdefault('level', 'debug')
+        log.configure(level=LOG_OVERRIDES['level'])
+        log.debug("Debug mode is ON")
+        log.debug(f"Arguments: 'config': '{config}', 'limit': {limit}, 'debug': {debug}, 'resume': {resume}")
 
     try:
         coordinator = LinkageCoordinator(config)
 
-        results = coordinator.run_full_pipeline(data_limit=limit)
+        results = coordinator.run_full_pipeline(data_limit=limit, resume=resume)
 
         if results['success']:
-            print("\nProgram completed successfully")
+            log.info("\nProgram completed successfully")
 
             if debug:
-                print(f"Debug - Result details: {results}")
+                log.debug(f"Debug - Result details: {results}")
 
             sys.exit(0)
         else:
-            print(f"\nProgram ERROR: {results.get('error', 'unknown error')}")
+            log.error(f"\nProgram ERROR: {results.get('error', 'unknown error')}")
             sys.exit(1)
 
     except Exception as e:
-        print(f"\nUnexpected error: {e}")
+        log.error(f"\nUnexpected error: {e}")
 
         if debug:
             import traceback
@@ -430,9 +963,143 @@ def main(config: str, limit: Optional[int] = None, debug: bool = False):
         sys.exit(1)
 
 
-if __name__ == "__main__":
-    config_path = '../config/templates/multi_db_3_databases.yaml'
-    data_limit = None
-    debug_mode = False
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='main.py', description='SQLite multi-database record linkage')
+    subparsers = parser.add_subparsers(dest='command')
+
+    # Tüm komutlarda ortak log seçenekleri
+    log_parser = argparse.ArgumentParser(add_help=False)
+    log_parser.add_argument('--quiet', action='store_true', default=None, help='Only warnings and errors, no progress output')
+    log_parser.add_argument('--log-level', choices=['debug', 'info', 'warning', 'error'], default=None, help='Minimum event level')
+    log_parser.add_argument('--log-format', choices=['text', 'json'], default=None, help='Plain text or one JSON object per line')
+    log_parser.add_argument('--log-file', default=None, help='Append events to this file instead of stdout')
+
+    summary_parser = subparsers.add_parser('summary', parents=[log_parser], help='Print the configuration summary')
+    summary_parser.add_argument('config', help='YAML config path')
+
+    validate_parser = subparsers.add_parser('validate', parents=[log_parser], help='Validate config, databases and schemas')
+    validate_parser.add_argument('config', help='YAML config path')
+
+    run_parser = subparsers.add_parser('run', parents=[log_parser], help='Run the full linkage pipeline')
+    run_parser.add_argument('config', help='YAML config path')
+    run_parser.add_argument('--limit', type=int, default=None, help='Max records loaded per database')
+    run_parser.add_argument('--debug', action='store_true', help='Print debug details')
+    run_parser.add_argument('--resume', action='store_true', help='Continue an interrupted run from its checkpoint')
+
+    benchmark_parser = subparsers.add_parser('benchmark', parents=[log_parser], help='Run the benchmark suite')
+    benchmark_parser.add_argument('config', help='YAML config path')
+    benchmark_parser.add_argument('--limit', type=int, default=None, help='Max records loaded per database')
+    benchmark_parser.add_argument('--repeat', type=int, default=1, help='Repetitions per benchmark')
+    benchmark_parser.add_argument('--output', default=None, help='Write results as JSON to this path')
+    benchmark_parser.add_argument('--dedup-rows', type=int, default=None, help='Also run the dedup benchmark on a scaled FEBRL3 table with this many rows')
+
+    sweep_parser = subparsers.add_parser('sweep', parents=[log_parser], help='Evaluate a threshold grid over one feature computation')
+    sweep_parser.add_argument('config', help='YAML config path')
+    sweep_parser.add_argument('--limit', type=int, default=None, help='Max records loaded per database')
+    sweep_parser.add_argument('--thresholds', default=None, help='Grid as start:stop:step or a comma separated list')
+    sweep_parser.add_argument('--output', default=None, help='Write the sweep table as CSV to this path')
+    sweep_parser.add_argument('--recompute', action='store_true', help='Ignore the feature store and compute every column')
+
+    worker_parser = subparsers.add_parser('worker', parents=[log_parser], help='Join a distributed run as a worker process')
+    worker_parser.add_argument('--connect', required=True, help='Coordinator address as host:port')
+    worker_parser.add_argument('--authkey', required=True, help='distributed.authkey of the coordinator config')
+    worker_parser.add_argument('--connect-timeout', type=float, default=30.0, help='Seconds to wait for the coordinator')
+
+    profile_parser = subparsers.add_parser('profile', parents=[log_parser], help='Profile blocking key candidates on table samples')
+    profile_parser.add_argument('config', help='YAML config path')
+    profile_parser.add_argument('--sample-size', type=int, default=20000, help='Rows sampled per table')
+    profile_parser.add_argument('--recall-target', type=float, default=0.9, help='Minimum estimated recall of the recommended key')
+    profile_parser.add_argument('--seed', type=int, default=0, help='Sampling seed')
+    profile_parser.add_argument('--output', default=None, help='Write the key table as CSV to this path')
+
+    report_parser = subparsers.add_parser('report', parents=[log_parser], help='Regenerate the report from the results database')
+    report_parser.add_argument('config', help='YAML config path')
+
+    wide_parser = subparsers.add_parser('wide', parents=[log_parser], help='Export result tables with the source record columns joined back')
+    wide_parser.add_argument('config', help='YAML config path')
+    wide_parser.add_argument('--comparison', action='append', default=None, help='Only this comparison (repeatable)')
+    wide_parser.add_argument('--output-dir', default=None, help='CSV directory (default: output.csv_base_path)')
+
+    matches_parser = subparsers.add_parser('matches', parents=[log_parser], help='Look up the matches of one record in the results database')
+    matches_parser.add_argument('config', help='YAML config path')
+    matches_parser.add_argument('db_name', help='Database name (source/target in classic configs)')
+    matches_parser.add_argument('record_id', help='Record id (value of the mapped id column)')
+
+    return parser
+
+
+def cli(argv: Optional[List[str]] = None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    for key, value in [('quiet', getattr(args, 'quiet', None)), ('level', getattr(args, 'log_level', None)),
+                       ('format', getattr(args, 'log_format', None)), ('file', getattr(args, 'log_file', None))]:
+        if value is not None:
+            LOG_OVERRIDES[key] = value
+    log.configure(**LOG_OVERRIDES)
+
+    if args.command is None:
+        # Eski davranış: varsayılan config ile tam pipeline
+        main('../config/templates/multi_db_3_databases.yaml')
+
+    try:
+        if args.command == 'summary':
+            ConfigReader(args.config).print_summary()
 
-    main(config_path, data_limit, debug_mode)
+        elif args.command == 'validate':
+            coordinator = LinkageCoordinator(args.config)
+            try:
+                coordinator.validate_setup()
+            finally:
+                coordinator.db_manager.disconnect_all()
+
+        elif args.command == 'run':
+            main(args.config, args.limit, args.debug, args.resume)
+
+        elif args.command == 'benchmark':
+            from benchmark import BenchmarkSuite
+
+            suite = BenchmarkSuite(args.config, limit=args.limit, repeat=args.repeat, dedup_rows=args.dedup_rows)
+            suite.run_all()
+            suite.print_results()
+            if args.output:
+                suite.save_results(args.output)
+
+        elif args.command == 'sweep':
+            coordinator = LinkageCoordinator(args.config)
+            coordinator.run_threshold_sweep(args.limit, args.thresholds, args.output, args.recompute)
+
+        elif args.command == 'worker':
+            from distributed import parse_address, run_worker
+
+            run_worker(parse_address(args.connect), args.authkey.encode('utf-8'), connect_timeout=args.connect_timeout)
+
+        elif args.command == 'profile':
+            coordinator = LinkageCoordinator(args.config)
+            coordinator.profile_blocking_keys(args.sample_size, args.recall_target, args.seed, args.output)
+
+        elif args.command == 'report':
+            coordinator = LinkageCoordinator(args.config)
+            report_path = coordinator.regenerate_report()
+            if not report_path:
+                sys.exit(1)
+
+        elif args.command == 'wide':
+            coordinator = LinkageCoordinator(args.config)
+            exported = coordinator.export_wide_results(args.comparison, args.output_dir)
+            if not exported:
+                sys.exit(1)
+
+        elif args.command == 'matches':
+            coordinator = LinkageCoordinator(args.config)
+            coordinator.find_matches(args.db_name, args.record_id)
+
+    except Exception as e:
+        log.error(f"\n{args.command} ERROR: {e}")
+        sys.exit(1)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,125 @@
+import gc
+import os
+import re
+from typing import Dict, Optional
+
+from event_log import log
+
+MB = 1024 * 1024
+SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': MB, 'MB': MB, 'G': 1024 * MB, 'GB': 1024 * MB}
+
+
+def parse_memory_size(value) -> int:
+    """Bytes from an int or a string such as ``"512MB"``, ``"2GB"``, ``"1.5G"``."""
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    match = re.fullmatch(r'\s*([\d.]+)\s*([A-Za-z]*)\s*', str(value))
+    if not match or match.group(2).upper() not in SIZE_UNITS:
+        raise ValueError(f"Invalid memory size: {value}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def current_rss() -> Optional[int]:
+    # Linux: /proc/self/statm ikinci alan = bellekte duran sayfa sayısı
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class MemoryBudget:
+    """Sizes chunks and batches from a per-run memory limit.
+
+    Every sized unit (candidate pairs of a feature chunk, dedup pairs,
+    export rows) has a bytes-per-item estimate that starts from a baseline
+    and is raised to the largest measured value: the bytes retained by a
+    finished chunk or the RSS growth while it was computed. A chunk gets
+    ``target_fraction`` of the memory still free below the limit, so sizes
+    shrink on their own as RSS grows; above ``high_water`` of the limit the
+    minimum size is used. Chosen sizes are printed when they change.
+    """
+
+    def __init__(self, limit_bytes: int, target_fraction: float = 0.5, high_water: float = 0.9,
+                 min_chunk: int = 1000, max_chunk: int = 2000000):
+        self.limit = limit_bytes
+        self.target_fraction = target_fraction
+        self.high_water = high_water
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+
+        self.bytes_per_item: Dict[str, float] = {}
+        self.peak_rss = current_rss() or 0
+        self._last_size: Dict[str, int] = {}
+        self._per_item: Dict[str, float] = {}
+        self._chunks: Dict[str, list] = {}
+
+    @classmethod
+    def from_config(cls, resources_config: dict) -> Optional['MemoryBudget']:
+        if not resources_config.get('memory_limit'):
+            return None
+        return cls(parse_memory_size(resources_config['memory_limit']),
+                   target_fraction=resources_config.get('target_fraction', 0.5),
+                   min_chunk=resources_config.get('min_chunk', 1000),
+                   max_chunk=resources_config.get('max_chunk', 2000000))
+
+    @staticmethod
+    def pair_bytes(n_features: int) -> float:
+        # Başlangıç tahmini: iki pozisyon + kolon başına toplanan değerler, ara diziler ve skor
+        return 32.0 + 64.0 * max(n_features, 1)
+
+    def _rss(self) -> int:
+        rss = current_rss() or 0
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def chunk_size(self, name: str, baseline_bytes: float, minimum: Optional[int] = None, maximum: Optional[int] = None) -> int:
+        minimum = minimum or self.min_chunk
+        maximum = maximum or self.max_chunk
+        per_item = max(self.bytes_per_item.get(name, 0.0), baseline_bytes, 1.0)
+
+        rss = self._rss()
+        if rss >= self.limit * self.high_water:
+            # Limite yaklaşıldı: önce çöp toplama, yine yüksekse en küçük parça
+            gc.collect()
+            rss = self._rss()
+
+        if rss >= self.limit * self.high_water:
+            size = minimum
+        else:
+            size = int((self.limit - rss) * self.target_fraction / per_item)
+        size = max(minimum, min(maximum, size))
+
+        last = self._last_size.get(name)
+        if last is None or abs(size - last) > 0.25 * last:
+            log.info(f"Memory budget: {name} chunk {size:,} ({per_item:,.0f} B/item, RSS {rss / MB:,.0f} MB of {self.limit / MB:,.0f} MB)",
+                     event='memory.chunk', unit=name, size=size, bytes_per_item=round(per_item, 1), rss=rss, limit=self.limit)
+        self._last_size[name] = size
+        self._per_item[name] = per_item
+        self._chunks.setdefault(name, []).append(size)
+        return size
+
+    def measure(self, name: str, items: int, retained_bytes: int, rss_before: Optional[int] = None):
+        if items <= 0:
+            return
+
+        rss_growth = (self._rss() - rss_before) if rss_before else 0
+        measured = max(retained_bytes, rss_growth) / items
+        self.bytes_per_item[name] = max(self.bytes_per_item.get(name, 0.0), measured)
+
+    def batch_rows(self, name: str, df) -> Optional[int]:
+        # Export/insert batch'i: sonuç tablosunun satır başına belleği (yazma sırasında ~3 kopya)
+        if len(df) == 0:
+            return None
+        row_bytes = df.memory_usage(deep=True).sum() / len(df)
+        return self.chunk_size(name, row_bytes * 3, minimum=100)
+
+    def print_summary(self):
+        log.info("\nMEMORY BUDGET:")
+        log.info("=" * 60)
+        log.metric('peak_rss', self.peak_rss, f"Limit: {self.limit / MB:,.0f} MB, peak RSS: {self.peak_rss / MB:,.0f} MB", limit=self.limit)
+        for name, sizes in self._chunks.items():
+            log.info(f"   {name}: {len(sizes)} chunks, size {min(sizes):,}-{max(sizes):,}, "
+                     f"{self._per_item[name]:,.0f} B/item (measured {self.bytes_per_item.get(name, 0.0):,.0f})")
@@ -0,0 +1,311 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from typing import Dict, Optional
+
+from event_log import log
+
+
+class StageMetrics:
+    """Counters of one pipeline stage.
+
+    ``busy`` is the time spent in the worker pool, ``idle`` the time the
+    stage waited for input and ``blocked`` the time it waited for space in
+    the next (full) queue, i.e. backpressure from the following stage.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+
+    def sample(self, queue: asyncio.Queue):
+        depth = queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+    @property
+    def avg_depth(self) -> float:
+        return self._depth_total / self._depth_samples if self._depth_samples else 0.0
+
+    def as_dict(self) -> dict:
+        return {'items': self.items, 'busy': self.busy, 'idle': self.idle, 'blocked': self.blocked,
+                'max_queue_depth': self.max_depth, 'avg_queue_depth': self.avg_depth}
+
+
+class PipelineOrchestrator:
+    """Pipelined multi-database run: load → link → save → export.
+
+    Stages are connected by bounded ``asyncio`` queues (``queue_size``).
+    Databases are loaded in a thread pool, each pair is linked as soon as
+    both of its databases are loaded, and the result of pair N is saved to
+    SQLite and exported to CSV while pair N+1 is being compared. A full
+    queue blocks the previous stage, so at most ``queue_size`` finished
+    results wait in memory per stage, and a database is released once all
+    of its pairs are linked.
+
+    SQLite objects stay on the thread that created them: loaders open their
+    own connections and the single save worker writes through its own
+    results connection. The checkpoint is therefore kept per pair (written
+    by the save stage); feature chunks of an interrupted pair are not
+    checkpointed in this mode.
+    """
+
+    STAGES = ('load', 'link', 'save', 'export')
+
+    def __init__(self, coordinator):
+        self.coordinator = coordinator
+        pipeline = coordinator.plan.pipeline
+        self.queue_size = pipeline.queue_size
+        self.load_workers = pipeline.load_workers
+        self.link_workers = pipeline.link_workers
+        self.export_workers = pipeline.export_workers
+
+        self.metrics = {name: StageMetrics(name) for name in self.STAGES}
+        self.results = {}
+        self.linkers = []
+
+    def run(self, limit: Optional[int] = None) -> Dict[str, object]:
+        start_time = time.perf_counter()
+        asyncio.run(self._run(limit))
+        self.elapsed = time.perf_counter() - start_time
+        self.print_metrics()
+        return self.results
+
+    async def _run(self, limit: Optional[int]):
+        from record_linker import RecordLinker
+
+        coordinator = self.coordinator
+        output = coordinator.plan.output
+        checkpoint = coordinator.checkpoint
+
+        db_configs = {db['name']: db for db in coordinator.databases_config}
+        db_names = coordinator.plan.database_names
+        exclude_fields = coordinator.plan.exclude_fields
+
+        # Tamamlanmış çiftler checkpoint'ten gelir, sadece eksik çiftlerin database'leri yüklenir
+        pairs = list(combinations(db_names, 2))
+        restored = [pair for pair in pairs if checkpoint is not None and checkpoint.is_pair_complete(f"{pair[0]}_{pair[1]}")]
+        pending_pairs = [pair for pair in pairs if pair not in restored]
+        pending_dbs = [name for name in db_names if any(name in pair for pair in pending_pairs)]
+        remaining = {name: sum(name in pair for pair in pending_pairs) for name in pending_dbs}
+
+        # Her link worker'ının kendi linker'ı (aday çiftler, özellikler); plan ve kolon önbelleği ortak
+        self.linkers = [RecordLinker(memory_budget=coordinator.memory_budget, linkage_plan=coordinator.plan) for _ in range(self.link_workers)]
+        master = self.linkers[0]
+        master.pair_stats = {}
+        for linker in self.linkers[1:]:
+            linker.comparison_plans = master.comparison_plans
+            linker.column_cache = master.column_cache
+        coordinator.record_linker = master
+
+        fingerprints = None
+        if master.feature_store is not None:
+            from checkpoint import fingerprint_inputs
+            fingerprints = {name: fingerprint_inputs([db], limit) for name, db in db_configs.items()}
+
+        loop = asyncio.get_running_loop()
+        load_pool = ThreadPoolExecutor(max_workers=self.load_workers, thread_name_prefix='load')
+        link_pool = ThreadPoolExecutor(max_workers=self.link_workers, thread_name_prefix='link')
+        save_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='save')
+        export_pool = ThreadPoolExecutor(max_workers=self.export_workers, thread_name_prefix='export')
+
+        link_queue = asyncio.Queue(maxsize=self.queue_size)
+        save_queue = asyncio.Queue(maxsize=self.queue_size)
+        export_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        data = {}
+        emitted = set()
+        load_semaphore = asyncio.Semaphore(self.load_workers)
+
+        async def put(queue: asyncio.Queue, item, producer: StageMetrics, consumer: StageMetrics):
+            # Bekleme üreticiye (backpressure), kuyruk derinliği tüketicinin girişine yazılır
+            wait_start = time.perf_counter()
+            await queue.put(item)
+            producer.blocked += time.perf_counter() - wait_start
+            consumer.sample(queue)
+
+        async def get(queue: asyncio.Queue, metrics: StageMetrics):
+            wait_start = time.perf_counter()
+            item = await queue.get()
+            metrics.idle += time.perf_counter() - wait_start
+            return item
+
+        loaded_records = []
+
+        async def load_one(db_name: str):
+            metrics = self.metrics['load']
+            async with load_semaphore:
+                start = time.perf_counter()
+                df = await loop.run_in_executor(load_pool, coordinator.db_manager.load_data_from_path, db_configs[db_name], limit)
+                metrics.busy += time.perf_counter() - start
+                metrics.items += 1
+
+            data[db_name] = df
+            loaded_records.append(len(df))
+            log.info(f"✅ {db_name}: {len(df)} records loaded", event='load.done', database=db_name, records=len(df))
+
+            # İki tarafı da yüklenen çiftler link kuyruğuna (config sırasıyla)
+            for pair in pending_pairs:
+                if pair not in emitted and pair[0] in data and pair[1] in data:
+                    emitted.add(pair)
+                    await put(link_queue, pair, metrics, self.metrics['link'])
+
+        async def load_stage():
+            start = time.perf_counter()
+            await asyncio.gather(*(load_one(name) for name in pending_dbs))
+            coordinator.db_manager.log_load_throughput(sum(loaded_records), time.perf_counter() - start)
+            for _ in range(self.link_workers):
+                await link_queue.put(None)
+
+        def link_in_worker(linker, db1: str, db2: str):
+            from comparison_plan import build_comparison_plan
+
+            plan = build_comparison_plan(linker.linkage_plan, db1, db2, data[db1], data[db2], exclude_fields)
+            master.comparison_plans[plan.name] = plan
+            return linker.link_pair(data[db1], data[db2], db1, db2, fingerprints=fingerprints)
+
+        async def link_worker(linker):
+            metrics = self.metrics['link']
+            while True:
+                pair = await get(link_queue, metrics)
+                if pair is None:
+                    return
+
+                db1, db2 = pair
+                start = time.perf_counter()
+                results, stats = await loop.run_in_executor(link_pool, link_in_worker, linker, db1, db2)
+                metrics.busy += time.perf_counter() - start
+                metrics.items += 1
+                master.pair_stats[f"{db1}_{db2}"] = stats
+                linker.candidate_links = linker.features = linker.matches = None
+
+                # Tüm çiftleri biten database bellekten ve önbelleklerden bırakılır
+                for db_name in pair:
+                    remaining[db_name] -= 1
+                    if remaining[db_name] == 0:
+                        released = data.pop(db_name, None)
+                        for other in self.linkers:
+                            other.release_database(db_name, released)
+                        del released
+
+                await put(save_queue, (f"{db1}_{db2}", results, stats), metrics, self.metrics['save'])
+
+        async def link_stage():
+            for pair in restored:
+                comparison_name = f"{pair[0]}_{pair[1]}"
+                restored_df = checkpoint.load_pair_results(comparison_name)
+                log.info(f"\nSkipping {comparison_name}: {len(restored_df)} matches restored from checkpoint")
+                await put(save_queue, (comparison_name, restored_df, None), self.metrics['link'], self.metrics['save'])
+
+            await asyncio.gather(*(link_worker(linker) for linker in self.linkers))
+            await save_queue.put(None)
+
+        def open_writer():
+            # Kaydedici bağlantısı kendi thread'inde açılır ve sadece orada kullanılır
+            from database_manager import DatabaseManager
+
+            writer = DatabaseManager()
+            writer.memory_budget = coordinator.memory_budget
+            writer.connect_results_database(output.results_db_path)
+            writer_checkpoint = checkpoint.bind(writer.results_connection) if checkpoint is not None else None
+            return writer, writer_checkpoint
+
+        def save_in_worker(writer, writer_checkpoint, comparison_name: str, results, stats: Optional[dict]):
+            table_prefix = output.table_prefix
+            saved = writer.save_multi_results({comparison_name: results}, table_prefix)
+
+            if stats is not None:
+                writer.save_pair_stats(comparison_name, writer.get_result_table_name(comparison_name, table_prefix), stats)
+
+                if writer_checkpoint is not None:
+                    if 'error' in stats:
+                        writer_checkpoint.set_stage(comparison_name, 'linkage', 'failed', {'error': stats['error']})
+                    else:
+                        writer_checkpoint.save_pair_results(comparison_name, results)
+
+            return saved[comparison_name]
+
+        async def save_stage():
+            metrics = self.metrics['save']
+            save_to_db = output.save_to_db
+            export_csv = output.export_csv
+            writer, writer_checkpoint = (await loop.run_in_executor(save_pool, open_writer)) if save_to_db else (None, None)
+
+            try:
+                while True:
+                    item = await get(save_queue, metrics)
+                    if item is None:
+                        break
+
+                    comparison_name, results, stats = item
+                    if save_to_db:
+                        start = time.perf_counter()
+                        table_name = await loop.run_in_executor(save_pool, save_in_worker, writer, writer_checkpoint, comparison_name, results, stats)
+                        metrics.busy += time.perf_counter() - start
+                        coordinator.saved_files.setdefault('database', {})[comparison_name] = table_name
+                    metrics.items += 1
+
+                    # Database'e yazılan sonuç için sadece eşleşme sayısı tutulur
+                    self.results[comparison_name] = len(results) if save_to_db else results
+                    if export_csv:
+                        await put(export_queue, (comparison_name, results), metrics, self.metrics['export'])
+
+            finally:
+                if writer is not None:
+                    await loop.run_in_executor(save_pool, writer.disconnect_all)
+
+            for _ in range(self.export_workers):
+                await export_queue.put(None)
+
+        async def export_worker():
+            metrics = self.metrics['export']
+            csv_base_path = output.csv_base_path
+            while True:
+                item = await get(export_queue, metrics)
+                if item is None:
+                    return
+
+                comparison_name, results = item
+                start = time.perf_counter()
+                exported = await loop.run_in_executor(export_pool, coordinator.db_manager.export_multi_results_to_csv,
+                                                      {comparison_name: results}, csv_base_path)
+                metrics.busy += time.perf_counter() - start
+                metrics.items += 1
+                coordinator.saved_files.setdefault('csv', {}).update(exported)
+
+        log.info(f"Pipeline: {len(pending_dbs)} databases to load, {len(pending_pairs)} pairs to link, {len(restored)} restored "
+                 f"(queue size {self.queue_size}, link workers {self.link_workers})")
+
+        tasks = [asyncio.ensure_future(stage) for stage in
+                 (load_stage(), link_stage(), save_stage(), *(export_worker() for _ in range(self.export_workers)))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            for pool in (load_pool, link_pool, save_pool, export_pool):
+                pool.shutdown(wait=True)
+
+        master.column_cache.clear()
+
+    def metrics_summary(self) -> Dict[str, dict]:
+        return {name: metrics.as_dict() for name, metrics in self.metrics.items()}
+
+    def print_metrics(self):
+        log.info("\nPIPELINE STAGES:")
+        log.info("=" * 60)
+        log.info(f"{'stage':<8} {'items':>6} {'busy (s)':>10} {'idle (s)':>10} {'blocked (s)':>12} {'max queue':>10} {'avg queue':>10}")
+        for metrics in self.metrics.values():
+            log.info(f"{metrics.name:<8} {metrics.items:>6} {metrics.busy:>10.2f} {metrics.idle:>10.2f} {metrics.blocked:>12.2f} "
+                     f"{metrics.max_depth:>10} {metrics.avg_depth:>10.2f}", event='pipeline.stage', stage=metrics.name, **metrics.as_dict())
+        log.info(f"Wall time: {self.elapsed:.2f}s (sum of stage busy time: {sum(m.busy for m in self.metrics.values()):.2f}s)")
@@ -1,217 +1,336 @@
+import numpy as np
 import pandas as pd
 import recordlinkage as rl
 import time
-from typing import Dict
+from typing import Dict, List, Optional
 from itertools import combinations
 
+from sorted_neighbourhood import SortedNeighbourhoodIndexer
+from ann_indexer import ANNIndexer
+from comparison_features import build_compare_feature, compute_features_on_positions
+from dedup_engine import DeduplicationEngine
+from comparison_plan import ComparisonPlan, PreparedColumnCache, build_comparison_plan, print_plan_summary
+from feature_store import FeatureStore
+from linkage_plan import compile_rules_plan
+from memory_budget import current_rss
+from event_log import log, NULL_PROGRESS
+
+# Bu sayıdan fazla aday çift ilerleme raporu için parçalar halinde karşılaştırılır
+PROGRESS_CHUNK = 250000
+
 
 class RecordLinker:
-    def __init__(self, config):
+    def __init__(self, config=None, memory_budget=None, linkage_plan=None):
 
-        self.config = config
+        # Derlenmiş plan (ConfigReader.get_plan): bütün ayarlar buradan okunur;
+        # plansız kurulumda (benchmark) config'teki kurallar bir kez derlenir
+        self.linkage_plan = linkage_plan if linkage_plan is not None else compile_rules_plan(config)
+        self.classification = self.linkage_plan.classification
+
+        # resources.memory_limit verildiyse parça boyutları buna göre seçilir
+        self.memory_budget = memory_budget
 
         # recordlinkage bileşenleri
         self.indexer = None
         self.compare_cl = None
         self.classifier = None
 
+        # Sıralı anahtar önbelleği çiftler arasında korunur
+        self._sorted_neighbourhood_indexer = None
+        self._sorted_neighbourhood_settings = None
+
+        # Çift bazlı karşılaştırma planları ve database başına hazırlanmış kolonlar
+        self.plan = None
+        self.comparison_plans = {}
+        self.column_cache = PreparedColumnCache()
+
+        # Aday çift ve özellik deposu (opsiyonel, diskte kalıcı)
+        store_spec = self.linkage_plan.feature_store
+        self.feature_store = FeatureStore(store_spec.path) if store_spec.enabled else None
+
         # Sonuçlar
         self.candidate_links = None
         self.features = None
         self.matches = None
+        self.dedup_stats = {}
+        self.pair_stats = {}
 
-        print("Record Linker is being started")
-        print(f"Configuration: {config}")
+        log.info("Record Linker is being started")
+        if log.enabled('debug'):
+            log.debug(f"Linkage plan: {self.linkage_plan}", event='linker.plan', digest=self.linkage_plan.digest)
 
     def setup_indexing(self):
-        print("Indexing is being set up...")
+        log.info("Indexing is being set up...")
 
-        indexing_config = self.config.get('indexing', {})
-        method = indexing_config.get('method', 'block')
-        key = indexing_config.get('key', None)
+        indexing = self.linkage_plan.indexing
+        method, key = indexing.method, indexing.key
 
         self.indexer = rl.Index()
 
         if method == 'block':
             if not key:
                 raise ValueError("Key required for block method")
-            print(f"Block indexing: {key}")
+            log.info(f"Block indexing: {key}")
             self.indexer.block(key)
 
         elif method == 'sortedneighbourhood':
             if not key:
                 raise ValueError("Key required for sorted neighborhood")
-            window = indexing_config.get('window', 3)
-            print(f"Sorted neighbourhood: {key} (window: {window})")
-            self.indexer.sortedneighbourhood(key, window=window)
+            window, engine = indexing.window, indexing.engine
+            log.info(f"Sorted neighbourhood: {key} (window: {window}, engine: {engine})")
+
+            if engine == 'recordlinkage':
+                self.indexer.sortedneighbourhood(key, window=window)
+            else:
+                settings = (key, window, indexing.adaptive, indexing.min_window, indexing.max_window, indexing.similarity_threshold)
+
+                # Aynı ayarlarla önceki indexer (ve sıralama önbelleği) yeniden kullanılır
+                if self._sorted_neighbourhood_indexer is None or self._sorted_neighbourhood_settings != settings:
+                    self._sorted_neighbourhood_indexer = SortedNeighbourhoodIndexer(*settings)
+                    self._sorted_neighbourhood_settings = settings
+                self.indexer = self._sorted_neighbourhood_indexer
+
+        elif method == 'ann':
+            if not key:
+                raise ValueError("Key required for ann indexing")
+            log.info(f"Approximate nearest neighbours: {key} ({indexing.algorithm}, top_k: {indexing.top_k}, threshold: {indexing.threshold})")
+            self.indexer = ANNIndexer(key, algorithm=indexing.algorithm, ngram=indexing.ngram, top_k=indexing.top_k, threshold=indexing.threshold,
+                                      num_perm=indexing.num_perm, bands=indexing.bands)
 
         elif method == 'full':
-            print("Full comparison")
+            log.info("Full comparison")
             self.indexer.full()
 
         else:
             raise ValueError(f"Unknown indexing method: {method}")
 
-        print("Indexing ready")
+        log.info("Indexing ready")
         return self.indexer
 
     def setup_comparison(self):
-        print("Comparison is being set up...")
+        log.info("Comparison is being set up...")
 
-        comparison_config = self.config.get('comparison', [])
+        comparisons = self.linkage_plan.comparisons
 
-        if not comparison_config:
+        if not comparisons:
             raise ValueError("Comparison is empty")
 
         self.compare_cl = rl.Compare()
 
-        for i, comp in enumerate(comparison_config, 1):
-            field = comp['field']
-            method = comp['method']
-
-            print(f"  {i}. {field}: {method}")
-
-            if method == 'exact':
-                # Exact match
-                self.compare_cl.exact(field, field, label=f'{field}_exact')
+        for i, comp in enumerate(comparisons, 1):
+            log.info(f"  {i}. {comp.field}: {comp.method}")
 
-            elif method == 'string':
-                # String similarity
-                algorithm = comp.get('algorithm', 'jarowinkler')
-                threshold = comp.get('threshold', 0.85)
+            if comp.method == 'string':
+                log.info(f"     Algorithm: {comp.algorithm}, Threshold: {comp.threshold}")
+            elif comp.method == 'numeric':
+                log.info(f"     Threshold: {comp.threshold}, Scoring: {comp.scoring}")
+            elif comp.method == 'date':
+                log.info(f"     Threshold: {comp.threshold} gün, Scoring: {comp.scoring}")
 
-                print(f"     Algorithm: {algorithm}, Threshold: {threshold}")
-                self.compare_cl.string(field, field, method=algorithm, threshold=threshold, label=f'{field}_string')
+            feature = build_compare_feature(comp)
+            if feature is None:
+                log.warning(f"Unkown comparison method: {comp.method}")
+                continue
 
-            elif method == 'numeric':
-                # Numeric comparison
-                threshold = comp.get('threshold', 1)
-                print(f"     Threshold: {threshold}")
-                self.compare_cl.numeric(field, field, method='linear', offset=threshold, label=f'{field}_numeric')
+            self.compare_cl.add(feature)
 
-            elif method == 'date':
-                # Date comparison
-                threshold = comp.get('threshold', 365)  # Gün cinsinden
-                print(f"     Threshold: {threshold} gün")
-                self.compare_cl.date(field, field, swap_month_day=False, offset=threshold, label=f'{field}_date')
-
-            else:
-                print(f"Unkown comparison method: {method}")
-
-        print("Compare is ready")
+        log.info("Compare is ready")
         return self.compare_cl
 
     def setup_classification(self):
-        print("Classification is being set up...")
+        log.info("Classification is being set up...")
 
-        classification_config = self.config.get('classification', {})
-        method = classification_config.get('method', 'threshold')
+        method = self.classification.method
 
         if method == 'threshold':
-            threshold = classification_config.get('threshold', 0.7)
-            print(f"Threshold-based classification: {threshold}")
+            log.info(f"Threshold-based classification: {self.classification.threshold}")
             self.classifier = None
 
         elif method == 'ecm':
-            print("ECM (Expectation-Conditional Maximization)")
+            log.info("ECM (Expectation-Conditional Maximization)")
             self.classifier = rl.ECMClassifier()
 
         elif method == 'svm':
-            print("SVM (Support Vector Machine)")
+            log.info("SVM (Support Vector Machine)")
             self.classifier = rl.SVMClassifier()
 
         elif method == 'kmeans':
-            print("K-Means Clustering")
+            log.info("K-Means Clustering")
             self.classifier = rl.KMeansClassifier()
 
         else:
             raise ValueError(f"Unkown classification method: {method}")
 
-        print("Classification is ready")
+        log.info("Classification is ready")
         return self.classifier
 
     def generate_candidate_pairs(self, df_source, df_target):
         if not self.indexer:
             self.setup_indexing()
 
-        print(f"Candidate pairs are being formed...")
-        print(f"Source: {len(df_source)} records")
-        print(f"Target: {len(df_target)} records")
+        log.info(f"Candidate pairs are being formed...")
+        log.info(f"Source: {len(df_source)} records")
+        log.info(f"Target: {len(df_target)} records")
 
         start_time = time.time()
 
-        self.candidate_links = self.indexer.index(df_source, df_target)
+        # Indexleme tek çağrıdır: bitişte kayıt/s verimi raporlanır
+        with log.progress('indexing', total=len(df_source) + len(df_target), unit='records') as progress:
+            self.candidate_links = self.indexer.index(df_source, df_target)
+            progress.update(len(df_source) + len(df_target))
 
         elapsed = time.time() - start_time
         total_possible = len(df_source) * len(df_target)
         reduction_ratio = (1 - len(self.candidate_links) / total_possible) * 100
 
-        print(f"{len(self.candidate_links):,} candidate pair created ({elapsed:.2f}s)")
-        print(f"Blocking efficiency: %{reduction_ratio:.1f} decrease")
+        log.info(f"{len(self.candidate_links):,} candidate pair created ({elapsed:.2f}s)", event='indexing.done',
+                 candidates=len(self.candidate_links), seconds=round(elapsed, 3), reduction_ratio=round(reduction_ratio, 2))
+        log.info(f"Blocking efficiency: %{reduction_ratio:.1f} decrease")
 
         return self.candidate_links
 
-    def compute_features(self, df_source, df_target):
-        if not self.compare_cl:
+    def compute_features(self, df_source, df_target, checkpoint=None, pair_name: Optional[str] = None):
+        if not self.compare_cl and self.plan is None:
             self.setup_comparison()
 
         if self.candidate_links is None:
             self.generate_candidate_pairs(df_source, df_target)
 
-        print(f"Features are being computed...")
-        print(f"{len(self.candidate_links):,} pair to be compared")
+        log.info(f"Features are being computed...")
+        log.info(f"{len(self.candidate_links):,} pair to be compared")
 
         start_time = time.time()
 
         # Özellik karşılaştırmaları
-        self.features = self.compare_cl.compute(self.candidate_links, df_source, df_target)
+        if checkpoint is not None and pair_name:
+            self.features = self._compute_features_checkpointed(df_source, df_target, checkpoint, pair_name)
+        elif self.memory_budget is not None and len(self.candidate_links) > 0:
+            self.features = self._compute_features_budgeted(df_source, df_target)
+        else:
+            self.features = self._compute_features_with_progress(df_source, df_target)
 
         elapsed = time.time() - start_time
 
-        print(f"Feature compution completed ({elapsed:.2f}s)")
-        print(f"Feature matrix size: {self.features.shape}")
+        log.info(f"Feature compution completed ({elapsed:.2f}s)", event='comparison.done',
+                 pairs=len(self.features), features=len(self.features.columns), seconds=round(elapsed, 3))
+        log.info(f"Feature matrix size: {self.features.shape}")
 
-        # Özet istatistikler
-        print(f"Feature summary:")
-        for col in self.features.columns:
-            mean_score = self.features[col].mean()
-            print(f"   {col}: average {mean_score:.3f}")
+        # Özet istatistikler (sessiz modda ortalamalar hesaplanmaz)
+        if log.enabled('info'):
+            log.info(f"Feature summary:")
+            for col in self.features.columns:
+                mean_score = self.features[col].mean()
+                log.info(f"   {col}: average {mean_score:.3f}", event='feature.mean', feature=col, mean=round(float(mean_score), 4))
 
         return self.features
 
+    def _compute_feature_frame(self, candidate_links, df_source, df_target):
+        if self.plan is not None:
+            return self.plan.compute(candidate_links, df_source, df_target, self.column_cache)
+        return self.compare_cl.compute(candidate_links, df_source, df_target)
+
+    def _compute_features_with_progress(self, df_source, df_target):
+        # Büyük aday kümeleri ilerleme (ETA, çift/s) için parçalanır; sessiz modda tek çağrı
+        progress = log.progress('comparison', total=len(self.candidate_links), unit='pairs')
+        if progress is NULL_PROGRESS or len(self.candidate_links) <= PROGRESS_CHUNK:
+            features = self._compute_feature_frame(self.candidate_links, df_source, df_target)
+            progress.update(len(features))
+            progress.finish()
+            return features
+
+        frames = []
+        for start in range(0, len(self.candidate_links), PROGRESS_CHUNK):
+            chunk_links = self.candidate_links[start:start + PROGRESS_CHUNK]
+            frames.append(self._compute_feature_frame(chunk_links, df_source, df_target))
+            progress.update(len(chunk_links))
+        progress.finish()
+
+        return pd.concat(frames)
+
+    def _compute_features_budgeted(self, df_source, df_target):
+        # Parça boyutu her parçadan önce ölçülen çift başına bellek ve boştaki belleğe göre seçilir
+        n_features = len(self.plan.comparisons) if self.plan is not None else len(self.compare_cl.features)
+        baseline = self.memory_budget.pair_bytes(n_features)
+
+        progress = log.progress('comparison', total=len(self.candidate_links), unit='pairs')
+        frames = []
+        start = 0
+        while start < len(self.candidate_links):
+            size = self.memory_budget.chunk_size('feature_pairs', baseline)
+            chunk_links = self.candidate_links[start:start + size]
+
+            rss_before = current_rss()
+            frame = self._compute_feature_frame(chunk_links, df_source, df_target)
+            self.memory_budget.measure('feature_pairs', len(chunk_links), int(frame.memory_usage(deep=True).sum()), rss_before)
+
+            frames.append(frame)
+            start += size
+            progress.update(len(chunk_links))
+        progress.finish()
+
+        return frames[0] if len(frames) == 1 else pd.concat(frames)
+
+    def _compute_features_checkpointed(self, df_source, df_target, checkpoint, pair_name: str):
+        # Aday çiftler sabit boyutlu parçalar halinde karşılaştırılır, her parça kaydedilir
+        chunk_size = checkpoint.chunk_size
+        n_chunks = max(1, -(-len(self.candidate_links) // chunk_size))
+        done_chunks = checkpoint.completed_chunks(pair_name)
+
+        if done_chunks:
+            log.info(f"Resuming features: {len(done_chunks)}/{n_chunks} chunks already computed")
+
+        progress = log.progress('comparison', total=len(self.candidate_links), unit='pairs')
+        chunk_frames = []
+        for chunk_no in range(n_chunks):
+            if chunk_no in done_chunks:
+                restored = checkpoint.load_feature_chunks(pair_name, {chunk_no})
+                restored.index = restored.index.set_names(self.candidate_links.names)
+                chunk_frames.append(restored)
+                progress.update(len(restored))
+                continue
+
+            chunk_links = self.candidate_links[chunk_no * chunk_size:(chunk_no + 1) * chunk_size]
+            chunk_features = self._compute_feature_frame(chunk_links, df_source, df_target)
+            checkpoint.save_feature_chunk(pair_name, chunk_no, chunk_features)
+            checkpoint.set_stage(pair_name, 'features', 'running', {'chunks_done': chunk_no + 1, 'chunks_total': n_chunks})
+            chunk_frames.append(chunk_features)
+            progress.update(len(chunk_links))
+        progress.finish()
+
+        features = pd.concat(chunk_frames)
+        checkpoint.set_stage(pair_name, 'features', 'complete', {'chunks_total': n_chunks})
+
+        return features
+
     def classify_matches(self):
         if self.features is None:
             raise ValueError("First compute_features() must be run.")
 
-        classification_config = self.config.get('classification', {})
-        method = classification_config.get('method', 'threshold')
+        method = self.classification.method
 
-        print(f"Matches are being sorted: {method}")
+        log.info(f"Matches are being sorted: {method}")
 
         start_time = time.time()
 
         if method == 'threshold':
-            threshold = classification_config.get('threshold', 0.7)
-
             # Toplam skor hesapla
             scores = self.features.sum(axis=1)
-            max_possible_score = len(self.features.columns)
 
             # Threshold'u uygula
-            min_score = threshold * max_possible_score
+            min_score = self.classification.min_score(len(self.features.columns))
             self.matches = scores[scores >= min_score]
 
-            print(f"Threshold: {threshold} (min score: {min_score:.1f})")
+            log.info(f"Threshold: {self.classification.threshold} (min score: {min_score:.1f})")
 
         else:
             # Machine learning classifiers
             if not self.classifier:
                 self.setup_classification()
 
-            print("Classifier is being trained...")
+            log.info("Classifier is being trained...")
             self.classifier.fit(self.features)
 
-            print("Prediction is being made...")
+            log.info("Prediction is being made...")
             match_result = self.classifier.predict(self.features)
 
             # Boolean series'i matches'e çevir
@@ -222,22 +341,25 @@ class RecordLinker:
 
         elapsed = time.time() - start_time
 
-        print(f"{len(self.matches)} maches found ({elapsed:.2f}s)")
+        log.info(f"{len(self.matches)} maches found ({elapsed:.2f}s)", event='classification.done', matches=len(self.matches), seconds=round(elapsed, 3))
 
         if len(self.matches) > 0:
             avg_score = self.matches.mean()
             max_score = self.matches.max()
             min_score = self.matches.min()
-            print(f"Skor dağılımı: min={min_score:.3f}, avg={avg_score:.3f}, max={max_score:.3f}")
+            log.info(f"Skor dağılımı: min={min_score:.3f}, avg={avg_score:.3f}, max={max_score:.3f}")
 
         return self.matches
 
     def format_results(self, df_source, df_target):
         if self.matches is None:
-            print("Not yet maches")
+            log.info("Not yet maches")
             return pd.DataFrame()
 
-        print("Results are being formatted...")
+        if self.linkage_plan.output.result_format == 'compact':
+            return self.format_results_compact(df_source, df_target)
+
+        log.info("Results are being formatted...")
 
         results = []
 
@@ -282,7 +404,50 @@ class RecordLinker:
         if not results_df.empty:
             results_df = results_df.sort_values('total_score', ascending=False)
 
-        print(f"{len(results_df)} result formatted")
+        log.info(f"{len(results_df)} result formatted")
+        return results_df
+
+    def format_results_compact(self, df_source, df_target) -> pd.DataFrame:
+        # Sadece kimlikler, skorlar ve özellik vektörü; kayıt kolonları gerektiğinde load_wide_results ile birleştirilir
+        log.info("Results are being formatted (compact)...")
+
+        matches = self.matches
+        if not isinstance(matches, pd.Series):
+            # Sınıflandırıcılar eşleşen çiftlerin index'ini döndürebilir
+            matches = self.features.loc[matches].sum(axis=1)
+
+        features = self.features.loc[matches.index] if self.features is not None else pd.DataFrame(index=matches.index)
+        n_features = len(features.columns) or 1
+
+        def ids(df, labels):
+            return df['id'].loc[labels].to_numpy() if 'id' in df.columns else labels.to_numpy()
+
+        total_scores = matches.to_numpy(dtype=np.float64)
+        results_df = pd.DataFrame({
+            'source_id': ids(df_source, matches.index.get_level_values(0)),
+            'target_id': ids(df_target, matches.index.get_level_values(1)),
+            'total_score': total_scores,
+            'max_possible_score': n_features,
+            'score_ratio': total_scores / n_features,
+        })
+        for label in features.columns:
+            results_df[f'feature_{label}'] = features[label].to_numpy(dtype=np.float64)
+
+        results_df['match_quality'] = pd.cut(results_df['score_ratio'], [-np.inf, 0.5, 0.7, 0.8, 0.9, np.inf], right=False,
+                                             labels=['VERY_POOR', 'POOR', 'FAIR', 'GOOD', 'EXCELLENT']).astype(str)
+
+        # _assess_confidence ile aynı kurallar: 'exact' kolonlarında tam eşleşme sayısı, sonra ortalama skor
+        if len(features.columns):
+            exact_columns = [label for label in features.columns if 'exact' in label]
+            exact_matches = (features[exact_columns].to_numpy() == 1.0).sum(axis=1) if exact_columns else np.zeros(len(features))
+            mean_scores = features.to_numpy(dtype=np.float64).mean(axis=1)
+            results_df['confidence'] = np.select([exact_matches >= 2, exact_matches == 1, mean_scores >= 0.8], ['HIGH', 'MEDIUM', 'MEDIUM'], 'LOW')
+        else:
+            results_df['confidence'] = 'UNKNOWN'
+
+        results_df = results_df.sort_values('total_score', ascending=False, kind='stable')
+
+        log.info(f"{len(results_df)} result formatted")
         return results_df
 
     def _assess_match_quality(self, score_ratio: float):
@@ -313,230 +478,377 @@ class RecordLinker:
         else:
             return 'LOW'
 
-    def run_full_linkage(self, df_source, df_target):
-        print("RECORD LINKAGE STARTING")
-        print("=" * 60)
+    def run_full_linkage(self, df_source, df_target, checkpoint=None, pair_name: Optional[str] = None, plan: Optional[ComparisonPlan] = None,
+                         store_key: Optional[str] = None):
+        log.info("RECORD LINKAGE STARTING")
+        log.info("=" * 60)
 
         total_start = time.time()
+        use_store = self.feature_store is not None and store_key is not None
 
         try:
-            print("\nStep 1: Indexing")
-            self.setup_indexing()
-            self.generate_candidate_pairs(df_source, df_target)
+            log.info("\nStep 1: Indexing")
+            if use_store:
+                self.load_or_generate_candidates(df_source, df_target, store_key, pair_name or '')
+            else:
+                self.setup_indexing()
+                self.generate_candidate_pairs(df_source, df_target)
+
+            log.info("\nStep 2: Comparison")
+            self.plan = plan
+            if plan is None:
+                self.setup_comparison()
+            elif not plan.comparisons:
+                raise ValueError(f"Comparison is empty for {plan.name}")
+            else:
+                log.info(f"Comparison plan {plan.name}: {', '.join(plan.labels)}")
 
-            print("\nStep 2: Comparison")
-            self.setup_comparison()
-            self.compute_features(df_source, df_target)
+            if use_store:
+                self.features = self.compute_features_with_store(df_source, df_target, store_key)
+            else:
+                self.compute_features(df_source, df_target, checkpoint=checkpoint, pair_name=pair_name)
 
-            print("\nStep 3: Classification")
+            log.info("\nStep 3: Classification")
             self.setup_classification()
             self.classify_matches()
 
-            print("\nStep 4: Result Formatting")
+            log.info("\nStep 4: Result Formatting")
             results_df = self.format_results(df_source, df_target)
 
             total_elapsed = time.time() - total_start
 
-            print("\n" + "=" * 60)
-            print("RECORD LINKAGE COMPLETED!")
-            print(f"Total duration: {total_elapsed:.2f} seconds")
-            print(f"Founded matches: {len(results_df)}")
+            log.info("\n" + "=" * 60)
+            log.info("RECORD LINKAGE COMPLETED!")
+            log.info(f"Total duration: {total_elapsed:.2f} seconds")
+            log.info(f"Founded matches: {len(results_df)}")
 
             if not results_df.empty:
                 quality_summary = results_df['match_quality'].value_counts()
-                print(f"Quality Distribution: {quality_summary.to_dict()}")
+                log.info(f"Quality Distribution: {quality_summary.to_dict()}")
 
             return results_df
 
         except Exception as e:
-            print(f"\nRecord linkage ERROR: {e}")
+            log.error(f"\nRecord linkage ERROR: {e}")
             raise
 
-    def get_statistics(self):
-        stats = {'total_candidate_pairs': len(self.candidate_links) if self.candidate_links is not None else 0, 'total_matches': len(self.matches) if self.matches is not None else 0,
-                 'feature_count': len(self.features.columns) if self.features is not None else 0, 'config': self.config}
+    def load_or_generate_candidates(self, df_source, df_target, store_key: str, name: str = ''):
+        stored = self.feature_store.load_candidates(store_key)
 
-        # Blocking efficiency
-        if hasattr(self, '_total_possible_pairs'):
-            stats['blocking_efficiency'] = (1 - stats['total_candidate_pairs'] / self._total_possible_pairs) * 100
+        if stored is not None:
+            left, right = stored
+            self.candidate_links = pd.MultiIndex.from_arrays([df_source.index[left], df_target.index[right]],
+                                                             names=[df_source.index.name, df_target.index.name])
+            log.info(f"Candidate pairs loaded from feature store: {len(self.candidate_links):,}")
+            return self.candidate_links
 
-        return stats
+        self.setup_indexing()
+        self.generate_candidate_pairs(df_source, df_target)
 
-    def run_deduplication(self, df_data, data_name: str = "data"):
-        print(f"DEDUPLICATION STARTING for {data_name}")
-        print("=" * 60)
+        left = df_source.index.get_indexer(self.candidate_links.get_level_values(0))
+        right = df_target.index.get_indexer(self.candidate_links.get_level_values(1))
+        self.feature_store.save_candidates(store_key, left, right, name)
+        return self.candidate_links
 
-        total_start = time.time()
+    def load_or_compute_columns(self, store_key: str, rules, compute) -> Dict[str, np.ndarray]:
+        # Depodaki kolonlar okunur, sadece eksik (yeni/değişen) kurallar compute(missing) ile hesaplanıp yazılır
+        start_time = time.time()
+        columns = {}
+        missing = []
+        for rule in rules:
+            values = self.feature_store.load_feature(store_key, rule)
+            if values is None:
+                missing.append(rule)
+            else:
+                columns[rule.label] = values
 
-        try:
-            print("\nStep 1: Indexing for Deduplication")
-            self.setup_indexing()
-            self.generate_candidate_pairs_dedup(df_data)
+        if missing:
+            computed = compute(missing)
+            for rule in missing:
+                self.feature_store.save_feature(store_key, rule, computed[rule.label])
+                columns[rule.label] = computed[rule.label]
 
-            print("\nStep 2: Comparison")
-            self.setup_comparison()
-            self.compute_features_dedup(df_data)
+        log.info(f"Feature store: {len(rules) - len(missing)} columns reused, {len(missing)} computed ({time.time() - start_time:.2f}s)")
+        return {rule.label: np.asarray(columns[rule.label]) for rule in rules}
 
-            print("\nStep 3: Classification")
-            self.setup_classification()
-            self.classify_matches()
+    def compute_features_with_store(self, df_source, df_target, store_key: str) -> pd.DataFrame:
+        if self.plan is not None:
+            rules = self.plan.comparisons
+        else:
+            rules = [comp for comp in self.linkage_plan.comparisons if build_compare_feature(comp) is not None]
+
+        def compute(missing):
+            if self.plan is not None:
+                subset = ComparisonPlan(name=self.plan.name, left=self.plan.left, right=self.plan.right, comparisons=missing)
+                computed = subset.compute(self.candidate_links, df_source, df_target, self.column_cache)
+                return {label: computed[label].to_numpy() for label in computed.columns}
+
+            left = df_source.index.get_indexer(self.candidate_links.get_level_values(0))
+            right = df_target.index.get_indexer(self.candidate_links.get_level_values(1))
+            return compute_features_on_positions([build_compare_feature(rule) for rule in missing], df_source, df_target, left, right)
+
+        features = pd.DataFrame(self.load_or_compute_columns(store_key, rules, compute), index=self.candidate_links)
+        log.info(f"Feature matrix size: {features.shape}")
+        return features
+
+    def compute_candidate_features(self, df_source, df_target=None, plan: Optional[ComparisonPlan] = None,
+                                   store_key: Optional[str] = None, pair_name: str = ''):
+        """Candidate pairs and feature columns without classification.
+
+        Returns ``(left_positions, right_positions, {label: values})``; with
+        ``df_target=None`` the pairs come from the deduplication engine.
+        With a ``store_key`` candidates and columns are read from (and
+        written to) the feature store, so only missing rules are computed.
+        """
+        use_store = self.feature_store is not None and store_key is not None
+
+        if df_target is None:
+            stored = self.feature_store.load_candidates(store_key) if use_store else None
+            if stored is not None:
+                left, right = stored
+                log.info(f"Candidate pairs loaded from feature store: {len(left):,}")
+            else:
+                left, right = self.candidate_positions(df_source)
+                if use_store:
+                    self.feature_store.save_candidates(store_key, left, right, pair_name)
 
-            print("\nStep 4: Result Formatting")
-            results_df = self.format_results_dedup(df_data, data_name)
+            def compute(rules):
+                return compute_features_on_positions([build_compare_feature(rule) for rule in rules], df_source, df_source, left, right)
 
-            total_elapsed = time.time() - total_start
+            rules = [comp for comp in self.linkage_plan.comparisons if build_compare_feature(comp) is not None]
+            return left, right, self.load_or_compute_columns(store_key, rules, compute) if use_store else compute(rules)
 
-            print("\n" + "=" * 60)
-            print("DEDUPLICATION COMPLETED!")
-            print(f"Total duration: {total_elapsed:.2f} seconds")
-            print(f"Founded duplicates: {len(results_df)}")
+        self.plan = plan
+        if use_store:
+            self.load_or_generate_candidates(df_source, df_target, store_key, pair_name)
+            features = self.compute_features_with_store(df_source, df_target, store_key)
+        else:
+            self.setup_indexing()
+            self.generate_candidate_pairs(df_source, df_target)
+            if plan is None:
+                self.setup_comparison()
+            features = self.compute_features(df_source, df_target)
 
-            if not results_df.empty:
-                quality_summary = results_df['match_quality'].value_counts()
-                print(f"Quality Distribution: {quality_summary.to_dict()}")
+        left = df_source.index.get_indexer(features.index.get_level_values(0))
+        right = df_target.index.get_indexer(features.index.get_level_values(1))
+        return left, right, {label: features[label].to_numpy() for label in features.columns}
 
-            return results_df
+    def candidate_positions(self, df_source, df_target=None):
+        """Candidate pairs only, as positional ``(left, right)`` arrays.
 
-        except Exception as e:
-            print(f"\nDeduplication ERROR: {e}")
-            raise
+        With ``df_target=None`` the pairs come from the deduplication
+        engine (``left < right``). Used when candidates are needed without
+        comparing them (threshold sweep, pair completeness).
+        """
+        method = self.linkage_plan.indexing.method
 
-    def generate_candidate_pairs_dedup(self, df_data):
-        print("Generating candidate pairs for deduplication...")
+        if df_target is None:
+            indexer = self.setup_indexing() if method not in ('block', 'full') else None
+            return DeduplicationEngine(linkage_plan=self.linkage_plan).generate_pairs(df_source, indexer)
 
-        if not self.indexer:
-            raise ValueError("Indexer not set up")
+        self.setup_indexing()
+        candidate_links = self.generate_candidate_pairs(df_source, df_target)
+        self.candidate_links = None
 
-        start_time = time.time()
+        left = df_source.index.get_indexer(candidate_links.get_level_values(0))
+        right = df_target.index.get_indexer(candidate_links.get_level_values(1))
+        return left, right
 
-        self.candidate_links = self.indexer.index(df_data)
+    def get_statistics(self):
+        stats = {'total_candidate_pairs': len(self.candidate_links) if self.candidate_links is not None else 0, 'total_matches': len(self.matches) if self.matches is not None else 0,
+                 'feature_count': len(self.features.columns) if self.features is not None else 0, 'plan': self.linkage_plan.digest}
 
-        elapsed = time.time() - start_time
-        total_possible = len(df_data) * (len(df_data) - 1) // 2  # n*(n-1)/2
+        # Blocking efficiency
+        if hasattr(self, '_total_possible_pairs'):
+            stats['blocking_efficiency'] = (1 - stats['total_candidate_pairs'] / self._total_possible_pairs) * 100
 
-        print(f"Candidate pairs generated: {len(self.candidate_links)}")
-        print(f"Total possible pairs: {total_possible}")
-        print(f"Blocking reduction: %{((total_possible - len(self.candidate_links)) / total_possible * 100):.1f}")
-        print(f"Generation time: {elapsed:.2f} seconds")
+        return stats
 
-        self._total_possible_pairs = total_possible
-        return self.candidate_links
+    def run_deduplication(self, df_data, data_name: str = "data"):
+        log.info(f"DEDUPLICATION STARTING for {data_name}")
+        log.info("=" * 60)
 
-    def compute_features_dedup(self, df_data):
-        print("Computing features for deduplication...")
+        total_start = time.time()
 
-        if not self.compare_cl:
-            raise ValueError("Comparison not set up")
+        try:
+            log.info("\nStep 1: Indexing for Deduplication")
+            method = self.linkage_plan.indexing.method
+            indexer = self.setup_indexing() if method not in ('block', 'full') else None
 
-        if self.candidate_links is None or len(self.candidate_links) == 0:
-            print("No candidate pairs to compare")
-            self.features = pd.DataFrame()
-            return self.features
+            log.info("\nStep 2: Comparison, Classification and Grouping")
+            engine = DeduplicationEngine(memory_budget=self.memory_budget, linkage_plan=self.linkage_plan)
+            results_df = engine.run(df_data, data_name, indexer=indexer)
 
-        start_time = time.time()
+            self.dedup_stats = engine.stats
+            self._total_possible_pairs = engine.stats['total_possible_pairs']
 
-        self.features = self.compare_cl.compute(self.candidate_links, df_data)
+            total_elapsed = time.time() - total_start
 
-        elapsed = time.time() - start_time
+            log.info("\n" + "=" * 60)
+            log.info("DEDUPLICATION COMPLETED!")
+            log.info(f"Total duration: {total_elapsed:.2f} seconds")
+            log.info(f"Duplicate groups: {engine.stats['duplicate_groups']} ({engine.stats['records_in_groups']} records)")
 
-        print(f"Features computed: {len(self.features)} pairs, {len(self.features.columns)} features")
-        print(f"Computation time: {elapsed:.2f} seconds")
+            if not results_df.empty:
+                quality_summary = results_df['match_quality'].value_counts()
+                log.info(f"Quality Distribution: {quality_summary.to_dict()}")
 
-        return self.features
+            return results_df
 
-    def format_results_dedup(self, df_data, data_name: str):
-        print("Formatting deduplication results...")
+        except Exception as e:
+            log.error(f"\nDeduplication ERROR: {e}")
+            raise
 
-        if self.matches is None or len(self.matches) == 0:
-            print("No matches found")
-            return pd.DataFrame()
+    def release_database(self, db_name: str, df: Optional[pd.DataFrame] = None):
+        # Database'in son çifti bittiğinde önbelleklerdeki kolonları ve sıralı anahtarları bırakılır
+        self.column_cache.release(db_name)
+        if df is not None and self._sorted_neighbourhood_indexer is not None:
+            self._sorted_neighbourhood_indexer.release(df)
 
-        results = []
+    def build_comparison_plans(self, data_dict: Dict[str, pd.DataFrame], db_names: List[str], exclude_fields: Optional[Dict[str, List[str]]] = None) -> Dict[str, ComparisonPlan]:
+        # Sadece verisi yüklenmiş çiftler için (resume'da tamamlananlar yüklenmez)
+        self.comparison_plans = {}
+        for db1, db2 in combinations(db_names, 2):
+            if db1 in data_dict and db2 in data_dict:
+                plan = build_comparison_plan(self.linkage_plan, db1, db2, data_dict[db1], data_dict[db2], exclude_fields)
+                self.comparison_plans[plan.name] = plan
 
-        for (idx1, idx2) in self.matches.index:
-            record1 = df_data.loc[idx1]
-            record2 = df_data.loc[idx2]
+        if self.comparison_plans:
+            print_plan_summary(list(self.comparison_plans.values()))
 
-            feature_row = self.features.loc[(idx1, idx2)]
-            total_score = feature_row.sum()
+        return self.comparison_plans
 
-            max_score = len(feature_row)
-            confidence_score = total_score / max_score if max_score > 0 else 0
+    def link_pair(self, df1: pd.DataFrame, df2: pd.DataFrame, db1: str, db2: str, checkpoint=None,
+                  fingerprints: Optional[Dict[str, str]] = None):
+        """Link one database pair and return ``(results_df, stats)``.
 
-            if confidence_score >= 0.9:
-                confidence = 'HIGH'
-            elif confidence_score >= 0.7:
-                confidence = 'MEDIUM'
-            else:
-                confidence = 'LOW'
+        A failing pair yields an empty result and an ``error`` entry in the
+        stats instead of stopping the remaining comparisons.
+        """
+        comparison_name = f"{db1}_{db2}"
+        log.info(f"\n🔗 Comparing: {db1} ↔ {db2}")
+        pair_start = time.time()
+        self.candidate_links = None
+        error = None
 
-            result = {
-                f'{data_name}_id_1': idx1,
-                f'{data_name}_id_2': idx2,
-                'total_score': total_score,
-                'confidence': confidence
-            }
+        try:
+            if checkpoint is not None:
+                checkpoint.set_stage(comparison_name, 'linkage', 'running')
 
-            # İlk kayıt bilgileri (source olarak)
-            for col in df_data.columns:
-                result[f'{data_name}_1_{col}'] = record1[col]
+            store_key = None
+            if self.feature_store is not None and fingerprints:
+                store_key = FeatureStore.pair_key([fingerprints[db1], fingerprints[db2]], self.linkage_plan.indexing)
 
-            # İkinci kayıt bilgileri (target olarak)
-            for col in df_data.columns:
-                result[f'{data_name}_2_{col}'] = record2[col]
+            results = self.run_full_linkage(df1, df2, checkpoint=checkpoint, pair_name=comparison_name,
+                                            plan=self.comparison_plans.get(comparison_name), store_key=store_key)
+            # Sonuç sütun isimlerini güncelle
+            results = self._update_result_column_names(results, db1, db2)
 
-            # Feature skorları
-            for feature_name, score in feature_row.items():
-                result[f'feature_{feature_name}'] = score
+            if checkpoint is not None:
+                checkpoint.save_pair_results(comparison_name, results)
+            log.info(f"{comparison_name}: {len(results)} matches found", event='pair.done', pair=comparison_name, matches=len(results))
+        except Exception as e:
+            log.error(f"{comparison_name}: {e}", event='pair.error', pair=comparison_name)
+            results = pd.DataFrame()
+            error = str(e)
 
-            results.append(result)
+            if checkpoint is not None:
+                checkpoint.set_stage(comparison_name, 'linkage', 'failed', {'error': error})
 
-        results_df = pd.DataFrame(results)
+        stats = {'left_records': len(df1), 'right_records': len(df2),
+                 'candidate_pairs': len(self.candidate_links) if self.candidate_links is not None else None,
+                 'total_possible_pairs': len(df1) * len(df2),
+                 'matches': len(results), 'elapsed': time.time() - pair_start}
+        if error is not None:
+            stats['error'] = error
 
-        if not results_df.empty:
-            # Skorlara göre sırala
-            results_df = results_df.sort_values(['total_score', 'match_quality'], ascending=[False, False])
+        return results, stats
 
-        print(f"Results formatted: {len(results_df)} matches")
-        return results_df
+    def _emit_pair_result(self, all_results: dict, comparison_name: str, results: pd.DataFrame, stats: Optional[dict], on_result=None):
+        if stats is not None:
+            self.pair_stats[comparison_name] = stats
 
-    def run_multi_database_linkage(self, data_dict: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
-        print(f"MULTI-DATABASE LINKAGE STARTING ({len(data_dict)} databases)")
-        print("=" * 60)
+        if on_result is None:
+            all_results[comparison_name] = results
+        else:
+            # Sonuç hemen kaydedilir ve bellekten bırakılır, sadece eşleşme sayısı tutulur
+            on_result(comparison_name, results, stats)
+            all_results[comparison_name] = len(results)
+
+    def run_multi_database_linkage(self, data_dict: Dict[str, pd.DataFrame], checkpoint=None, db_names: Optional[List[str]] = None,
+                                   exclude_fields: Optional[Dict[str, List[str]]] = None, on_result=None,
+                                   fingerprints: Optional[Dict[str, str]] = None) -> Dict[str, pd.DataFrame]:
+        """Run deduplication or all pairwise linkages.
+
+        Returns ``{comparison_name: results_df}``. When ``on_result`` is
+        given it is called as ``on_result(name, results_df, stats)`` right
+        after each comparison and the returned dict holds match counts only.
+        ``fingerprints`` (``{db_name: input fingerprint}``) keys the pairs in
+        the feature store when it is enabled.
+        """
+        # db_names: config sırası (resume'da sadece eksik çiftlerin verisi yüklenmiş olabilir)
+        db_names = db_names or list(data_dict.keys())
+
+        log.info(f"MULTI-DATABASE LINKAGE STARTING ({len(db_names)} databases)")
+        log.info("=" * 60)
 
-        db_names = list(data_dict.keys())
         all_results = {}
+        self.pair_stats = {}
 
         # 1. Tek database deduplikasyonu
         if len(db_names) == 1:
             db_name = db_names[0]
-            print(f"\nRunning deduplication for single database: {db_name}")
+            comparison_name = f"{db_name}_dedup"
+
+            if checkpoint is not None and checkpoint.is_pair_complete(comparison_name):
+                log.info(f"\nSkipping {comparison_name}: restored from checkpoint")
+                self._emit_pair_result(all_results, comparison_name, checkpoint.load_pair_results(comparison_name), None, on_result)
+                return all_results
+
+            log.info(f"\nRunning deduplication for single database: {db_name}")
             results = self.run_deduplication(data_dict[db_name], db_name)
-            all_results[f"{db_name}_dedup"] = results
+            stats = {'left_records': self.dedup_stats['total_records'], 'right_records': self.dedup_stats['total_records'],
+                     'candidate_pairs': self.dedup_stats['candidate_pairs'], 'total_possible_pairs': self.dedup_stats['total_possible_pairs'],
+                     'matches': len(results), 'elapsed': self.dedup_stats['elapsed']}
+
+            if checkpoint is not None:
+                checkpoint.save_pair_results(comparison_name, results)
+            self._emit_pair_result(all_results, comparison_name, results, stats, on_result)
             return all_results
 
         # 2. İkili karşılaştırmalar
-        print(f"\nRunning pairwise comparisons...")
+        self.build_comparison_plans(data_dict, db_names, exclude_fields)
+
+        log.info(f"\nRunning pairwise comparisons...")
         for db1, db2 in combinations(db_names, 2):
             comparison_name = f"{db1}_{db2}"
-            print(f"\n🔗 Comparing: {db1} ↔ {db2}")
-            
-            try:
-                results = self.run_full_linkage(data_dict[db1], data_dict[db2])
-                # Sonuç sütun isimlerini güncelle
-                results = self._update_result_column_names(results, db1, db2)
-                all_results[comparison_name] = results
-                print(f"{comparison_name}: {len(results)} matches found")
-            except Exception as e:
-                print(f"{comparison_name}: {e}")
-                all_results[comparison_name] = pd.DataFrame()
+
+            if checkpoint is not None and checkpoint.is_pair_complete(comparison_name):
+                restored = checkpoint.load_pair_results(comparison_name)
+                log.info(f"\nSkipping {comparison_name}: {len(restored)} matches restored from checkpoint")
+                self._emit_pair_result(all_results, comparison_name, restored, None, on_result)
+                continue
+
+            results, stats = self.link_pair(data_dict[db1], data_dict[db2], db1, db2, checkpoint=checkpoint, fingerprints=fingerprints)
+            self._emit_pair_result(all_results, comparison_name, results, stats, on_result)
 
         # 3. Üçlü ve daha fazla karşılaştırmalar
         if len(db_names) >= 3:
-            print(f"\nMulti-way comparisons (3+ databases) will be added in future versions...")
+            log.info(f"\nMulti-way comparisons (3+ databases) will be added in future versions...")
             #  Üçlü karşılaştırma mantığı eklenebilir
 
-        print(f"\nTotal comparisons completed: {len(all_results)}")
+        log.info(f"\nTotal comparisons completed: {len(all_results)}")
+        log.info(f"Prepared columns reused: {self.column_cache.hits} hits, {self.column_cache.misses} computed")
+        if self.feature_store is not None:
+            log.info(f"Feature store: {self.feature_store.hits} columns loaded, {self.feature_store.misses} computed")
+        self.column_cache.clear()
+        if self._sorted_neighbourhood_indexer is not None:
+            self._sorted_neighbourhood_indexer.clear_cache()
+
+        if on_result is not None:
+            # Son çiftin ara sonuçları da bırakılır
+            self.candidate_links = self.features = self.matches = None
+
         return all_results
 
     def _update_result_column_names(self, results_df: pd.DataFrame, db1_name: str, db2_name: str) -> pd.DataFrame:
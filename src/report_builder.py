@@ -0,0 +1,137 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PAIR_STATS_TABLE = '_pair_stats'
+EVALUATION_TABLE = '_evaluation'
+HISTOGRAM_BINS = 10
+
+
+class ReportBuilder:
+    """Computes report statistics with SQL directly on the results database.
+
+    Result tables are never loaded into memory: each table is aggregated by
+    its own read-only connection, tables are processed in parallel, and the
+    per-pair timing/blocking numbers come from the ``_pair_stats`` table
+    written while the pairs were saved. Databases from older runs without
+    ``_pair_stats`` still get distributions and histograms.
+    """
+
+    def __init__(self, results_db_path: str, max_workers: Optional[int] = None):
+        self.results_db_path = results_db_path
+        self.max_workers = max_workers
+
+    def _connect(self) -> sqlite3.Connection:
+        # Salt okunur bağlantı: rapor aşaması sonuç tablolarını değiştirmez
+        uri = f"file:{os.path.abspath(self.results_db_path)}?mode=ro"
+        return sqlite3.connect(uri, uri=True)
+
+    @staticmethod
+    def _table_columns(connection: sqlite3.Connection, table_name: str):
+        return [row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")]
+
+    def table_stats(self, table_name: str) -> Optional[dict]:
+        connection = self._connect()
+        try:
+            columns = self._table_columns(connection, table_name)
+            if not columns:
+                return None
+
+            stats = {'matches': connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]}
+
+            for column, key in (('match_quality', 'quality'), ('confidence', 'confidence')):
+                if column in columns:
+                    rows = connection.execute(f"SELECT {column}, COUNT(*) FROM {table_name} GROUP BY {column} ORDER BY COUNT(*) DESC")
+                    stats[key] = {value: count for value, count in rows}
+
+            if 'score_ratio' in columns:
+                # score_ratio 0.1 genişliğinde kovalara ayrılır (1.0 son kovaya dahil)
+                histogram = [0] * HISTOGRAM_BINS
+                rows = connection.execute(f"""
+                    SELECT MIN(MAX(CAST(score_ratio * {HISTOGRAM_BINS} AS INTEGER), 0), {HISTOGRAM_BINS - 1}) AS bucket, COUNT(*)
+                    FROM {table_name} WHERE score_ratio IS NOT NULL GROUP BY bucket""")
+                for bucket, count in rows:
+                    histogram[bucket] = count
+                stats['histogram'] = histogram
+
+            if 'total_score' in columns:
+                stats['score_min'], stats['score_avg'], stats['score_max'] = connection.execute(
+                    f"SELECT MIN(total_score), AVG(total_score), MAX(total_score) FROM {table_name}").fetchone()
+
+            return stats
+
+        finally:
+            connection.close()
+
+    @staticmethod
+    def frame_stats(results_df: 'pd.DataFrame') -> dict:
+        # Sonuçlar database'e yazılmadığında aynı istatistikler bellekten üretilir
+        import numpy as np
+
+        stats = {'matches': len(results_df)}
+        if 'match_quality' in results_df.columns:
+            stats['quality'] = results_df['match_quality'].value_counts().to_dict()
+        if 'confidence' in results_df.columns:
+            stats['confidence'] = results_df['confidence'].value_counts().to_dict()
+        if 'score_ratio' in results_df.columns:
+            ratios = results_df['score_ratio'].dropna().to_numpy(dtype=float)
+            buckets = np.clip((ratios * HISTOGRAM_BINS).astype(int), 0, HISTOGRAM_BINS - 1)
+            stats['histogram'] = np.bincount(buckets, minlength=HISTOGRAM_BINS).tolist()
+        if 'total_score' in results_df.columns and len(results_df):
+            stats['score_min'], stats['score_avg'], stats['score_max'] = results_df['total_score'].min(), results_df['total_score'].mean(), results_df['total_score'].max()
+
+        return stats
+
+    def load_pair_stats(self) -> Dict[str, dict]:
+        if not os.path.exists(self.results_db_path):
+            return {}
+
+        connection = self._connect()
+        try:
+            if not self._table_columns(connection, PAIR_STATS_TABLE):
+                return {}
+
+            cursor = connection.execute(f"SELECT * FROM {PAIR_STATS_TABLE}")
+            names = [description[0] for description in cursor.description]
+            return {row[0]: dict(zip(names, row)) for row in cursor}
+
+        finally:
+            connection.close()
+
+    def load_evaluation(self) -> Dict[str, dict]:
+        # Kayıtlı ground truth metrikleri; hesaplanmamış olanlar (ör. pair completeness) anahtar olarak yer almaz
+        if not os.path.exists(self.results_db_path):
+            return {}
+
+        connection = self._connect()
+        try:
+            if not self._table_columns(connection, EVALUATION_TABLE):
+                return {}
+
+            cursor = connection.execute(f"SELECT * FROM {EVALUATION_TABLE}")
+            names = [description[0] for description in cursor.description]
+            return {row[0]: {name: value for name, value in zip(names[1:], row[1:]) if value is not None and name != 'saved_at'}
+                    for row in cursor}
+
+        finally:
+            connection.close()
+
+    def collect(self, tables: Dict[str, str]) -> Dict[str, Optional[dict]]:
+        """Aggregate every ``{comparison_name: table_name}`` in parallel."""
+        if not tables or not os.path.exists(self.results_db_path):
+            return {name: None for name in tables}
+
+        max_workers = self.max_workers or min(4, len(tables))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {name: executor.submit(self.table_stats, table_name) for name, table_name in tables.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    @staticmethod
+    def format_histogram(histogram) -> str:
+        width = 1 / HISTOGRAM_BINS
+        parts = [f"{i * width:.1f}-{(i + 1) * width:.1f}: {count}" for i, count in enumerate(histogram) if count]
+        return ', '.join(parts) if parts else '-'
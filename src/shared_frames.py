@@ -0,0 +1,222 @@
+import atexit
+import gc
+import pickle
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from event_log import log
+from string_encoding import is_encoded
+
+ALIGNMENT = 64
+NUMERIC_KINDS = 'biufcmM'
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def encode_strings(values: np.ndarray) -> Tuple[np.ndarray, bytes, np.ndarray, str]:
+    """Dictionary encoding of an object column.
+
+    Returns ``(codes, blob, offsets, encoding)``: ``int32`` codes (``-1`` =
+    missing), the unique values as one UTF-8 buffer with ``int64`` end
+    offsets, or a pickled list when the column holds non-string objects.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    return encode_uniques(codes, list(uniques))
+
+
+def encode_uniques(codes: np.ndarray, uniques: List) -> Tuple[np.ndarray, bytes, np.ndarray, str]:
+    if all(isinstance(value, str) for value in uniques):
+        encoded = [value.encode('utf-8') for value in uniques]
+        offsets = np.cumsum([len(value) for value in encoded], dtype=np.int64) if encoded else np.zeros(0, dtype=np.int64)
+        return codes.astype(np.int32), b''.join(encoded), offsets, 'utf-8'
+
+    return codes.astype(np.int32), pickle.dumps(uniques), np.zeros(0, dtype=np.int64), 'pickle'
+
+
+def decode_strings(blob: memoryview, offsets: np.ndarray, encoding: str) -> List:
+    if encoding == 'pickle':
+        return pickle.loads(bytes(blob))
+
+    values = []
+    start = 0
+    data = bytes(blob)
+    for end in offsets:
+        values.append(data[start:end].decode('utf-8'))
+        start = end
+    return values
+
+
+class SharedFrameStore:
+    """Loaded tables in ``multiprocessing.shared_memory`` for worker processes.
+
+    Each shared table is one shared memory block. Numeric, bool and datetime
+    columns are stored as their NumPy arrays; object (string) columns are
+    dictionary encoded into ``int32`` codes plus one UTF-8 buffer of the
+    unique values; already encoded (``category``) columns keep their codes
+    and are rebuilt as categoricals. ``share`` returns a small picklable
+    handle that is sent to workers instead of the DataFrame. Blocks are
+    unlinked by ``close`` (also registered with ``atexit``); the creating
+    process' resource tracker removes them if it is killed.
+    """
+
+    def __init__(self):
+        self._blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.stats: Dict[str, dict] = {}
+        atexit.register(self.close)
+
+    def share(self, name: str, df: pd.DataFrame) -> dict:
+        arrays = {}
+        columns = []
+
+        for column in df.columns:
+            if is_encoded(df[column]):
+                # Sözlük kodlu kolonun kodları ve değer tablosu olduğu gibi paylaşılır
+                categorical = df[column].array
+                codes, blob, offsets, encoding = encode_uniques(categorical.codes, list(categorical.categories))
+                arrays[f"{column}.codes"] = codes
+                arrays[f"{column}.offsets"] = offsets
+                arrays[f"{column}.dictionary"] = np.frombuffer(blob, dtype=np.uint8)
+                columns.append({'name': column, 'kind': 'dictionary', 'encoding': encoding, 'unique': len(categorical.categories), 'categorical': True})
+                continue
+
+            values = df[column].to_numpy()
+            if values.dtype.kind in NUMERIC_KINDS:
+                arrays[f"{column}.values"] = np.ascontiguousarray(values)
+                columns.append({'name': column, 'kind': 'array'})
+            else:
+                codes, blob, offsets, encoding = encode_strings(values.astype(object))
+                arrays[f"{column}.codes"] = codes
+                arrays[f"{column}.offsets"] = offsets
+                arrays[f"{column}.dictionary"] = np.frombuffer(blob, dtype=np.uint8)
+                columns.append({'name': column, 'kind': 'dictionary', 'encoding': encoding, 'unique': int(codes.max(initial=-1)) + 1})
+
+        if isinstance(df.index, pd.RangeIndex):
+            index = {'kind': 'range', 'start': df.index.start, 'stop': df.index.stop, 'step': df.index.step}
+        else:
+            arrays['__index__'] = np.ascontiguousarray(df.index.to_numpy())
+            index = {'kind': 'array', 'name': df.index.name}
+
+        # Tüm diziler hizalı ofsetlerle tek bloğa yazılır
+        layout = {}
+        offset = 0
+        for key, array in arrays.items():
+            offset = _aligned(offset)
+            layout[key] = (offset, array.dtype.str, array.shape)
+            offset += array.nbytes
+
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for key, array in arrays.items():
+            start, _, _ = layout[key]
+            np.frombuffer(block.buf, dtype=array.dtype, count=array.size, offset=start)[:] = array.ravel()
+
+        self._blocks[name] = block
+        self.stats[name] = {'rows': len(df), 'shared_bytes': offset, 'frame_bytes': int(df.memory_usage(deep=True).sum())}
+        return {'shared': block.name, 'table': name, 'rows': len(df), 'columns': columns, 'layout': layout, 'index': index}
+
+    def close(self):
+        for block in self._blocks.values():
+            try:
+                block.close()
+                block.unlink()
+            except (FileNotFoundError, BufferError):
+                pass
+        self._blocks = {}
+
+    def print_summary(self):
+        shared = sum(s['shared_bytes'] for s in self.stats.values())
+        frames = sum(s['frame_bytes'] for s in self.stats.values())
+        log.info(f"Shared memory: {len(self.stats)} tables, {shared / 1024 / 1024:,.1f} MB shared "
+                 f"(DataFrames {frames / 1024 / 1024:,.1f} MB)", event='shared.summary', tables=len(self.stats),
+                 shared_bytes=shared, frame_bytes=frames)
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    # Python 3.11 açılan bloğu worker'ın resource tracker'ına da kaydeder ve
+    # worker çıkarken siler; blok sahibi coordinator olduğu için kayıt atlanır
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def attach_shared_frame(handle: dict) -> Tuple[pd.DataFrame, shared_memory.SharedMemory]:
+    """DataFrame over a shared block (numeric columns are read-only views).
+
+    String columns are rebuilt by indexing the decoded unique values with
+    the shared codes: every unique string exists once per worker and rows
+    only hold references to it. Keep the returned block open while the
+    DataFrame is in use.
+    """
+    block = _attach_block(handle['shared'])
+
+    def array(key: str) -> np.ndarray:
+        start, dtype, shape = handle['layout'][key]
+        values = np.frombuffer(block.buf, dtype=np.dtype(dtype), count=int(np.prod(shape)), offset=start).reshape(shape)
+        values.flags.writeable = False
+        return values
+
+    data = {}
+    for column in handle['columns']:
+        name = column['name']
+        if column['kind'] == 'array':
+            data[name] = array(f"{name}.values")
+        else:
+            uniques = decode_strings(array(f"{name}.dictionary").data, array(f"{name}.offsets"), column['encoding'])
+            if column.get('categorical'):
+                data[name] = pd.Categorical.from_codes(array(f"{name}.codes"), categories=uniques)
+                continue
+            # Son eleman eksik değer (-1 kodu)
+            dictionary = np.empty(len(uniques) + 1, dtype=object)
+            dictionary[:len(uniques)] = uniques
+            dictionary[-1] = None
+            data[name] = dictionary[array(f"{name}.codes")]
+
+    index_info = handle['index']
+    if index_info['kind'] == 'range':
+        index = pd.RangeIndex(index_info['start'], index_info['stop'], index_info['step'])
+    else:
+        index = pd.Index(array('__index__'), name=index_info['name'])
+
+    # copy=False: sayısal kolonlar paylaşılan bellekte kalır
+    df = pd.DataFrame(data, index=index, copy=False)
+    return df, block
+
+
+class SharedFrameCache:
+    # Worker tarafı: aynı tablo her görevde tekrar bağlanmaz
+    def __init__(self):
+        self._frames: Dict[str, Tuple[pd.DataFrame, shared_memory.SharedMemory]] = {}
+
+    def get(self, frame) -> pd.DataFrame:
+        if not isinstance(frame, dict):
+            return frame
+        if frame['shared'] not in self._frames:
+            self._frames[frame['shared']] = attach_shared_frame(frame)
+        return self._frames[frame['shared']][0]
+
+    def close(self):
+        # Blok ancak üzerindeki DataFrame görünümleri bırakıldıktan sonra kapanabilir
+        blocks = [block for _, block in self._frames.values()]
+        self._frames = {}
+        gc.collect()
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass
+
+
+def is_loopback(host: str) -> bool:
+    return host in ('127.0.0.1', 'localhost', '::1')
+
+
+def shared_memory_enabled(enabled: bool, host: str) -> bool:
+    # Paylaşılan bellek sadece aynı makinedeki worker'lar için anlamlı
+    return enabled and is_loopback(host)
@@ -0,0 +1,181 @@
+import os
+import time
+import weakref
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from event_log import log
+
+
+class SortedNeighbourhoodIndexer:
+    """Sorted neighbourhood indexing on cached, pre-sorted key arrays.
+
+    Every DataFrame's key column is sorted once with ``numpy.argsort`` and the
+    sorted order is reused for all pairs the DataFrame takes part in. The two
+    sorted sides are merged with a vectorized window join on key ranks, so the
+    candidate pairs are the same as ``recordlinkage.Index.sortedneighbourhood``
+    for a fixed window.
+
+    With ``adaptive=True`` the half window of every key grows while the
+    neighbouring sorted keys stay similar (up to ``max_window``) and shrinks
+    to ``min_window`` in sparse / dissimilar regions.
+    """
+
+    def __init__(self, key: str, window: int = 3, adaptive: bool = False, min_window: Optional[int] = None, max_window: Optional[int] = None, similarity_threshold: float = 0.8):
+        if not isinstance(window, int) or window < 1 or window % 2 == 0:
+            raise ValueError("window must be a positive odd integer")
+
+        self.key = key
+        self.window = window
+        self.adaptive = adaptive
+        self.min_window = min_window if min_window is not None else 1
+        self.max_window = max_window if max_window is not None else window * 3
+        self.similarity_threshold = similarity_threshold
+
+        if self.min_window % 2 == 0 or self.max_window % 2 == 0 or self.min_window > self.max_window:
+            raise ValueError("min_window and max_window must be odd and min_window <= max_window")
+
+        # id(df) -> (weakref(df), sorted key values, record positions in sorted order);
+        # DataFrame silinince kaydı da silinir, önbellek tabloyu bellekte tutmaz
+        self._sorted_cache = {}
+
+        # Son index() çağrısının pencere istatistikleri
+        self.window_stats = {}
+
+    def _get_sorted_key(self, df: pd.DataFrame):
+        cached = self._sorted_cache.get(id(df))
+        if cached is not None and cached[0]() is df and len(cached[2]) <= len(df):
+            return cached[1], cached[2]
+
+        values = df[self.key].to_numpy()
+        positions = np.flatnonzero(pd.notna(values))
+        values = values[positions]
+
+        if values.dtype == object:
+            values = values.astype(str)
+
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        sorted_positions = positions[order]
+
+        if id(df) not in self._sorted_cache:
+            weakref.finalize(df, self._sorted_cache.pop, id(df), None)
+        self._sorted_cache[id(df)] = (weakref.ref(df), sorted_values, sorted_positions)
+        return sorted_values, sorted_positions
+
+    def release(self, df: pd.DataFrame):
+        self._sorted_cache.pop(id(df), None)
+
+    def clear_cache(self):
+        self._sorted_cache.clear()
+
+    def _adjacent_similarity(self, union_values: np.ndarray) -> np.ndarray:
+        if len(union_values) < 2:
+            return np.zeros(0)
+
+        if union_values.dtype.kind in 'iuf':
+            # Sayısal anahtarlar: göreli fark
+            left, right = union_values[:-1].astype(float), union_values[1:].astype(float)
+            scale = np.maximum(np.maximum(np.abs(left), np.abs(right)), 1.0)
+            return 1.0 - np.abs(right - left) / scale
+
+        # Metin anahtarlar: ortak önek oranı (sıralı komşular için ucuz ve anlamlı)
+        return np.fromiter(
+            (len(os.path.commonprefix([a, b])) / max(len(a), len(b), 1) for a, b in zip(union_values[:-1], union_values[1:])),
+            dtype=float, count=len(union_values) - 1)
+
+    def _half_windows(self, union_values: np.ndarray):
+        n_unique = len(union_values)
+        half = self.window // 2
+
+        if not self.adaptive:
+            extent = np.full(n_unique, half, dtype=np.int64)
+            return extent, extent
+
+        similar = self._adjacent_similarity(union_values) >= self.similarity_threshold
+        steps = np.arange(n_unique - 1)
+
+        # Sağa doğru ardışık benzer komşu sayısı
+        next_break = np.where(similar, n_unique - 1, steps)
+        next_break = np.minimum.accumulate(next_break[::-1])[::-1] if len(steps) else next_break
+        right_run = np.zeros(n_unique, dtype=np.int64)
+        right_run[:-1] = next_break - steps
+
+        # Sola doğru ardışık benzer komşu sayısı
+        prev_break = np.where(similar, -1, steps)
+        prev_break = np.maximum.accumulate(prev_break) if len(steps) else prev_break
+        left_run = np.zeros(n_unique, dtype=np.int64)
+        left_run[1:] = steps - prev_break
+
+        min_half, max_half = self.min_window // 2, self.max_window // 2
+        return np.clip(left_run, min_half, max_half), np.clip(right_run, min_half, max_half)
+
+    @staticmethod
+    def _expand_ranges(lo: np.ndarray, hi: np.ndarray):
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        owners = np.repeat(np.arange(len(lo)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return owners, np.repeat(lo, counts) + offsets, counts
+
+    def index(self, df_a: pd.DataFrame, df_b: Optional[pd.DataFrame] = None) -> pd.MultiIndex:
+        start_time = time.time()
+
+        values_a, positions_a = self._get_sorted_key(df_a)
+        dedup = df_b is None or df_b is df_a
+
+        if dedup:
+            values_b, positions_b = values_a, positions_a
+            union_values = np.unique(values_a)
+        else:
+            values_b, positions_b = self._get_sorted_key(df_b)
+            union_values = np.union1d(values_a, values_b)
+
+        # Anahtar değerlerinin birleşik sıradaki rank'ı (her iki taraf zaten sıralı)
+        ranks_a = np.searchsorted(union_values, values_a)
+        ranks_b = ranks_a if dedup else np.searchsorted(union_values, values_b)
+
+        left_half, right_half = self._half_windows(union_values)
+        own_left, own_right = left_half[ranks_a], right_half[ranks_a]
+
+        if dedup:
+            # Sadece sıralı düzende kendisinden sonraki kayıtlar: her çift bir kez
+            lo = np.arange(1, len(ranks_a) + 1)
+            hi = np.searchsorted(ranks_b, ranks_a + own_right, side='right')
+        else:
+            lo = np.searchsorted(ranks_b, ranks_a - own_left, side='left')
+            hi = np.searchsorted(ranks_b, ranks_a + own_right, side='right')
+
+        owners, matches, counts = self._expand_ranges(lo, hi)
+        left_positions = positions_a[owners]
+        right_positions = positions_b[matches]
+
+        if dedup:
+            # recordlinkage sırası: (sonraki kayıt, önceki kayıt)
+            first = np.maximum(left_positions, right_positions)
+            second = np.minimum(left_positions, right_positions)
+            left_positions, right_positions = first, second
+            df_b = df_a
+
+        candidate_links = pd.MultiIndex.from_arrays(
+            [df_a.index[left_positions], df_b.index[right_positions]],
+            names=[df_a.index.name, df_b.index.name])
+
+        window_sizes = own_left + own_right + 1
+        self.window_stats = {
+            'windows': len(counts),
+            'candidates': len(candidate_links),
+            'mean_candidates_per_window': float(counts.mean()) if len(counts) else 0.0,
+            'max_candidates_per_window': int(counts.max()) if len(counts) else 0,
+            'mean_window_size': float(window_sizes.mean()) if len(window_sizes) else 0.0,
+            'elapsed': time.time() - start_time,
+        }
+
+        log.info(f"Sorted neighbourhood windows: {self.window_stats['windows']}, "
+                 f"candidates/window avg {self.window_stats['mean_candidates_per_window']:.2f} "
+                 f"(max {self.window_stats['max_candidates_per_window']}), "
+                 f"window size avg {self.window_stats['mean_window_size']:.1f}")
+
+        return candidate_links
@@ -0,0 +1,110 @@
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from event_log import log
+
+
+def is_encoded(series: pd.Series) -> bool:
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def encode_string_columns(df: pd.DataFrame, max_unique_ratio: float = 0.5, columns: Optional[Iterable[str]] = None,
+                          exclude: Iterable[str] = ()) -> Dict[str, dict]:
+    """Dictionary encode repetitive string columns in place.
+
+    An object column whose share of distinct values is at most
+    ``max_unique_ratio`` becomes a pandas ``category`` column: ``int`` codes
+    per row plus one table of the unique strings. ``columns`` limits the
+    candidates; ``exclude`` (e.g. indexing keys) is never encoded. Returns
+    per-column unique counts and memory before/after.
+    """
+    exclude = set(exclude)
+    report = {}
+
+    for column in (columns if columns is not None else list(df.columns)):
+        if column in exclude or column not in df.columns:
+            continue
+
+        series = df[column]
+        if series.dtype != object or len(series) == 0:
+            continue
+
+        unique = int(series.nunique(dropna=True))
+        if unique > max_unique_ratio * len(series):
+            continue
+
+        before = int(series.memory_usage(deep=True, index=False))
+        df[column] = series.astype('category')
+        after = int(df[column].memory_usage(deep=True, index=False))
+        report[column] = {'unique': unique, 'bytes_before': before, 'bytes_after': after}
+
+    return report
+
+
+def log_encoding_report(table: str, report: Dict[str, dict]):
+    if not report:
+        return
+
+    before = sum(stats['bytes_before'] for stats in report.values())
+    after = sum(stats['bytes_after'] for stats in report.values())
+    log.info(f"String encoding: {len(report)} columns ({', '.join(report)}), "
+             f"{before / 1024 / 1024:,.1f} MB -> {after / 1024 / 1024:,.1f} MB",
+             event='encoding.done', table=table, columns={name: stats['unique'] for name, stats in report.items()},
+             bytes_before=before, bytes_after=after)
+
+
+def _codes(series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    # Kodlanmış kolon kendi kodlarını kullanır, diğerleri o an faktörize edilir (-1 = eksik)
+    if is_encoded(series):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+    return codes, pd.Index(uniques, dtype=object)
+
+
+def shared_codes(s_left: pd.Series, s_right: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Codes of both sides in the left side's code space.
+
+    ``-1`` is a missing value; right values that do not occur on the left
+    get ``-2`` so they never equal a left code.
+    """
+    left_codes, left_uniques = _codes(s_left)
+    right_codes, right_uniques = _codes(s_right)
+
+    if left_uniques.equals(right_uniques):
+        return left_codes, right_codes
+
+    mapping = left_uniques.get_indexer(right_uniques)
+    mapping = np.where(mapping < 0, -2, mapping)
+    return left_codes, np.where(right_codes >= 0, mapping[right_codes], -1)
+
+
+def _with_missing(uniques: pd.Index) -> np.ndarray:
+    # Son eleman eksik değer: -1 kodu doğrudan onu seçer
+    values = np.empty(len(uniques) + 1, dtype=object)
+    values[:len(uniques)] = uniques.to_numpy(dtype=object)
+    values[-1] = None
+    return values
+
+
+def apply_on_unique_pairs(s_left: pd.Series, s_right: pd.Series, func: Callable[[pd.Series, pd.Series], object]) -> np.ndarray:
+    """Evaluate ``func`` once per distinct (left value, right value) pair.
+
+    Rows are reduced to code pairs, ``func`` runs on the unique pairs only
+    and the scores are scattered back to every row. For columns with
+    repeated values (cities, surnames) this removes most string work.
+    """
+    left_codes, left_uniques = _codes(s_left)
+    right_codes, right_uniques = _codes(s_right)
+
+    left_codes = np.where(left_codes < 0, len(left_uniques), left_codes).astype(np.int64)
+    right_codes = np.where(right_codes < 0, len(right_uniques), right_codes).astype(np.int64)
+
+    width = len(right_uniques) + 1
+    pair_keys, inverse = np.unique(left_codes * width + right_codes, return_inverse=True)
+
+    left_values = _with_missing(left_uniques)[pair_keys // width]
+    right_values = _with_missing(right_uniques)[pair_keys % width]
+    scores = func(pd.Series(left_values, dtype=object), pd.Series(right_values, dtype=object))
+    return np.asarray(scores, dtype=np.float64)[inverse]
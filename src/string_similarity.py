@@ -0,0 +1,97 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+BACKENDS = ['auto', 'rapidfuzz', 'python', 'recordlinkage']
+
+# recordlinkage algoritma adları -> toplu hesaplanan algoritmalar
+BATCH_ALGORITHMS = {
+    'jaro': 'jaro',
+    'jarowinkler': 'jarowinkler', 'jaro_winkler': 'jarowinkler', 'jw': 'jarowinkler',
+    'levenshtein': 'levenshtein',
+    'damerau_levenshtein': 'damerau_levenshtein', 'dameraulevenshtein': 'damerau_levenshtein', 'dl': 'damerau_levenshtein',
+}
+DISTANCE_ALGORITHMS = ('levenshtein', 'damerau_levenshtein')
+
+
+def batch_algorithm(method: str) -> Optional[str]:
+    return BATCH_ALGORITHMS.get(method)
+
+
+def rapidfuzz_available() -> bool:
+    # process.cpdist (eleman bazlı toplu skor) rapidfuzz 3.6 ile geldi
+    try:
+        from rapidfuzz import process
+    except ImportError:
+        return False
+    return hasattr(process, 'cpdist')
+
+
+def resolve_backend(backend: str) -> str:
+    if backend == 'auto':
+        return 'rapidfuzz' if rapidfuzz_available() else 'python'
+    if backend == 'rapidfuzz' and not rapidfuzz_available():
+        raise ImportError("String backend 'rapidfuzz' requires rapidfuzz>=3.6 (pip install rapidfuzz)")
+    return backend
+
+
+def _python_scores(algorithm: str, left: list, right: list) -> np.ndarray:
+    # Saf Python yolu: recordlinkage'in kullandığı jellyfish fonksiyonları, pandas apply olmadan
+    import jellyfish
+
+    if algorithm in DISTANCE_ALGORITHMS:
+        distance = jellyfish.levenshtein_distance if algorithm == 'levenshtein' else jellyfish.damerau_levenshtein_distance
+        return np.fromiter((distance(a, b) for a, b in zip(left, right)), dtype=np.float64, count=len(left))
+
+    similarity = jellyfish.jaro_similarity if algorithm == 'jaro' else jellyfish.jaro_winkler_similarity
+    return np.fromiter((similarity(a, b) for a, b in zip(left, right)), dtype=np.float64, count=len(left))
+
+
+def _rapidfuzz_scores(algorithm: str, left: list, right: list) -> np.ndarray:
+    from rapidfuzz import process
+    from rapidfuzz.distance import DamerauLevenshtein, Jaro, JaroWinkler, Levenshtein
+
+    if algorithm in DISTANCE_ALGORITHMS:
+        scorer = Levenshtein.distance if algorithm == 'levenshtein' else DamerauLevenshtein.distance
+        return process.cpdist(left, right, scorer=scorer, dtype=np.int64, workers=1).astype(np.float64)
+
+    scorer = Jaro.similarity if algorithm == 'jaro' else JaroWinkler.similarity
+    scores = process.cpdist(left, right, scorer=scorer, dtype=np.float64, workers=1)
+    # jellyfish iki boş metne 0 verir, rapidfuzz 1
+    scores[[not a and not b for a, b in zip(left, right)]] = 0.0
+    return scores
+
+
+def batch_similarity(algorithm: str, s_left: pd.Series, s_right: pd.Series, backend: str = 'auto') -> np.ndarray:
+    """Similarity of aligned string pairs as one ``float64`` array.
+
+    ``algorithm`` is a key of ``BATCH_ALGORITHMS`` values; missing values
+    give NaN. Scores are identical to ``recordlinkage.compare.String``
+    (jellyfish): distances become ``1 - distance / longer length`` (NaN for
+    two empty strings). ``rapidfuzz`` scores the whole batch in C++;
+    ``python`` loops over jellyfish and is used when rapidfuzz is missing
+    or the values are not all strings.
+    """
+    left = np.asarray(s_left, dtype=object)
+    right = np.asarray(s_right, dtype=object)
+    present = ~(pd.isnull(left) | pd.isnull(right))
+
+    scores = np.full(len(left), np.nan)
+    if not present.any():
+        return scores
+
+    left, right = left[present].tolist(), right[present].tolist()
+    backend = resolve_backend(backend)
+    if backend == 'rapidfuzz' and all(isinstance(a, str) and isinstance(b, str) for a, b in zip(left, right)):
+        values = _rapidfuzz_scores(algorithm, left, right)
+    else:
+        values = _python_scores(algorithm, left, right)
+
+    if algorithm in DISTANCE_ALGORITHMS:
+        longer = np.fromiter((max(len(a), len(b)) for a, b in zip(left, right)), dtype=np.float64, count=len(left))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = 1 - values / longer
+
+    scores[present] = values
+    return scores
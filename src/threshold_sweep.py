@@ -0,0 +1,204 @@
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from evaluation import group_pairs, label_candidates, linkage_metrics, load_ground_truth, precision_recall
+from event_log import log
+
+if TYPE_CHECKING:
+    from linkage_plan import SweepSpec
+
+
+def parse_thresholds(value) -> List[float]:
+    """Threshold grid from a list, ``{start, stop, step}`` or ``"start:stop:step"`` / ``"a,b,c"``."""
+    if value is None:
+        value = {'start': 0.1, 'stop': 1.0, 'step': 0.05}
+
+    if isinstance(value, str):
+        if ':' in value:
+            start, stop, step = (float(part) for part in value.split(':'))
+            value = {'start': start, 'stop': stop, 'step': step}
+        else:
+            value = [float(part) for part in value.split(',') if part.strip()]
+
+    if isinstance(value, dict):
+        # Bitiş değeri dahil (kayan nokta hatasına karşı yarım adım tolerans)
+        grid = np.arange(value['start'], value['stop'] + value['step'] / 2, value['step'])
+        return [round(float(t), 6) for t in grid]
+
+    return [float(t) for t in value]
+
+
+class FeatureSet:
+    """Candidate pairs of one comparison with their feature columns.
+
+    The columns come from the feature store (one ``.npy`` file per rule), so
+    a sweep reuses the columns of earlier runs and sweeps and only computes
+    rules that are new or changed.
+    """
+
+    def __init__(self, left_ids: np.ndarray, right_ids: np.ndarray, columns: Dict[str, np.ndarray], dedup: bool = False):
+        self.left_ids = left_ids
+        self.right_ids = right_ids
+        self.columns = columns
+        self.dedup = dedup
+
+    def __len__(self):
+        return len(self.left_ids)
+
+    @property
+    def labels(self) -> List[str]:
+        return list(self.columns.keys())
+
+    def scores(self) -> np.ndarray:
+        # Sınıflandırmadaki toplam skor ile aynı (float64, kolon sırasıyla)
+        total = np.zeros(len(self), dtype=np.float64)
+        for values in self.columns.values():
+            total += values
+        return total
+
+    def to_frame(self) -> pd.DataFrame:
+        index = pd.MultiIndex.from_arrays([self.left_ids, self.right_ids])
+        return pd.DataFrame({label: values.astype(np.float64) for label, values in self.columns.items()}, index=index)
+
+
+class ThresholdSweep:
+    """Evaluates many classification settings over one feature computation.
+
+    Features of every comparison are computed once (or loaded from the
+    feature store when the rules, indexing and inputs did not change). The
+    threshold grid is evaluated in one vectorized pass over the sorted pair
+    scores; ML classifiers listed in ``sweep.classifiers`` are fitted on the
+    same cached features. With ground truth the precision, recall and F1 of
+    every setting are reported as well.
+    """
+
+    def __init__(self, sweep: 'SweepSpec', thresholds=None):
+        # Komut satırındaki eşikler config'teki ızgaranın yerine geçer
+        self.sweep = sweep
+        self.thresholds = parse_thresholds(thresholds) if thresholds is not None else list(sweep.thresholds)
+        self.classifiers = sweep.classifiers
+
+        self.rows = []
+
+    def evaluate_thresholds(self, scores: np.ndarray, n_features: int, is_true: Optional[np.ndarray] = None, n_true: int = 0) -> List[dict]:
+        # Tek sıralama + searchsorted: her eşik için "skor >= eşik * özellik sayısı" sayısı
+        order = np.argsort(scores, kind='stable')
+        sorted_scores = scores[order]
+        min_scores = np.asarray(self.thresholds) * n_features
+        start_positions = np.searchsorted(sorted_scores, min_scores, side='left')
+        matches = len(scores) - start_positions
+
+        rows = [{'setting': 'threshold', 'threshold': t, 'matches': int(m)} for t, m in zip(self.thresholds, matches)]
+
+        if is_true is not None:
+            # Sondan birikimli doğru sayısı: pozisyon i ve sonrası kaç gerçek bağlantı
+            true_suffix = np.r_[np.cumsum(is_true[order][::-1])[::-1], 0]
+            true_positives = true_suffix[start_positions]
+            precision, recall, f1 = precision_recall(true_positives, matches, n_true)
+
+            for row, tp, p, r, f in zip(rows, true_positives, precision, recall, f1):
+                row.update({'true_positives': int(tp), 'precision': float(p), 'recall': float(r), 'f1': float(f)})
+
+        return rows
+
+    @staticmethod
+    def group_metrics(feature_set: FeatureSet, predicted: np.ndarray, truth, loaded) -> dict:
+        # Tekilleştirmede değerlendirme ile aynı çift tanımı: eşleşen çiftler gruplanır, grup içindeki her çift sayılır
+        from dedup_engine import DeduplicationEngine
+
+        left, right = feature_set.left_ids[predicted], feature_set.right_ids[predicted]
+        codes, members = pd.factorize(np.concatenate([left, right]))
+        roots = DeduplicationEngine.union_find(len(members), codes[:len(left)], codes[len(left):])
+        metrics = linkage_metrics(group_pairs(roots, np.asarray(members)), truth, loaded=loaded, dedup=True)
+        return {key: metrics[key] for key in ('true_positives', 'precision', 'recall', 'f1')}
+
+    def evaluate_classifiers(self, feature_set: FeatureSet, is_true: Optional[np.ndarray] = None, n_true: int = 0,
+                             truth=None, loaded=None) -> List[dict]:
+        import recordlinkage as rl
+
+        classifiers = {'ecm': rl.ECMClassifier, 'svm': rl.SVMClassifier, 'kmeans': rl.KMeansClassifier}
+        features_df = feature_set.to_frame()
+        rows = []
+
+        for name in self.classifiers:
+            if name not in classifiers:
+                raise ValueError(f"Unknown classifier in sweep: {name}")
+
+            classifier = classifiers[name]()
+            if name == 'svm':
+                # Denetimli sınıflandırıcı: eğitim etiketleri ground truth'tan
+                if is_true is None:
+                    raise ValueError("svm in sweep needs ground truth for this comparison")
+                classifier.fit(features_df, features_df.index[is_true])
+            else:
+                classifier.fit(features_df)
+            predicted = features_df.index.isin(classifier.predict(features_df))
+
+            row = {'setting': name, 'threshold': None, 'matches': int(predicted.sum())}
+            if is_true is not None and feature_set.dedup:
+                row.update(self.group_metrics(feature_set, predicted, truth, loaded))
+            elif is_true is not None:
+                true_positives = int((predicted & is_true).sum())
+                precision, recall, f1 = precision_recall([true_positives], [row['matches']], n_true)
+                row.update({'true_positives': true_positives, 'precision': float(precision[0]), 'recall': float(recall[0]), 'f1': float(f1[0])})
+            rows.append(row)
+
+        return rows
+
+    def evaluate(self, comparison_name: str, feature_set: FeatureSet, loaded_left: np.ndarray, loaded_right: np.ndarray) -> List[dict]:
+        is_true, n_true, truth = None, 0, None
+        loaded = (loaded_left, loaded_right)
+
+        truth_spec = self.sweep.truth(comparison_name)
+        if truth_spec is not None:
+            truth = load_ground_truth(truth_spec)
+            is_true, n_true = label_candidates(feature_set.left_ids, feature_set.right_ids, truth[0], truth[1],
+                                               loaded_left, loaded_right, feature_set.dedup)
+            log.info(f"{comparison_name}: {int(is_true.sum())} of {n_true} true links are candidates "
+                     f"(pair completeness {is_true.sum() / n_true * 100 if n_true else 0:.1f}%)")
+
+        scores = feature_set.scores()
+        rows = self.evaluate_thresholds(scores, len(feature_set.columns), is_true, n_true)
+        if is_true is not None and feature_set.dedup:
+            for row in rows:
+                row.update(self.group_metrics(feature_set, scores >= row['threshold'] * len(feature_set.columns), truth, loaded))
+        if self.classifiers:
+            rows.extend(self.evaluate_classifiers(feature_set, is_true, n_true, truth, loaded))
+
+        for row in rows:
+            row['comparison'] = comparison_name
+            row['candidate_pairs'] = len(feature_set)
+        self.rows.extend(rows)
+        return rows
+
+    def results_frame(self) -> pd.DataFrame:
+        columns = ['comparison', 'setting', 'threshold', 'candidate_pairs', 'matches', 'true_positives', 'precision', 'recall', 'f1']
+        results_df = pd.DataFrame(self.rows)
+        return results_df[[c for c in columns if c in results_df.columns]]
+
+    def print_results(self):
+        results_df = self.results_frame()
+        log.result("\nTHRESHOLD SWEEP RESULTS:")
+        log.result("=" * 60)
+
+        for comparison_name, group in results_df.groupby('comparison', sort=False):
+            log.result(f"\n{comparison_name} ({group['candidate_pairs'].iloc[0]:,} candidate pairs)")
+            for _, row in group.iterrows():
+                setting = f"threshold {row['threshold']:.2f}" if row['setting'] == 'threshold' else row['setting']
+                line = f"   {setting:<16} matches: {row['matches']:>8,}"
+                if 'precision' in row and pd.notna(row.get('precision')):
+                    line += f"  precision: {row['precision']:.3f}  recall: {row['recall']:.3f}  f1: {row['f1']:.3f}"
+                log.result(line)
+
+            if 'f1' in group.columns and group['f1'].notna().any():
+                best = group.loc[group['f1'].idxmax()]
+                setting = f"threshold {best['threshold']:.2f}" if best['setting'] == 'threshold' else best['setting']
+                log.result(f"   Best F1: {setting} ({best['f1']:.3f})")
+
+    def save_results(self, output_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        self.results_frame().to_csv(output_path, index=False, encoding='utf-8')
+        log.info(f"Sweep results saved: {output_path}")
@@ -0,0 +1,103 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from event_log import log
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def parse_column_type(spec) -> Tuple[str, Optional[str]]:
+    # "date" veya {type: "date", format: "%Y%m%d"}
+    if isinstance(spec, dict):
+        return spec.get('type'), spec.get('format')
+    return spec, None
+
+
+def to_epoch_days(series: pd.Series, date_format: Optional[str] = None) -> np.ndarray:
+    """Dates as whole days since 1970-01-01 (``float64``, missing/invalid = NaN).
+
+    Days are kept in a float array so missing values stay NaN: exact
+    comparisons and blocking then treat them like the original missing
+    values instead of matching a sentinel day.
+    """
+    with np.errstate(invalid='ignore'):
+        dates = pd.to_datetime(series, format=date_format, errors='coerce')
+    days = dates.to_numpy(dtype='datetime64[D]')
+    values = (days - EPOCH).astype(np.float64)
+    values[pd.isna(dates).to_numpy()] = np.nan
+    return values
+
+
+def to_numeric_values(series: pd.Series) -> np.ndarray:
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def convert_column(series: pd.Series, column_type: str, date_format: Optional[str] = None) -> np.ndarray:
+    if column_type == 'date':
+        return to_epoch_days(series, date_format)
+    if column_type == 'numeric':
+        return to_numeric_values(series)
+    raise ValueError(f"Unknown column type: {column_type}")
+
+
+def apply_column_types(df: pd.DataFrame, column_types: dict) -> pd.DataFrame:
+    """Convert the typed columns of a loaded DataFrame once, in place.
+
+    ``column_types`` maps logical column names to ``numeric`` or ``date``
+    (optionally ``{type: date, format: "%Y%m%d"}``). Comparisons on these
+    columns then work on ``float64`` arrays without any per-pair coercion.
+    """
+    for column, spec in column_types.items():
+        if column not in df.columns:
+            continue
+
+        column_type, date_format = parse_column_type(spec)
+        values = convert_column(df[column], column_type, date_format)
+        invalid = int(np.isnan(values).sum() - df[column].isna().sum())
+        df[column] = values
+
+        if invalid > 0:
+            log.warning(f"Warn: {invalid} values of {column} could not be converted to {column_type}")
+
+    return df
+
+
+def typed_values(series: pd.Series, column_type: str) -> np.ndarray:
+    # Yüklemede dönüştürülmüş kolonlar doğrudan kullanılır, diğerleri burada dönüştürülür
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=np.float64)
+    return convert_column(series, column_type)
+
+
+def numeric_similarity(left: np.ndarray, right: np.ndarray, scoring: str = 'linear', offset: float = 0.0, scale: float = 1.0,
+                       origin: float = 0.0, missing_value: float = 0.0) -> np.ndarray:
+    """Vectorized recordlinkage numeric similarity over aligned value arrays.
+
+    Gives the same scores as ``recordlinkage.compare.Numeric`` for the
+    ``step``, ``linear``, ``squared``, ``exp`` and ``gauss`` methods; pairs
+    with a missing side get ``missing_value``.
+    """
+    if offset < 0:
+        raise ValueError("The offset must be positive.")
+    if scale <= 0:
+        raise ValueError("The scale must be larger than 0.")
+
+    d = np.abs(left - right - origin)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if scoring == 'step':
+            result = (d <= offset).astype(np.float64)
+        elif scoring in ('linear', 'lin'):
+            result = 1 - (np.clip(d, offset, offset + 2 * scale) - offset) / (2 * scale)
+        elif scoring == 'squared':
+            result = 1 - 0.5 * ((np.clip(d, offset, offset + np.sqrt(2) * scale) - offset) / scale) ** 2
+        elif scoring in ('exp', 'exponential'):
+            result = np.power(2.0, -(np.maximum(d, offset) - offset) / scale)
+        elif scoring in ('gauss', 'gaussian'):
+            result = np.power(2.0, -((np.maximum(d, offset) - offset) / scale) ** 2)
+        else:
+            raise ValueError(f"Unknown numeric scoring: {scoring}")
+
+    result[np.isnan(d)] = missing_value
+    return result